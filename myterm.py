@@ -11,9 +11,25 @@ On macOS with Python 3.14+, tkinter is included by default.
 
 from __future__ import annotations
 
+import time
+_T_START = time.perf_counter()
+
 import sys
 import json
 import os
+import re
+import bisect
+import argparse
+import binascii
+import heapq
+import importlib.util
+import math
+import queue
+import struct
+import threading
+import zlib
+from array import array
+from collections import deque
 from datetime import datetime
 from typing import Optional, Callable, Any
 
@@ -31,6 +47,7 @@ IS_WINDOWS = sys.platform.startswith('win')
 try:
     import tkinter as tk
     from tkinter import ttk, simpledialog, filedialog, messagebox
+    from tkinter import font as tkfont
 except ImportError as e:
     print(f"Error: tkinter not available: {e}", file=sys.stderr)
     print("\nTo fix this:", file=sys.stderr)
@@ -50,157 +67,4061 @@ except ImportError as e:
         print("  Install python-tk for your platform", file=sys.stderr)
     sys.exit(1)
 
-# Check pyserial availability
-try:
-    import serial
-    import serial.tools.list_ports
-except ImportError:
-    print("Error: pyserial not installed", file=sys.stderr)
-    print("\nInstall with: pip install pyserial", file=sys.stderr)
-    sys.exit(1)
+# Check pyserial availability (the module itself is imported lazily where used)
+if importlib.util.find_spec("serial") is None:
+    print("Error: pyserial not installed", file=sys.stderr)
+    print("\nInstall with: pip install pyserial", file=sys.stderr)
+    sys.exit(1)
+
+
+# Constants
+LINES_COUNT = 40
+PROFILE_DIR = "profiles"
+DEFAULT_PROFILE = os.path.join(PROFILE_DIR, "profile_usb_st.json")
+
+# Create profiles directory
+os.makedirs(PROFILE_DIR, exist_ok=True)
+
+# Themes
+THEMES = {
+    "dark": {"bg": "#111", "fg": "#00FFAA"},
+    "amber": {"bg": "#1b1200", "fg": "#FFB000"},
+    "blue": {"bg": "#0b1320", "fg": "#7FDBFF"},
+    "white_on_black": {"bg": "#000", "fg": "#FFF"},
+    "white_on_blue": {"bg": "#002b55", "fg": "#FFF"},
+}
+
+class StartupTrace:
+    """Records wall-clock time spent in each startup phase (--startup-trace)."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.last = _T_START
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """Close the current phase under the given name."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> None:
+        """Print per-phase timings to stderr."""
+        if not self.enabled:
+            return
+        print("⏱ Startup trace:", file=sys.stderr)
+        total = 0.0
+        for phase, dt in self.phases:
+            total += dt
+            print(f"  {phase:<22} {dt * 1000:8.1f} ms  (t={total * 1000:8.1f} ms)", file=sys.stderr)
+
+
+# Receive buffer and per-poll read size for network (socket://, rfc2217://) ports
+NET_RCVBUF = 256 * 1024
+NET_READ_SIZE = 64 * 1024
+
+
+def is_port_url(port: Optional[str]) -> bool:
+    """True for pyserial URL ports such as socket://, rfc2217:// or loop://."""
+    return bool(port) and "://" in port
+
+
+class SerialBackend:
+    """Handles serial communication with a USB device or a pyserial URL."""
+    
+    def __init__(
+        self,
+        cfg: dict[str, Any],
+        rx_callback: Callable[[bytes], None],
+        status_callback: Callable[[str], None],
+        root: tk.Tk
+    ) -> None:
+        self.cfg = cfg
+        self.rx_callback = rx_callback
+        self.status_callback = status_callback
+        self.root = root
+        self.running = True
+        self.virtual = cfg["port"] == "VIRTUAL"
+        self.ser: Optional[serial.Serial] = None
+        self.after_id: Optional[str] = None
+        self.url = is_port_url(cfg["port"])
+        # Network ports: writes made during one event-loop pass go out as one send
+        self.tx_buf = bytearray()
+        self.flush_id: Optional[str] = None
+        # Writes from worker threads: direct on an open port, via _poll when virtual
+        self.write_lock = threading.Lock()
+        self.pending: queue.Queue = queue.Queue()
+        # Set while a file-transfer protocol owns the port
+        self.suspended = False
+        # Called with every chunk written (raw TX capture)
+        self.tx_tap: Optional[Callable[[bytes], None]] = None
+        
+        self.auto_reconnect = cfg.get("auto_reconnect", True)
+        self.reconnect_delay = cfg.get("reconnect_delay", 2000)
+        self.reconnect_attempts = 0
+        self.max_reconnect_attempts = cfg.get("max_reconnect_attempts", 5)
+        
+        if not self.virtual:
+            try:
+                self.ser = self._open()
+                self.status_callback("connected")
+            except Exception as e:
+                self.status_callback(f"error: {e}")
+                self.virtual = True
+        
+        self._poll()
+    
+    def _open(self) -> "serial.Serial":
+        """Open the configured port; URLs get non-blocking, Nagle-off sockets."""
+        import serial
+        import socket
+        flow = {"rtscts": self.cfg.get("rtscts", False), "xonxoff": self.cfg.get("xonxoff", False)}
+        if not self.url:
+            return serial.Serial(self.cfg["port"], self.cfg["baud"], timeout=0.05, **flow)
+        ser = serial.serial_for_url(self.cfg["port"], self.cfg["baud"], timeout=0, **flow)
+        sock = getattr(ser, "_socket", None)
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.cfg.get("net_rcvbuf", NET_RCVBUF))
+        return ser
+
+    def _poll(self) -> None:
+        """Poll serial port for incoming data."""
+        if not self.running:
+            return
+        if self.suspended:
+            self.after_id = self.root.after(50, self._poll)
+            return
+        while not self.pending.empty():
+            self.write(self.pending.get_nowait())
+        
+        if self.virtual or not self.ser or not self.ser.is_open:
+            if self.auto_reconnect and self.reconnect_attempts < self.max_reconnect_attempts:
+                self.reconnect_attempts += 1
+                self.status_callback(f"reconnecting... ({self.reconnect_attempts}/{self.max_reconnect_attempts})")
+                self._try_reconnect()
+                self.after_id = self.root.after(self.reconnect_delay, self._poll)
+            else:
+                self.after_id = self.root.after(50, self._poll)
+            return
+        
+        try:
+            if self.url:
+                # socket:// in_waiting is only a readiness flag; drain up to a full buffer
+                data = self.ser.read(NET_READ_SIZE)
+                if data:
+                    self.rx_callback(data)
+            elif self.ser.in_waiting:
+                data = self.ser.read(self.ser.in_waiting)
+                if data:
+                    self.rx_callback(data)
+        except Exception as e:
+            self.status_callback(f"disconnected: {e}")
+            if self.ser and self.ser.is_open:
+                try:
+                    self.ser.close()
+                except Exception:
+                    pass
+            self.ser = None
+            self.after_id = self.root.after(100, self._poll)
+            return
+        
+        self.reconnect_attempts = 0
+        self.after_id = self.root.after(10, self._poll)
+        
+    def _try_reconnect(self) -> None:
+        """Attempt to reconnect to serial port."""
+        try:
+            if not self.virtual:
+                self.ser = self._open()
+                self.reconnect_attempts = 0
+                self.status_callback("reconnected")
+        except Exception as e:
+            self.status_callback(f"reconnect failed: {e}")
+    
+    def suspend(self) -> "serial.Serial":
+        """Stop polling and hand the open port to a transfer thread."""
+        if self.flush_id is not None:
+            self._flush()
+        with self.write_lock:  # No worker write is in flight once this returns
+            self.suspended = True
+        return self.ser
+
+    def resume(self) -> None:
+        """Take the port back after a transfer."""
+        self.suspended = False
+
+    def write(self, data: bytes) -> None:
+        """Write data to serial port."""
+        if self.suspended:
+            self.status_callback("port busy: transfer in progress")
+            return
+        if self.tx_tap is not None:
+            self.tx_tap(data)
+        if self.virtual or not self.ser or not self.ser.is_open:
+            self.rx_callback(b"[echo] " + data)
+            return
+        
+        if self.url:
+            self.tx_buf += data
+            if self.flush_id is None:
+                self.flush_id = self.root.after_idle(self._flush)
+            return
+
+        try:
+            with self.write_lock:
+                self.ser.write(data)
+        except Exception:
+            self.status_callback("write failed")
+
+    def write_threadsafe(self, data: bytes) -> None:
+        """Write from a worker thread; blocks under hardware flow control.
+
+        URL ports are written directly too (pyserial's URL handlers are safe to
+        write from another thread), so paced senders time the wire, not _poll.
+        Raises OSError while a transfer owns the port, as write() refuses.
+        """
+        with self.write_lock:
+            if self.suspended:
+                raise OSError("port busy: transfer in progress")
+            ser = self.ser
+            if self.virtual or not ser or not ser.is_open:
+                self.pending.put(data)
+                return
+            if self.tx_tap is not None:
+                self.tx_tap(data)
+            ser.write(data)
+
+    def _flush(self) -> None:
+        """Send coalesced network writes."""
+        self.flush_id = None
+        if not self.tx_buf:
+            return
+        data = bytes(self.tx_buf)
+        self.tx_buf.clear()
+        if not self.ser or not self.ser.is_open:
+            return
+        try:
+            with self.write_lock:
+                self.ser.write(data)
+        except Exception:
+            self.status_callback("write failed")
+    
+    def close(self) -> None:
+        """Close serial connection and cleanup."""
+        self.running = False
+        if self.flush_id is not None:
+            self._flush()
+        
+        if self.after_id:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass
+        
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+
+
+# Plan ops executed per event-loop pass before a script yields
+SCRIPT_OPS_PER_TICK = 5000
+# RX lines kept since the last script send, for expect/until that start after the text arrived
+SCRIPT_RESPONSE_LINES = 2000
+
+# Command script plan opcodes (see compile_script)
+OP_SEND, OP_WRITE, OP_EXPECT, OP_WAIT, OP_SET, OP_JUMP, OP_IF, OP_FOR_INIT, OP_FOR_NEXT, OP_UNTIL, OP_ECHO, OP_STOP = range(12)
+
+_SCRIPT_VAR_RE = re.compile(r"\$\{(\w+)\}|\$(\w+)")
+_SCRIPT_SWEEP_RE = re.compile(r"\{(-?\d+)\.\.(-?\d+)(?::(-?\d+))?\}|\{([^{}$]*,[^{}$]*)\}")
+_SCRIPT_PATTERN_RE = re.compile(r"""\s*(?:'([^']*)'|"([^"]*)"|/((?:[^/\\]|\\.)*)/)""")
+_SCRIPT_COND_RE = re.compile(r"(.+?)\s*(==|!=|<=|>=|<|>|~)\s*(.+)")
+
+
+class ScriptError(ValueError):
+    """Command script compile error with the offending line number."""
+
+    def __init__(self, lineno: int, msg: str) -> None:
+        super().__init__(f"line {lineno}: {msg}")
+        self.lineno = lineno
+
+
+def _compile_template(text: str) -> tuple:
+    """Split text into literal and variable parts so sends never re-parse it."""
+    parts: list[Any] = []
+    pos = 0
+    for m in _SCRIPT_VAR_RE.finditer(text):
+        if m.start() > pos:
+            parts.append(text[pos:m.start()])
+        parts.append((m.group(1) or m.group(2),))
+        pos = m.end()
+    if pos < len(text):
+        parts.append(text[pos:])
+    return tuple(parts)
+
+
+def render_template(parts: tuple, variables: dict[str, Any]) -> str:
+    """Render a compiled template with the current variable values."""
+    if len(parts) == 1 and isinstance(parts[0], str):
+        return parts[0]
+    return "".join(p if isinstance(p, str) else str(variables.get(p[0], "")) for p in parts)
+
+
+def _parse_pattern(text: str, lineno: int) -> tuple[re.Pattern, str]:
+    """Parse a 'literal', "literal" or /regex/ pattern; return it and the rest of the line."""
+    m = _SCRIPT_PATTERN_RE.match(text)
+    if not m:
+        raise ScriptError(lineno, f"expected 'text' or /regex/, got: {text.strip()!r}")
+    try:
+        if m.group(3) is not None:
+            rx = re.compile(m.group(3))
+        else:
+            literal = m.group(1) if m.group(1) is not None else m.group(2)
+            rx = re.compile(re.escape(literal), re.IGNORECASE)
+    except re.error as e:
+        raise ScriptError(lineno, f"bad regex: {e}") from None
+    return rx, text[m.end():]
+
+
+def _parse_options(text: str, lineno: int, allowed: tuple[str, ...]) -> dict[str, str]:
+    """Parse trailing 'key value' options such as 'timeout 5 max 10 as var'."""
+    words = text.split()
+    if len(words) % 2:
+        raise ScriptError(lineno, f"incomplete options: {text.strip()!r}")
+    opts = {}
+    for key, value in zip(words[::2], words[1::2]):
+        if key not in allowed:
+            raise ScriptError(lineno, f"unknown option {key!r} (expected {', '.join(allowed)})")
+        opts[key] = value
+    return opts
+
+
+def _option_number(opts: dict[str, str], key: str, kind: Callable[[str], Any], lineno: int) -> Any:
+    """Numeric value of an option (0 when absent), or ScriptError."""
+    try:
+        return kind(opts.get(key, 0))
+    except ValueError:
+        what = "seconds" if kind is float else "a count"
+        raise ScriptError(lineno, f"{key} needs {what}, got {opts[key]!r}") from None
+
+
+def _parse_sequence(text: str, lineno: int) -> Any:
+    """Parse 'a..b', 'a..b step s' or 'x,y,z' into a lazily iterated sequence."""
+    m = re.fullmatch(r"(-?\d+)\s*\.\.\s*(-?\d+)(?:\s*(?:step|:)\s*(-?\d+))?", text.strip())
+    if m:
+        start, end = int(m.group(1)), int(m.group(2))
+        step = int(m.group(3) or (1 if end >= start else -1))
+        if step == 0:
+            raise ScriptError(lineno, "step must not be 0")
+        return range(start, end + (1 if step > 0 else -1), step)
+    values = tuple(v.strip() for v in text.strip().strip("{}").split(","))
+    if not values or not all(values):
+        raise ScriptError(lineno, f"bad sequence: {text.strip()!r}")
+    return values
+
+
+class CommandScript:
+    """Command script compiled into a flat plan of ops with resolved jump targets.
+
+    Syntax (one statement per line, '#' comments):
+        send CMD / CMD          send and wait for the completion pattern
+        write CMD               send without waiting
+        expect 'text'|/re/ [as VAR] [timeout S]
+        wait S
+        set VAR = VALUE
+        echo TEXT
+        for VAR in A..B [step S] | for VAR in X,Y,Z ... end
+        repeat N ... end
+        do ... until 'text'|/re/ [timeout S] [max N]
+        if $VAR OP VALUE ... [else ...] end      (OP: == != < > <= >= ~)
+        stop
+    $VAR / ${VAR} is substituted in commands and values; a send such as
+    ATS49={1..4} or ATS53={SIM,REAL} expands into a loop over that send.
+    """
+
+    def __init__(self, plan: list[tuple], source_lines: int) -> None:
+        self.plan = plan
+        self.source_lines = source_lines
+
+    def __len__(self) -> int:
+        return len(self.plan)
+
+
+def compile_script(text: str) -> CommandScript:
+    """Compile command script text into a CommandScript plan."""
+    plan: list[Any] = []
+    blocks: list[list[Any]] = []  # [kind, lineno, ...]
+    hidden = 0
+
+    def new_hidden() -> str:
+        nonlocal hidden
+        hidden += 1
+        return f"_{hidden}"
+
+    def emit_send(cmd: str, wait: bool, lineno: int) -> None:
+        # Each {a..b} / {x,y} sweep becomes a loop around this single send
+        sweeps = list(_SCRIPT_SWEEP_RE.finditer(cmd))
+        loops = []
+        for m in reversed(sweeps):
+            if m.group(4) is not None:
+                seq: Any = tuple(v.strip() for v in m.group(4).split(","))
+            else:
+                seq = _parse_sequence(f"{m.group(1)}..{m.group(2)}" + (f" step {m.group(3)}" if m.group(3) else ""), lineno)
+            var = new_hidden()
+            cmd = cmd[:m.start()] + "${" + var + "}" + cmd[m.end():]
+            loops.append((var, seq))
+        heads = []
+        for var, seq in reversed(loops):
+            idx = new_hidden()
+            plan.append((OP_FOR_INIT, idx))
+            heads.append(len(plan))
+            plan.append([OP_FOR_NEXT, idx, var, seq, None])
+        plan.append((OP_SEND if wait else OP_WRITE, _compile_template(cmd)))
+        for head in reversed(heads):
+            plan.append((OP_JUMP, head))
+            plan[head][4] = len(plan)
+
+    lines = text.splitlines()
+    for lineno, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        keyword, _, rest = line.partition(" ")
+        keyword = keyword.lower()
+        rest = rest.strip()
+
+        if keyword == "send":
+            if not rest:
+                raise ScriptError(lineno, "send needs a command")
+            emit_send(rest, True, lineno)
+        elif keyword == "write":
+            if not rest:
+                raise ScriptError(lineno, "write needs a command")
+            emit_send(rest, False, lineno)
+        elif keyword == "expect":
+            rx, tail = _parse_pattern(rest, lineno)
+            opts = _parse_options(tail, lineno, ("as", "timeout"))
+            plan.append((OP_EXPECT, rx, opts.get("as"), _option_number(opts, "timeout", float, lineno) or None))
+        elif keyword == "wait":
+            try:
+                plan.append((OP_WAIT, float(rest)))
+            except ValueError:
+                raise ScriptError(lineno, f"wait needs seconds, got {rest!r}") from None
+        elif keyword == "set":
+            name, eq, value = rest.partition("=")
+            name = name.strip()
+            if not eq or not name.isidentifier():
+                raise ScriptError(lineno, "expected: set NAME = VALUE")
+            plan.append((OP_SET, name, _compile_template(value.strip())))
+        elif keyword == "echo":
+            plan.append((OP_ECHO, _compile_template(rest)))
+        elif keyword == "stop":
+            plan.append((OP_STOP,))
+        elif keyword in ("for", "repeat"):
+            if keyword == "for":
+                name, kw_in, seq_text = rest.partition(" in ")
+                name = name.strip()
+                if not kw_in or not name.isidentifier():
+                    raise ScriptError(lineno, "expected: for NAME in A..B | X,Y,Z")
+                seq = _parse_sequence(seq_text, lineno)
+            else:
+                try:
+                    count = int(rest)
+                except ValueError:
+                    raise ScriptError(lineno, f"repeat needs a count, got {rest!r}") from None
+                name, seq = new_hidden(), range(count)
+            idx = new_hidden()
+            plan.append((OP_FOR_INIT, idx))
+            head = len(plan)
+            plan.append([OP_FOR_NEXT, idx, name, seq, None])
+            blocks.append(["for", lineno, head])
+        elif keyword == "do":
+            counter = new_hidden()
+            plan.append((OP_SET, counter, ("0",)))
+            blocks.append(["do", lineno, len(plan), counter])
+        elif keyword == "until":
+            if not blocks or blocks[-1][0] != "do":
+                raise ScriptError(lineno, "'until' without 'do'")
+            _, _, body, counter = blocks.pop()
+            rx, tail = _parse_pattern(rest, lineno)
+            opts = _parse_options(tail, lineno, ("timeout", "max"))
+            plan.append((OP_UNTIL, rx, _option_number(opts, "timeout", float, lineno) or None, counter,
+                         _option_number(opts, "max", int, lineno), body))
+        elif keyword == "if":
+            m = _SCRIPT_COND_RE.fullmatch(rest)
+            if not m:
+                raise ScriptError(lineno, "expected: if $VAR OP VALUE")
+            left, op, right = m.group(1).strip(), m.group(2), m.group(3).strip()
+            if op == "~":
+                rhs: Any = _parse_pattern(right, lineno)[0]
+            else:
+                rhs = _compile_template(right.strip("'\""))
+            blocks.append(["if", lineno, len(plan)])
+            plan.append([OP_IF, _compile_template(left), op, rhs, None])
+        elif keyword == "else":
+            if not blocks or blocks[-1][0] != "if":
+                raise ScriptError(lineno, "'else' without 'if'")
+            block = blocks[-1]
+            plan.append([OP_JUMP, None])
+            plan[block[2]][4] = len(plan)
+            block[0], block[2] = "else", len(plan) - 1
+        elif keyword == "end":
+            if not blocks or blocks[-1][0] == "do":
+                raise ScriptError(lineno, "'end' without 'for', 'repeat' or 'if'")
+            kind, _, at = blocks.pop()[:3]
+            if kind == "for":
+                plan.append((OP_JUMP, at))
+                plan[at][4] = len(plan)
+            elif kind == "if":
+                plan[at][4] = len(plan)
+            else:
+                plan[at][1] = len(plan)
+        else:
+            # A bare line is a command to send
+            emit_send(line, True, lineno)
+
+    if blocks:
+        kind, lineno = blocks[-1][:2]
+        raise ScriptError(lineno, f"unclosed '{kind}' block")
+    return CommandScript([tuple(op) for op in plan], len(lines))
+
+
+def _script_compare(left: str, op: str, right: Any) -> bool:
+    """Evaluate a compiled 'if' condition, numerically when both sides are numbers."""
+    if op == "~":
+        return right.search(left) is not None
+    try:
+        a: Any = float(left)
+        b: Any = float(right)
+    except ValueError:
+        a, b = left, right
+    if op == "==":
+        return a == b
+    if op == "!=":
+        return a != b
+    try:
+        if op == "<":
+            return a < b
+        if op == ">":
+            return a > b
+        if op == "<=":
+            return a <= b
+        return a >= b
+    except TypeError:
+        return False
+
+
+_KV_NUMBER_RE = re.compile(r"([A-Za-z_][\w.]*)\s*[=:]\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\b")
+
+
+class Series:
+    """One captured numeric series: parallel timestamp/value columns in array('d').
+
+    Sample times are time.monotonic(), so they stay sorted for bisect even if
+    the wall clock steps; wall0 converts them to wall-clock time for export.
+    """
+
+    __slots__ = ("name", "t", "v", "wall0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.t = array("d")  # time.monotonic() of each sample
+        self.v = array("d")
+        self.wall0 = time.time() - time.monotonic()
+
+    def wall_times(self) -> array:
+        """Sample times as wall-clock (epoch) seconds."""
+        wall0 = self.wall0
+        return array("d", (t + wall0 for t in self.t))
+
+    def __len__(self) -> int:
+        return len(self.v)
+
+    def window(self, t0: float, t1: float = float("inf")) -> tuple[int, int]:
+        """Return the [start, end) sample range with t0 <= t < t1 (binary search)."""
+        return bisect.bisect_left(self.t, t0), bisect.bisect_left(self.t, t1)
+
+    def stats(self, start: int = 0, end: Optional[int] = None) -> dict[str, float]:
+        """Count, min, max, mean and last value over a sample range."""
+        values = self.v[start:end]
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "min": min(values),
+            "max": max(values),
+            "mean": sum(values) / len(values),
+            "last": values[-1],
+        }
+
+
+class SeriesStore:
+    """Numeric series extracted from responses by per-command capture rules.
+
+    Rules live in cfg["capture_rules"], keyed by command, command name before
+    '=' (e.g. "ATS53" also matches "ATS53=SIM") or "*" for every command:
+        {"ATS49": [{"name": "temp", "regex": "T=([-\\\\d.]+)"}, {"kv": true}]}
+    A regex rule stores each group (named groups by name); a kv rule stores
+    every key=number / key: number pair. Series are named "<rule key>.<name>".
+    """
+
+    def __init__(self, rules: Optional[dict[str, list[dict[str, Any]]]] = None) -> None:
+        self.series: dict[str, Series] = {}
+        self.set_rules(rules or {})
+
+    def set_rules(self, rules: dict[str, list[dict[str, Any]]]) -> None:
+        """Compile capture rules; invalid regexes are reported and skipped."""
+        self.rules: dict[str, list[tuple[str, Optional[re.Pattern], str]]] = {}
+        for key, specs in rules.items():
+            compiled = []
+            for spec in specs:
+                if spec.get("kv"):
+                    compiled.append((key, None, spec.get("name", "")))
+                    continue
+                try:
+                    compiled.append((key, re.compile(spec["regex"]), spec.get("name", "value")))
+                except (KeyError, re.error) as e:
+                    print(f"⚠️ Bad capture rule for {key}: {e}", file=sys.stderr)
+            self.rules[key] = compiled
+        self._rule_cache: dict[str, list] = {}
+        self.active: list = self.rules.get("*", [])
+
+    def set_command(self, cmd: str) -> None:
+        """Select the rules for the command whose response is streaming in."""
+        rules = self._rule_cache.get(cmd)
+        if rules is None:
+            rules = self.rules.get(cmd) or self.rules.get(cmd.split("=", 1)[0]) or []
+            rules = rules + self.rules.get("*", [])
+            self._rule_cache[cmd] = rules
+        self.active = rules
+
+    def _series(self, name: str) -> Series:
+        s = self.series.get(name)
+        if s is None:
+            s = self.series[name] = Series(name)
+        return s
+
+    def feed(self, text: str, t: Optional[float] = None) -> int:
+        """Extract values from received text using the active rules; return the sample count."""
+        if not self.active:
+            return 0
+        if t is None:
+            t = time.monotonic()
+        added = 0
+        for key, rx, name in self.active:
+            if rx is None:
+                for m in _KV_NUMBER_RE.finditer(text):
+                    s = self._series(f"{key}.{name + '.' if name else ''}{m.group(1)}")
+                    s.t.append(t)
+                    s.v.append(float(m.group(2)))
+                    added += 1
+                continue
+            for m in rx.finditer(text):
+                named = m.groupdict()
+                if named:
+                    items = named.items()
+                elif rx.groups:
+                    items = [(name if rx.groups == 1 else f"{name}{i}", g) for i, g in enumerate(m.groups(), 1)]
+                else:
+                    items = [(name, m.group(0))]
+                for field, raw in items:
+                    try:
+                        value = float(raw)
+                    except (TypeError, ValueError):
+                        continue
+                    s = self._series(f"{key}.{field}")
+                    s.t.append(t)
+                    s.v.append(value)
+                    added += 1
+        return added
+
+    def clear(self) -> None:
+        self.series.clear()
+
+    def export_csv(self, path: str, names: Optional[list[str]] = None) -> int:
+        """Write series as 'series,timestamp,value' rows; return the row count."""
+        rows = 0
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write("series,timestamp,value\n")
+            for name in names or sorted(self.series):
+                s = self.series[name]
+                f.writelines(f"{name},{t:.6f},{v!r}\n" for t, v in zip(s.wall_times(), s.v))
+                rows += len(s)
+        return rows
+
+    def export_npy(self, path: str, name: str) -> int:
+        """Write one series as an (n, 2) float64 .npy array of [timestamp, value]."""
+        s = self.series[name]
+        n = len(s)
+        data = array("d", bytes(16 * n))
+        data[0::2] = s.wall_times()
+        data[1::2] = s.v
+        if sys.byteorder != "little":
+            data.byteswap()
+        header = f"{{'descr': '<f8', 'fortran_order': False, 'shape': ({n}, 2), }}"
+        # Pad so magic + header length + header is a multiple of 64 bytes
+        header += " " * (63 - (10 + len(header)) % 64) + "\n"
+        with open(path, "wb") as f:
+            f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+            f.write(data.tobytes())
+        return n
+
+
+PLOT_COLORS = ("#00FFAA", "#FFB000", "#7FDBFF", "#FF4444", "#FF77FF", "#FFFFFF")
+PLOT_FPS = 30  # Redraw cap for the live plot
+
+
+class _PlotTrace:
+    """Min/max buckets of one series, one bucket per pixel column, updated incrementally."""
+
+    __slots__ = ("series", "dt", "pos", "buckets", "item")
+
+    def __init__(self, series: Series, item: int) -> None:
+        self.series = series
+        self.item = item
+        self.dt = 0.0
+        self.pos = 0
+        self.buckets: deque = deque()
+
+    def reset(self, dt: float, t0: float, columns: int) -> None:
+        """Start bucketing at a new column width, from the samples at or after t0."""
+        self.dt = dt
+        self.buckets = deque(maxlen=columns + 2)
+        self.pos = self.series.window(t0)[0]
+
+    def update(self, t0: float) -> None:
+        """Fold samples that arrived since the last frame into the buckets."""
+        s = self.series
+        n = len(s)
+        if self.pos >= n:
+            return
+        if s.t[self.pos] < t0:
+            # Behind the visible span (e.g. plot was paused): skip what scrolled out
+            self.pos = s.window(t0)[0]
+        t, v, dt = s.t, s.v, self.dt
+        buckets = self.buckets
+        last = buckets[-1] if buckets else None
+        for i in range(self.pos, n):
+            b = int(t[i] / dt)
+            x = v[i]
+            if last is not None and b <= last[0]:
+                if x < last[1]:
+                    last[1] = x
+                elif x > last[2]:
+                    last[2] = x
+            else:
+                last = [b, x, x]
+                buckets.append(last)
+        self.pos = n
+
+
+class LivePlot:
+    """Live plot of captured series on a Tk Canvas.
+
+    Each series is reduced to min/max per pixel column as samples arrive, so a
+    frame costs O(plot width) however many samples are in view; frames are
+    capped at PLOT_FPS and canvas items are reused between frames.
+    """
+
+    MARGIN = 48
+
+    def __init__(self, root: tk.Tk, store: SeriesStore) -> None:
+        self.root = root
+        self.store = store
+        self.traces: dict[str, _PlotTrace] = {}
+        self.after_id: Optional[str] = None
+        self.known_series: list[str] = []
+        self.last_list_sync = 0.0
+        self.columns = 0
+
+        self.win = tk.Toplevel(root)
+        self.win.title("Live Plot")
+        self.win.geometry("900x420")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        side = ttk.Frame(self.win)
+        side.pack(side="left", fill="y", padx=4, pady=4)
+        ttk.Label(side, text="Series:").pack(anchor="w")
+        self.series_list = tk.Listbox(side, selectmode="extended", exportselection=False, width=24)
+        self.series_list.pack(fill="y", expand=True)
+        self.series_list.bind("<<ListboxSelect>>", self._on_select)
+        span_row = ttk.Frame(side)
+        span_row.pack(fill="x", pady=2)
+        ttk.Label(span_row, text="Span (s):").pack(side="left")
+        self.span_var = tk.DoubleVar(value=10.0)
+        ttk.Entry(span_row, textvariable=self.span_var, width=6).pack(side="left")
+        self.paused = tk.BooleanVar(value=False)
+        ttk.Checkbutton(side, text="Pause", variable=self.paused).pack(anchor="w")
+
+        self.canvas = tk.Canvas(self.win, bg="#111", highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.axis = self.canvas.create_rectangle(0, 0, 0, 0, outline="#444")
+        self.label_max = self.canvas.create_text(0, 0, anchor="ne", fill="#aaa", font=("Menlo", 8))
+        self.label_min = self.canvas.create_text(0, 0, anchor="se", fill="#aaa", font=("Menlo", 8))
+        self.label_span = self.canvas.create_text(0, 0, anchor="ne", fill="#aaa", font=("Menlo", 8))
+
+        self._sync_series_list()
+        self._tick()
+
+    def _sync_series_list(self) -> None:
+        names = sorted(self.store.series)
+        if names != self.known_series:
+            selected = set(self.traces)
+            self.known_series = names
+            self.series_list.delete(0, "end")
+            for i, name in enumerate(names):
+                self.series_list.insert("end", name)
+                if name in selected:
+                    self.series_list.selection_set(i)
+        self.last_list_sync = time.monotonic()
+
+    def _on_select(self, event: Optional[tk.Event] = None) -> None:
+        wanted = {self.series_list.get(i) for i in self.series_list.curselection()}
+        for name in list(self.traces):
+            if name not in wanted:
+                self.canvas.delete(self.traces.pop(name).item)
+        for name in sorted(wanted - set(self.traces)):
+            series = self.store.series.get(name)
+            if series is None:
+                continue  # Cleared since the list was last synced
+            color = PLOT_COLORS[len(self.traces) % len(PLOT_COLORS)]
+            item = self.canvas.create_line(0, 0, 0, 0, fill=color, width=1)
+            self.traces[name] = _PlotTrace(series, item)
+        self.columns = 0  # Force buckets to be rebuilt for the new set
+
+    def _tick(self) -> None:
+        self.after_id = self.win.after(1000 // PLOT_FPS, self._tick)
+        if time.monotonic() - self.last_list_sync > 1.0:
+            self._sync_series_list()
+        if not self.paused.get():
+            self._draw()
+
+    def _draw(self) -> None:
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        left, top, right, bottom = self.MARGIN, 8, width - 8, height - 16
+        columns = right - left
+        if columns < 10 or bottom - top < 10:
+            return
+        try:
+            span = max(0.01, float(self.span_var.get()))
+        except (tk.TclError, ValueError):
+            span = 10.0
+        now = time.monotonic()
+        dt = span / columns
+        t0 = now - span
+        if columns != self.columns or any(tr.dt != dt for tr in self.traces.values()):
+            self.columns = columns
+            for tr in self.traces.values():
+                tr.reset(dt, t0, columns)
+        b0 = int(now / dt) - columns
+
+        lo, hi = float("inf"), float("-inf")
+        for tr in self.traces.values():
+            tr.update(t0)
+            for b, bmin, bmax in tr.buckets:
+                if b >= b0:
+                    if bmin < lo:
+                        lo = bmin
+                    if bmax > hi:
+                        hi = bmax
+        if lo > hi:
+            lo, hi = 0.0, 1.0
+        elif lo == hi:
+            lo, hi = lo - 1.0, hi + 1.0
+        scale = (bottom - top) / (hi - lo)
+
+        for tr in self.traces.values():
+            coords: list[float] = []
+            for b, bmin, bmax in tr.buckets:
+                if b >= b0:
+                    x = left + (b - b0)
+                    coords += (x, bottom - (bmax - lo) * scale, x, bottom - (bmin - lo) * scale)
+            if len(coords) >= 4:
+                self.canvas.coords(tr.item, *coords)
+            else:
+                self.canvas.coords(tr.item, -1, -1, -1, -1)
+
+        self.canvas.coords(self.axis, left, top, right, bottom)
+        self.canvas.coords(self.label_max, left - 4, top)
+        self.canvas.itemconfigure(self.label_max, text=f"{hi:.4g}")
+        self.canvas.coords(self.label_min, left - 4, bottom)
+        self.canvas.itemconfigure(self.label_min, text=f"{lo:.4g}")
+        self.canvas.coords(self.label_span, right, bottom + 2)
+        self.canvas.itemconfigure(self.label_span, text=f"last {span:g}s")
+
+    def lift(self) -> None:
+        self.win.deiconify()
+        self.win.lift()
+
+    def close(self) -> None:
+        if self.after_id:
+            try:
+                self.win.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+        self.win.destroy()
+
+
+RESULTS_DB = "myterm-results.sqlite3"
+RESPONSE_EXCERPT = 2000  # Characters of response kept per execution
+
+
+def _percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    # pct * n / 100 (not pct / 100 * n) keeps exact ranks exact, e.g. p7 of 100 values
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[k]
+
+
+class ResultsStore:
+    """SQLite history of command executions across runs.
+
+    Writes are queued and committed in batched transactions by a worker
+    thread; queries use their own connection (WAL mode lets them run while
+    the writer is busy).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            profile TEXT, port TEXT, mode TEXT,
+            started REAL NOT NULL, ended REAL
+        );
+        CREATE TABLE IF NOT EXISTS executions (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            profile TEXT, port TEXT,
+            command TEXT NOT NULL, idx INTEGER,
+            status TEXT NOT NULL, latency REAL, response TEXT,
+            sent_at REAL NOT NULL, done_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS ix_executions_run ON executions(run_id);
+        CREATE INDEX IF NOT EXISTS ix_executions_command ON executions(command, run_id);
+        CREATE INDEX IF NOT EXISTS ix_executions_time ON executions(sent_at);
+        CREATE INDEX IF NOT EXISTS ix_runs_started ON runs(started);
+    """
+    BATCH = 500
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.queue: queue.Queue = queue.Queue()
+        self.last_run_id = 0
+        self.error: Optional[str] = None
+        import sqlite3  # Deferred: only runs that record results pay for it
+        # Schema is created up front so queries work before the first write
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+        self.thread = threading.Thread(target=self._writer, name="results-writer", daemon=True)
+        self.thread.start()
+
+    def start_run(self, profile: str, port: str, mode: str) -> int:
+        """Register a run and return its id (millisecond timestamp, unique per process)."""
+        run_id = max(int(time.time() * 1000), self.last_run_id + 1)
+        self.last_run_id = run_id
+        self.queue.put(("INSERT INTO runs (id, profile, port, mode, started) VALUES (?, ?, ?, ?, ?)",
+                        (run_id, profile, port, mode, time.time())))
+        return run_id
+
+    def end_run(self, run_id: int) -> None:
+        self.queue.put(("UPDATE runs SET ended = ? WHERE id = ?", (time.time(), run_id)))
+
+    def record(self, run_id: int, profile: str, port: str, command: str, idx: Optional[int],
+               status: str, latency: Optional[float], response: str, sent_at: float, done_at: float) -> None:
+        """Queue one execution row."""
+        self.queue.put((
+            "INSERT INTO executions (run_id, profile, port, command, idx, status, latency, response, sent_at, done_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, profile, port, command, idx, status, latency, response[:RESPONSE_EXCERPT], sent_at, done_at)))
+
+    def _writer(self) -> None:
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                while len(batch) < self.BATCH:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._commit(conn, batch)
+                        return
+                    batch.append(item)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[tuple[str, tuple]]) -> None:
+        import sqlite3
+        try:
+            with conn:
+                for sql, params in batch:
+                    conn.execute(sql, params)
+        except sqlite3.Error as e:
+            self.error = str(e)
+            print(f"⚠️ Results store write failed: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        """Flush queued rows and stop the writer."""
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def latency_percentiles(self, command: str, last_runs: int = 30,
+                            percentiles: tuple[float, ...] = (50, 95, 99)) -> dict[str, Any]:
+        """Latency percentiles and failure count of a command over its last N runs."""
+        rows = self._query(
+            "SELECT status, latency FROM executions WHERE command = ? AND run_id IN ("
+            " SELECT DISTINCT run_id FROM executions WHERE command = ? ORDER BY run_id DESC LIMIT ?)",
+            (command, command, last_runs))
+        latencies = sorted(lat for status, lat in rows if status == "success" and lat is not None)
+        result: dict[str, Any] = {"executions": len(rows), "failed": sum(1 for status, _ in rows if status != "success")}
+        for pct in percentiles:
+            result[f"p{pct:g}"] = _percentile(latencies, pct)
+        return result
+
+    def regressions(self, since: float, profile: Optional[str] = None,
+                    latency_factor: float = 1.5) -> list[dict[str, Any]]:
+        """Commands whose success rate dropped or mean latency grew since a timestamp."""
+        where = "WHERE profile = ?" if profile else ""
+        params: tuple = (since,) * 6 + ((profile,) if profile else ())
+        rows = self._query(
+            "SELECT command,"
+            " SUM(sent_at < ?), SUM(sent_at < ? AND status = 'success'),"
+            " AVG(CASE WHEN sent_at < ? AND status = 'success' THEN latency END),"
+            " SUM(sent_at >= ?), SUM(sent_at >= ? AND status = 'success'),"
+            " AVG(CASE WHEN sent_at >= ? AND status = 'success' THEN latency END)"
+            f" FROM executions {where} GROUP BY command", params)
+        found = []
+        for cmd, n_before, ok_before, lat_before, n_after, ok_after, lat_after in rows:
+            if not n_before or not n_after:
+                continue
+            rate_before, rate_after = ok_before / n_before, ok_after / n_after
+            slower = lat_before and lat_after and lat_after > lat_before * latency_factor
+            if rate_after < rate_before or slower:
+                found.append({
+                    "command": cmd,
+                    "success_before": rate_before, "success_after": rate_after,
+                    "latency_before": lat_before, "latency_after": lat_after,
+                })
+        return found
+
+
+_GOLDEN_TIMESTAMP_RE = re.compile(
+    r"\d{4}-\d\d-\d\d[T _]\d\d:\d\d(?::\d\d(?:[.,]\d+)?)?|\b\d\d:\d\d:\d\d(?:[.,]\d+)?\b")
+_GOLDEN_NUMBER_RE = re.compile(r"0[xX][0-9A-Fa-f]+|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+class GoldenBaseline:
+    """Golden-run fingerprints of command responses, one entry per command.
+
+    A response is normalized into a skeleton (timestamps dropped, decimal
+    numbers replaced by '#', whitespace collapsed) whose hash must match
+    exactly; the extracted numbers are then compared field by field with
+    tolerances from cfg["golden_tolerance"]:
+        {"abs": 0.0, "rel": 0.0, "fields": {"ATS49": {"0": {"abs": 0.5}, "*": {"rel": 0.05}}}}
+    Hex literals such as 0xFF0000 stay part of the skeleton.
+    """
+
+    def __init__(self, entries: Optional[dict[str, dict[str, Any]]] = None) -> None:
+        self.entries: dict[str, dict[str, Any]] = entries or {}
+
+    @staticmethod
+    def key(cmd_index: Optional[int], cmd: str) -> str:
+        return f"{'-' if cmd_index is None else cmd_index}:{cmd}"
+
+    @staticmethod
+    def fingerprint(text: str) -> dict[str, Any]:
+        """Return {'hash': skeleton digest, 'numbers': [...]} for a response."""
+        import hashlib
+
+        text = _GOLDEN_TIMESTAMP_RE.sub("T", text)
+        numbers: list[float] = []
+
+        def number(m: re.Match) -> str:
+            token = m.group(0)
+            if token[:2] in ("0x", "0X"):
+                return token.upper()
+            numbers.append(float(token))
+            return "#"
+
+        skeleton = " ".join(_GOLDEN_NUMBER_RE.sub(number, text).split())
+        digest = hashlib.blake2b(skeleton.encode("utf-8"), digest_size=12).hexdigest()
+        return {"hash": digest, "numbers": numbers}
+
+    def compare(self, key: str, cmd: str, fp: dict[str, Any], tolerance: dict[str, Any]) -> Optional[str]:
+        """Return None if the fingerprint matches the baseline, else a short reason."""
+        golden = self.entries.get(key)
+        if golden is None:
+            return None  # Command not part of the baseline
+        if golden["hash"] != fp["hash"]:
+            return "response text differs"
+        expected, actual = golden["numbers"], fp["numbers"]
+        if len(expected) != len(actual):
+            return "number of values differs"
+        fields = tolerance.get("fields", {})
+        per_cmd = fields.get(cmd) or fields.get(cmd.split("=", 1)[0]) or {}
+        default = per_cmd.get("*", tolerance)
+        for i, (want, got) in enumerate(zip(expected, actual)):
+            tol = per_cmd.get(str(i), default)
+            allowed = max(tol.get("abs", 0.0), tol.get("rel", 0.0) * abs(want))
+            if abs(got - want) > allowed:
+                return f"value #{i} is {got:g}, golden {want:g}"
+        return None
+
+    @classmethod
+    def load(cls, path: str) -> "GoldenBaseline":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, ensure_ascii=False)
+
+
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class RunReport:
+    """Per-command results of one run, collected as commands finish.
+
+    Written as JUnit XML (one testcase per command) and JSON, so CI tools can
+    ingest runs without parsing the text log.
+    """
+
+    def __init__(self, mode: str, profile: str, port: str, run_id: Optional[int] = None) -> None:
+        self.mode = mode
+        self.profile = profile
+        self.port = port
+        self.run_id = run_id
+        self.started = time.time()
+        self.ended: Optional[float] = None
+        self.cases: list[dict[str, Any]] = []
+
+    def add(self, cmd_index: Optional[int], cmd: str, status: str, latency: Optional[float],
+            response: str, sent_at: float) -> None:
+        self.cases.append({
+            "index": cmd_index,
+            "command": cmd,
+            "status": status,
+            "latency": latency,
+            "timeout": status == "timeout",
+            "response": response[:RESPONSE_EXCERPT],
+            "sent_at": sent_at,
+        })
+
+    def summary(self) -> dict[str, int]:
+        failed = sum(1 for c in self.cases if c["status"] != "success")
+        return {"tests": len(self.cases), "failures": failed, "passed": len(self.cases) - failed}
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "profile": self.profile,
+            "port": self.port,
+            "run_id": self.run_id,
+            "started": self.started,
+            "ended": self.ended,
+            "summary": self.summary(),
+            "cases": self.cases,
+        }
+
+    def to_junit(self) -> ET.ElementTree:
+        import xml.etree.ElementTree as ET
+
+        summary = self.summary()
+        duration = (self.ended or time.time()) - self.started
+        suites = ET.Element("testsuites", tests=str(summary["tests"]), failures=str(summary["failures"]),
+                            time=f"{duration:.3f}")
+        suite = ET.SubElement(suites, "testsuite", {
+            "name": f"myterm.{self.mode}",
+            "tests": str(summary["tests"]),
+            "failures": str(summary["failures"]),
+            "errors": "0",
+            "time": f"{duration:.3f}",
+            "timestamp": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+        })
+        props = ET.SubElement(suite, "properties")
+        for name, value in (("profile", self.profile), ("port", self.port), ("run_id", self.run_id)):
+            ET.SubElement(props, "property", name=name, value=str(value))
+        classname = os.path.splitext(self.profile)[0] or "myterm"
+        for case in self.cases:
+            num = "-" if case["index"] is None else case["index"] + 1
+            tc = ET.SubElement(suite, "testcase", classname=classname, name=f"#{num} {case['command']}",
+                               time=f"{case['latency'] or 0.0:.3f}")
+            if case["status"] == "timeout":
+                ET.SubElement(tc, "failure", type="timeout", message="no completion pattern before timeout")
+            elif case["status"] != "success":
+                ET.SubElement(tc, "failure", type=case["status"], message=f"status: {case['status']}")
+            if case["response"]:
+                ET.SubElement(tc, "system-out").text = _XML_INVALID_RE.sub("", case["response"])
+        return ET.ElementTree(suites)
+
+    def write(self, base_path: str) -> tuple[str, str]:
+        """Write <base>.xml and <base>.json; return both paths."""
+        self.ended = self.ended or time.time()
+        xml_path, json_path = f"{base_path}.xml", f"{base_path}.json"
+        self.to_junit().write(xml_path, encoding="utf-8", xml_declaration=True)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=1, ensure_ascii=False)
+        return xml_path, json_path
+
+
+CONTROL_PUMP_MS = 10  # How often the Tk thread handles queued control requests
+TRACE_MAX_EVENTS = 1_000_000
+# UI loop watchdog: heartbeat period, stall threshold (cfg: watchdog_stall_ms), history
+WATCHDOG_TICK_MS = 50
+WATCHDOG_STALL_MS = 250
+WATCHDOG_SAMPLE_MS = 50  # Main-thread stack sampling period while stalled
+WATCHDOG_LAG_SAMPLES = 4096
+WATCHDOG_STALLS = 200
+WATCHDOG_STACK_DEPTH = 12
+WATCHDOG_STATUS_MS = 1000
+
+
+class TraceRecorder:
+    """Buffered recorder of execution events in Chrome Trace Event format.
+
+    Events are kept as plain tuples in a bounded deque (oldest dropped) and
+    only turned into JSON on export; open the file in chrome://tracing or
+    Perfetto. Times are monotonic, in microseconds since the recorder started.
+    """
+
+    TRACKS = {"engine": 1, "io": 2, "ui": 3}
+
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS) -> None:
+        self.enabled = False
+        self.t0 = time.monotonic()
+        self.events: deque = deque(maxlen=max_events)
+
+    def instant(self, name: str, track: str = "engine", args: Optional[dict[str, Any]] = None) -> None:
+        if self.enabled:
+            self.events.append(("i", name, time.monotonic(), 0.0, track, args))
+
+    def span(self, name: str, start: float, end: Optional[float] = None, track: str = "engine",
+             args: Optional[dict[str, Any]] = None) -> None:
+        """Record a complete span between two time.monotonic() values."""
+        if self.enabled:
+            if end is None:
+                end = time.monotonic()
+            self.events.append(("X", name, start, end - start, track, args))
+
+    def clear(self) -> None:
+        self.events.clear()
+        self.t0 = time.monotonic()
+
+    def export(self, path: str) -> int:
+        """Write the buffered events as a Chrome trace JSON file; return the event count."""
+        t0 = self.t0
+        out: list[dict[str, Any]] = [
+            {"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": track}}
+            for track, tid in self.TRACKS.items()
+        ]
+        for ph, name, ts, dur, track, args in list(self.events):
+            ev: dict[str, Any] = {"ph": ph, "name": name, "pid": 1, "tid": self.TRACKS.get(track, 1),
+                                  "ts": round((ts - t0) * 1e6, 1)}
+            if ph == "X":
+                ev["dur"] = round(dur * 1e6, 1)
+            else:
+                ev["s"] = "t"
+            if args:
+                ev["args"] = args
+            out.append(ev)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+        return len(out)
+
+
+class LoopStall:
+    """One main-loop stall: when it started, how long it lasted, what ran."""
+
+    __slots__ = ("start", "end", "stacks")
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.end = start
+        self.stacks: dict[tuple[str, ...], int] = {}  # Collapsed stack -> sample count
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def top_stack(self) -> tuple[str, ...]:
+        return max(self.stacks, key=self.stacks.get) if self.stacks else ()
+
+
+class LoopWatchdog:
+    """Measures Tk main-loop latency and samples the main thread when it stalls.
+
+    The Tk thread calls beat() from an after() heartbeat and records how late
+    each beat was. A monitor thread watches the last beat time; once it is
+    older than the stall threshold it samples the main thread's Python stack
+    (sys._current_frames) until the loop beats again, so a hang can be traced
+    to the code that caused it. Create it on the Tk thread.
+    """
+
+    def __init__(self, stall_ms: float = WATCHDOG_STALL_MS, tick_ms: float = WATCHDOG_TICK_MS) -> None:
+        self.tick = tick_ms / 1000
+        self.stall = stall_ms / 1000
+        self.main_ident = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.lags: deque = deque(maxlen=WATCHDOG_LAG_SAMPLES)
+        self.stalls: deque = deque(maxlen=WATCHDOG_STALLS)
+        self.stall_count = 0
+        self.current: Optional[LoopStall] = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def beat(self) -> tuple[float, Optional[LoopStall]]:
+        """Record one heartbeat; returns its lag (s) and the stall it ended, if any."""
+        now = time.monotonic()
+        lag = max(0.0, now - self.last_beat - self.tick)
+        self.lags.append(lag)
+        with self.lock:
+            self.last_beat = now
+            ended, self.current = self.current, None
+        if ended is not None:
+            ended.end = now
+            self.stalls.append(ended)
+            self.stall_count += 1
+        return lag, ended
+
+    def _monitor(self) -> None:
+        import traceback
+
+        sample = WATCHDOG_SAMPLE_MS / 1000
+        while not self.stop_event.wait(sample):
+            with self.lock:
+                start = self.last_beat + self.tick
+                if time.monotonic() - start < self.stall:
+                    continue
+                if self.current is None:
+                    self.current = LoopStall(start)
+                stall = self.current
+            frame = sys._current_frames().get(self.main_ident)
+            if frame is None:
+                continue
+            stack = tuple(f"{os.path.basename(fs.filename)}:{fs.lineno} {fs.name}"
+                          for fs in traceback.extract_stack(frame)[-WATCHDOG_STACK_DEPTH:])
+            del frame
+            with self.lock:
+                if self.current is stall:
+                    stall.stacks[stack] = stall.stacks.get(stack, 0) + 1
+
+    def percentiles(self) -> dict[str, float]:
+        """Loop lag p50/p95/p99/max in milliseconds over the recent beats."""
+        lags = sorted(self.lags)
+        if not lags:
+            return {}
+        pct = {f"p{p}": _percentile(lags, p) * 1000 for p in (50, 95, 99)}
+        pct["max"] = lags[-1] * 1000
+        return pct
+
+    def report(self) -> str:
+        """Plain-text report: lag percentiles and each recorded stall with its stacks."""
+        pct = self.percentiles()
+        out = [f"# UI loop report {datetime.now().isoformat(timespec='seconds')}",
+               f"# heartbeat {self.tick * 1000:g} ms, stall threshold {self.stall * 1000:g} ms, "
+               f"{len(self.lags)} beats",
+               "lag " + "  ".join(f"{k} {v:.1f} ms" for k, v in pct.items()),
+               f"stalls: {self.stall_count} (last {len(self.stalls)} below)", ""]
+        wall = time.time() - time.monotonic()
+        for st in list(self.stalls):
+            when = datetime.fromtimestamp(st.start + wall).isoformat(timespec="milliseconds")
+            out.append(f"{when}  stall {st.duration * 1000:.0f} ms")
+            for stack, n in sorted(st.stacks.items(), key=lambda kv: -kv[1]):
+                out.append(f"  {n} sample{'s' if n != 1 else ''}:")
+                out.extend(f"    {line}" for line in stack)
+            out.append("")
+        return "\n".join(out)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def parse_socket_address(address: str) -> tuple[int, Any]:
+    """Parse 'unix:/path', 'tcp:host:port', 'host:port' or 'port' into (family, address)."""
+    import socket
+
+    if address.startswith("unix:"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not supported on this platform")
+        return socket.AF_UNIX, address[5:]
+    if address.startswith("tcp:"):
+        address = address[4:]
+    host, _, port = address.rpartition(":")
+    host = host or "127.0.0.1"
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        raise ValueError(f"refusing to listen on non-loopback address {host!r}")
+    return socket.AF_INET6 if host == "::1" else socket.AF_INET, (host, int(port))
+
+
+def open_listener(address: str) -> socket.socket:
+    """Create a listening socket for a local address (see parse_socket_address)."""
+    import socket
+
+    family, addr = parse_socket_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if family == getattr(socket, "AF_UNIX", None):
+        if os.path.exists(addr):
+            os.remove(addr)  # Stale socket from a previous session
+        sock.bind(addr)
+        os.chmod(addr, 0o600)
+    else:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(addr)
+    sock.listen(8)
+    return sock
+
+
+class _ControlClient:
+    """One connected control client: outgoing responses plus a bounded RX backlog."""
+
+    def __init__(self, sock: socket.socket, max_pending: int) -> None:
+        self.sock = sock
+        self.cond = threading.Condition()
+        self.out: list[bytes] = []
+        self.rx: deque = deque(maxlen=max_pending)
+        self.dropped = 0
+        self.subscribed = False
+        self.alive = True
+
+
+class ControlServer:
+    """Line-delimited JSON-RPC 2.0 server for driving the terminal from scripts.
+
+    Socket I/O runs on worker threads. Requests are queued for the Tk thread,
+    which handles them in pump(); RX lines go to subscribed clients as batched
+    'rx' notifications, so a slow client only loses its own backlog.
+    """
+
+    FLUSH_INTERVAL = 0.02
+    MAX_PENDING = 10000
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.listener = open_listener(address)
+        self.requests: queue.Queue = queue.Queue()
+        # clients/subscribers change on the accept and reader threads; guarded by lock
+        self.lock = threading.Lock()
+        self.clients: list[_ControlClient] = []
+        self.subscribers = 0
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="control-accept", daemon=True).start()
+
+    def _accept_loop(self) -> None:
+        while self.running:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            client = _ControlClient(sock, self.MAX_PENDING)
+            with self.lock:
+                self.clients.append(client)
+            threading.Thread(target=self._reader, args=(client,), name="control-reader", daemon=True).start()
+            threading.Thread(target=self._writer, args=(client,), name="control-writer", daemon=True).start()
+
+    def _reader(self, client: _ControlClient) -> None:
+        try:
+            with client.sock.makefile("rb") as f:
+                for raw in f:
+                    if raw.strip():
+                        self.requests.put((client, raw))
+        except OSError:
+            pass
+        self._drop(client)
+
+    def _writer(self, client: _ControlClient) -> None:
+        while True:
+            with client.cond:
+                while client.alive and not client.out and not client.rx:
+                    client.cond.wait()
+                if not client.alive:
+                    return
+                out, client.out = client.out, []
+                lines = list(client.rx)
+                client.rx.clear()
+                dropped, client.dropped = client.dropped, 0
+            if lines:
+                params: dict[str, Any] = {"lines": lines}
+                if dropped:
+                    params["dropped"] = dropped
+                out.append(self._encode({"jsonrpc": "2.0", "method": "rx", "params": params}))
+            try:
+                client.sock.sendall(b"".join(out))
+            except OSError:
+                self._drop(client)
+                return
+            if lines:
+                time.sleep(self.FLUSH_INTERVAL)  # Let the next RX batch accumulate
+
+    @staticmethod
+    def _encode(msg: dict[str, Any]) -> bytes:
+        return json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _drop(self, client: _ControlClient) -> None:
+        with client.cond:
+            if not client.alive:
+                return
+            client.alive = False
+            client.cond.notify()
+        with self.lock:
+            if client.subscribed:
+                client.subscribed = False
+                self.subscribers -= 1
+            if client in self.clients:
+                self.clients.remove(client)
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+
+    def _reply(self, client: _ControlClient, msg: dict[str, Any]) -> None:
+        with client.cond:
+            client.out.append(self._encode(msg))
+            client.cond.notify()
+
+    def pump(self, handler: Callable[[str, dict[str, Any]], Any], limit: int = 500) -> int:
+        """Handle queued requests on the calling (Tk) thread; return how many were handled."""
+        handled = 0
+        while handled < limit:
+            try:
+                client, raw = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            handled += 1
+            req_id = None
+            try:
+                req = json.loads(raw)
+                req_id = req.get("id")
+                method = req["method"]
+                params = req.get("params") or {}
+                if not isinstance(params, dict):
+                    raise ControlError(-32602, "params must be an object")
+            except (ValueError, KeyError, AttributeError):
+                self._reply(client, {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32700, "message": "parse error"}})
+                continue
+            except ControlError as e:
+                self._reply(client, {"jsonrpc": "2.0", "id": req_id, "error": {"code": e.code, "message": str(e)}})
+                continue
+            try:
+                if method == "subscribe":
+                    with self.lock:
+                        if not client.subscribed and client.alive:
+                            client.subscribed = True
+                            self.subscribers += 1
+                    result: Any = True
+                elif method == "unsubscribe":
+                    with self.lock:
+                        if client.subscribed:
+                            client.subscribed = False
+                            self.subscribers -= 1
+                    result = True
+                else:
+                    result = handler(method, params)
+            except ControlError as e:
+                error = {"code": e.code, "message": str(e)}
+                if req_id is not None:
+                    self._reply(client, {"jsonrpc": "2.0", "id": req_id, "error": error})
+                continue
+            except Exception as e:
+                if req_id is not None:
+                    self._reply(client, {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32000, "message": str(e)}})
+                continue
+            if req_id is not None:  # Requests without an id are notifications
+                self._reply(client, {"jsonrpc": "2.0", "id": req_id, "result": result})
+        return handled
+
+    def publish(self, line: str) -> None:
+        """Queue one RX line for every subscribed client."""
+        for client in self._subscribed():
+            with client.cond:
+                if len(client.rx) == self.MAX_PENDING:
+                    client.dropped += 1
+                client.rx.append(line)
+                client.cond.notify()
+
+    def _subscribed(self) -> list[_ControlClient]:
+        with self.lock:
+            return [c for c in self.clients if c.subscribed]
+
+    def notify(self, method: str, params: dict[str, Any]) -> None:
+        """Send a notification (e.g. run_finished) to every subscribed client."""
+        msg = {"jsonrpc": "2.0", "method": method, "params": params}
+        for client in self._subscribed():
+            self._reply(client, msg)
+
+    def close(self) -> None:
+        self.running = False
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            self._drop(client)
+        _, addr = parse_socket_address(self.address)
+        if isinstance(addr, str) and os.path.exists(addr):  # Unix socket path
+            os.remove(addr)
+
+
+class ControlError(Exception):
+    """JSON-RPC error raised by a control method handler."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+SHARE_RING_BYTES = 1 << 20  # Per-client RX backlog before the oldest bytes are dropped
+
+
+class ByteRing:
+    """Fixed-capacity byte ring buffer that drops the oldest bytes on overflow."""
+
+    def __init__(self, capacity: int) -> None:
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def write(self, data: bytes) -> None:
+        n = len(data)
+        cap = self.capacity
+        if n >= cap:
+            self.dropped += self.size + n - cap
+            self.buf[:] = data[n - cap:]
+            self.start, self.size = 0, cap
+            return
+        overflow = self.size + n - cap
+        if overflow > 0:
+            self.dropped += overflow
+            self.start = (self.start + overflow) % cap
+            self.size -= overflow
+        end = (self.start + self.size) % cap
+        first = min(n, cap - end)
+        self.view[end:end + first] = data[:first]
+        if first < n:
+            self.view[:n - first] = data[first:]
+        self.size += n
+
+    def read_all(self) -> bytes:
+        """Remove and return everything buffered."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            out = bytes(self.view[self.start:end])
+        else:
+            out = bytes(self.view[self.start:]) + bytes(self.view[:end - self.capacity])
+        self.start = self.size = 0
+        return out
+
+
+class _ShareClient:
+    def __init__(self, sock: socket.socket, ring_bytes: int) -> None:
+        self.sock = sock
+        self.cond = threading.Condition()
+        self.ring = ByteRing(ring_bytes)
+        self.alive = True
+
+
+class PortShareServer:
+    """Shares the open serial port with local clients (e.g. pyserial socket://).
+
+    Every client gets the raw RX stream through its own bounded ring, drained
+    by a per-client sender thread, so a slow client loses its oldest bytes
+    instead of stalling the device. Client writes go into one arbiter queue
+    that the Tk thread forwards to the backend in arrival order.
+    """
+
+    def __init__(self, address: str, ring_bytes: int = SHARE_RING_BYTES) -> None:
+        self.address = address
+        self.ring_bytes = ring_bytes
+        self.listener = open_listener(address)
+        self.clients: list[_ShareClient] = []
+        self.lock = threading.Lock()  # Guards clients: accept/drop threads vs the Tk thread
+        self.tx: queue.Queue = queue.Queue()
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="share-accept", daemon=True).start()
+
+    def _accept_loop(self) -> None:
+        import socket
+
+        while self.running:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            if sock.family != getattr(socket, "AF_UNIX", None):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _ShareClient(sock, self.ring_bytes)
+            with self.lock:
+                self.clients.append(client)
+            threading.Thread(target=self._reader, args=(client,), name="share-reader", daemon=True).start()
+            threading.Thread(target=self._sender, args=(client,), name="share-sender", daemon=True).start()
+
+    def _reader(self, client: _ShareClient) -> None:
+        while True:
+            try:
+                data = client.sock.recv(4096)
+            except OSError:
+                data = b""
+            if not data:
+                self._drop(client)
+                return
+            self.tx.put(data)
+
+    def _sender(self, client: _ShareClient) -> None:
+        while True:
+            with client.cond:
+                while client.alive and not client.ring.size:
+                    client.cond.wait()
+                if not client.alive:
+                    return
+                data = client.ring.read_all()
+            try:
+                client.sock.sendall(data)
+            except OSError:
+                self._drop(client)
+                return
+
+    def _drop(self, client: _ShareClient) -> None:
+        with client.cond:
+            if not client.alive:
+                return
+            client.alive = False
+            client.cond.notify()
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def _snapshot(self) -> list[_ShareClient]:
+        with self.lock:
+            return list(self.clients)
+
+    def publish(self, data: bytes) -> None:
+        """Fan raw RX bytes out to every client's ring."""
+        for client in self._snapshot():
+            with client.cond:
+                client.ring.write(data)
+                client.cond.notify()
+
+    def drain_tx(self, write: Callable[[bytes], None], limit: int = 256) -> int:
+        """Forward queued client writes to the device; return the chunk count."""
+        n = 0
+        while n < limit:
+            try:
+                data = self.tx.get_nowait()
+            except queue.Empty:
+                break
+            write(data)
+            n += 1
+        return n
+
+    def dropped(self) -> int:
+        return sum(c.ring.dropped for c in self._snapshot())
+
+    def close(self) -> None:
+        self.running = False
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        for client in self._snapshot():
+            self._drop(client)
+        _, addr = parse_socket_address(self.address)
+        if isinstance(addr, str) and os.path.exists(addr):  # Unix socket path
+            os.remove(addr)
+
+
+# Status refresh interval while a file transfer runs
+FILE_SEND_TICK_MS = 250
+
+# Line terminator per EOL mode for line-by-line file sends
+FILE_SEND_EOL = {"none": b"\r", "add_n": b"\n", "add_rn": b"\r\n"}
+
+XON, XOFF = 0x11, 0x13
+
+
+class FileSender:
+    """Streams a file to the device from a worker thread.
+
+    Units are lines (with `line_ending` appended) or fixed-size chunks, paced
+    by `delay` seconds. With wait="echo" each unit must come back verbatim
+    (checked by CRC32) and with wait="prompt" the prompt must appear before
+    the next unit; a timeout or mismatch resends the unit up to `retries`
+    times. In-band XOFF/XON from the device pauses and resumes the stream.
+    RX reaches the worker through feed(), called from the Tk thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        write: Callable[[bytes], None],
+        mode: str = "line",
+        chunk_size: int = 256,
+        delay: float = 0.0,
+        wait: str = "none",
+        prompt: str = "",
+        timeout: float = 2.0,
+        retries: int = 3,
+        line_ending: bytes = b"\r",
+    ) -> None:
+        self.path = path
+        self.write = write
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size)
+        self.delay = delay
+        self.wait = wait
+        self.prompt = prompt.encode()
+        self.timeout = timeout
+        self.retries = retries
+        self.line_ending = line_ending
+        self.total = os.path.getsize(path)
+        self.sent = 0
+        self.units = 0
+        self.retried = 0
+        self.tx_crc = 0
+        self.echo_crc = 0
+        self.error: Optional[str] = None
+        self.done = False
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.cancelled = threading.Event()
+        self.rx = bytearray()
+        self.rx_cond = threading.Condition()
+        self.xoff = False
+        self.thread = threading.Thread(target=self._run, name="file-send", daemon=True)
+        self.thread.start()
+
+    def feed(self, data: bytes) -> None:
+        """Hand received bytes to the worker (echo/prompt matching, XON/XOFF)."""
+        with self.rx_cond:
+            if XOFF in data or XON in data:
+                last = max(data.rfind(bytes((XOFF,))), data.rfind(bytes((XON,))))
+                self.xoff = data[last] == XOFF
+            if self.wait != "none":
+                self.rx += data
+            self.rx_cond.notify()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        with self.rx_cond:
+            self.rx_cond.notify()
+
+    def _units(self):
+        with open(self.path, "rb") as f:
+            if self.mode == "line":
+                for line in f:
+                    yield line.rstrip(b"\r\n"), len(line)
+            else:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk, len(chunk)
+
+    def _await(self, unit: bytes, deadline: float) -> Optional[bytes]:
+        """Return the unit's echo (b"" for a prompt); None on timeout or cancel."""
+        with self.rx_cond:
+            while not self.cancelled.is_set():
+                if self.wait == "prompt":
+                    pos = self.rx.find(self.prompt)
+                    if pos >= 0:
+                        del self.rx[:pos + len(self.prompt)]
+                        return b""
+                elif self.mode == "line":
+                    pos = self.rx.find(b"\n") if b"\n" in self.rx else self.rx.find(b"\r")
+                    if pos >= 0:
+                        echo = bytes(self.rx[:pos]).rstrip(b"\r")
+                        del self.rx[:pos + 1]
+                        if not echo.strip() and unit.strip():
+                            continue  # Stray blank line; a blank unit's echo is one
+                        # Tolerate a device prefix such as a prompt before the echo
+                        return echo[-len(unit):] if unit else b""
+                elif len(self.rx) >= len(unit):
+                    echo = bytes(self.rx[:len(unit)])
+                    del self.rx[:len(unit)]
+                    return echo
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                self.rx_cond.wait(left)
+        return None
+
+    def _wait_xon(self) -> None:
+        with self.rx_cond:
+            while self.xoff and not self.cancelled.is_set():
+                self.rx_cond.wait(0.1)
+
+    def _run(self) -> None:
+        try:
+            next_at = time.monotonic()
+            for unit, size in self._units():
+                payload = unit + self.line_ending if self.mode == "line" else unit
+                for attempt in range(self.retries + 1):
+                    if self.cancelled.is_set():
+                        self.error = "cancelled"
+                        return
+                    self._wait_xon()
+                    pause = next_at - time.monotonic()
+                    if pause > 0:
+                        time.sleep(pause)
+                    if self.wait != "none":
+                        with self.rx_cond:
+                            self.rx.clear()
+                    self.write(payload)
+                    next_at = time.monotonic() + self.delay
+                    if self.wait == "none":
+                        break
+                    echo = self._await(unit, time.monotonic() + self.timeout)
+                    if echo is not None and (self.wait == "prompt" or zlib.crc32(echo) == zlib.crc32(unit)):
+                        self.echo_crc = zlib.crc32(echo, self.echo_crc)
+                        break
+                    if attempt == self.retries:
+                        reason = "timeout" if echo is None else "echo mismatch"
+                        self.error = f"{reason} at unit {self.units + 1} after {self.retries} retries"
+                        return
+                    self.retried += 1
+                self.tx_crc = zlib.crc32(unit, self.tx_crc)
+                self.sent += size
+                self.units += 1
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self.finished = time.monotonic()
+            self.done = True
+
+    def progress(self) -> dict[str, Any]:
+        """Bytes sent, rate, ETA and retries so far."""
+        elapsed = (self.finished or time.monotonic()) - self.started
+        rate = self.sent / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.sent) / rate if rate > 0 else None
+        return {
+            "sent": self.sent, "total": self.total, "units": self.units,
+            "rate": rate, "eta": eta, "retries": self.retried, "elapsed": elapsed,
+        }
+
+    def echo_verified(self) -> Optional[bool]:
+        """Whether the echoed data's CRC32 matches what was sent (echo mode only)."""
+        if self.wait != "echo":
+            return None
+        return self.echo_crc == self.tx_crc
+
+
+# XMODEM/YMODEM control bytes
+SOH, STX, EOT, ACK, NAK, CAN, CRC_REQ, SUB = 0x01, 0x02, 0x04, 0x06, 0x15, 0x18, 0x43, 0x1A
+MODEM_RETRIES = 10
+MODEM_START_TIMEOUT = 60.0
+MODEM_TICK_MS = 250
+
+
+class ModemError(Exception):
+    """Raised when an XMODEM/YMODEM transfer fails or is cancelled."""
+
+
+class ModemTransfer:
+    """XMODEM-1K / YMODEM send or receive on a worker thread.
+
+    Works on the raw pyserial object while the backend is suspended. One
+    packet buffer is allocated up front and every block is read, checked
+    (binascii.crc_hqx, i.e. CRC-16/XMODEM) and written through memoryview
+    slices of it. Receiving YMODEM writes the sender's files into `path`
+    as a directory; receiving XMODEM writes `path` and keeps SUB padding.
+    """
+
+    def __init__(self, ser: Any, direction: str, protocol: str, path: str) -> None:
+        self.ser = ser
+        self.direction = direction
+        self.ymodem = protocol == "ymodem"
+        self.path = path
+        self.total = os.path.getsize(path) if direction == "send" else 0
+        self.bytes_done = 0
+        self.blocks = 0
+        self.retries = 0
+        self.files: list[str] = []
+        self.error: Optional[str] = None
+        self.done = False
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.cancelled = threading.Event()
+        self.pkt = bytearray(3 + 1024 + 2)
+        self.mv = memoryview(self.pkt)
+        self.pad = bytes((SUB,)) * 1024
+        self.thread = threading.Thread(target=self._run, name="modem", daemon=True)
+        self.thread.start()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def progress(self) -> dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "bytes": self.bytes_done, "total": self.total, "blocks": self.blocks,
+            "retries": self.retries, "elapsed": elapsed,
+            "rate": self.bytes_done / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _run(self) -> None:
+        old_timeout = self.ser.timeout
+        self.ser.timeout = 0.1
+        try:
+            self.ser.reset_input_buffer()
+            if self.direction == "send":
+                self._send()
+            elif self.ymodem:
+                self._recv_batch()
+            else:
+                with open(self.path, "wb") as out:
+                    self._recv_data(out)
+                self.files.append(self.path)
+        except ModemError as e:
+            self.error = str(e)
+            if self.cancelled.is_set():
+                self._abort()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._abort()
+        finally:
+            self.ser.timeout = old_timeout
+            self.finished = time.monotonic()
+            self.done = True
+
+    # -- byte I/O -------------------------------------------------------
+
+    def _check_cancel(self) -> None:
+        if self.cancelled.is_set():
+            raise ModemError("cancelled")
+
+    def _getc(self, timeout: float) -> Optional[int]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._check_cancel()
+            b = self.ser.read(1)
+            if b:
+                return b[0]
+        return None
+
+    def _read_into(self, view: memoryview, timeout: float) -> bool:
+        pos, n = 0, len(view)
+        deadline = time.monotonic() + timeout
+        while pos < n:
+            if time.monotonic() >= deadline:
+                return False
+            chunk = self.ser.read(n - pos)
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        return True
+
+    def _purge(self) -> None:
+        """Drain line noise until the line is quiet."""
+        while self.ser.read(1024):
+            pass
+
+    def _abort(self) -> None:
+        try:
+            self.ser.write(bytes((CAN, CAN, CAN)))
+        except Exception:
+            pass
+
+    # -- sending --------------------------------------------------------
+
+    def _wait_start(self) -> bool:
+        """Wait for the receiver: True for CRC mode, False for checksum mode."""
+        deadline = time.monotonic() + MODEM_START_TIMEOUT
+        while time.monotonic() < deadline:
+            c = self._getc(1.0)
+            if c == CRC_REQ:
+                return True
+            if c == NAK and not self.ymodem:
+                return False
+            if c == CAN and self._getc(1.0) == CAN:
+                raise ModemError("cancelled by receiver")
+        raise ModemError("receiver did not start")
+
+    def _frame(self, seq: int, size: int, crc: bool) -> memoryview:
+        pkt = self.pkt
+        pkt[0] = STX if size == 1024 else SOH
+        pkt[1] = seq & 0xFF
+        pkt[2] = 0xFF - pkt[1]
+        body = self.mv[3:3 + size]
+        if crc:
+            c = binascii.crc_hqx(body, 0)
+            pkt[3 + size] = c >> 8
+            pkt[4 + size] = c & 0xFF
+            return self.mv[:5 + size]
+        pkt[3 + size] = sum(body) & 0xFF
+        return self.mv[:4 + size]
+
+    def _send_frame(self, frame: memoryview) -> None:
+        for _ in range(MODEM_RETRIES):
+            self.ser.write(frame)
+            c = self._getc(10.0)
+            if c == ACK:
+                self.blocks += 1
+                return
+            if c == CAN and self._getc(1.0) == CAN:
+                raise ModemError("cancelled by receiver")
+            self.retries += 1
+        raise ModemError(f"block {self.pkt[1]}: no ACK after {MODEM_RETRIES} tries")
+
+    def _send_header(self, header: bytes, crc: bool) -> None:
+        """Send YMODEM block 0 (file name and size, or empty to end the batch)."""
+        self.pkt[3:3 + 128] = header.ljust(128, b"\0")[:128]
+        self._send_frame(self._frame(0, 128, crc))
+
+    def _send(self) -> None:
+        crc = self._wait_start()
+        name = os.path.basename(self.path)
+        with open(self.path, "rb") as f:
+            if self.ymodem:
+                self._send_header(f"{name}\0{self.total}".encode(), crc)
+                crc = self._wait_start()
+            seq = 1
+            while True:
+                n = f.readinto(self.mv[3:3 + 1024])
+                if not n:
+                    break
+                size = 1024 if n > 128 else 128
+                self.pkt[3 + n:3 + size] = self.pad[:size - n]
+                self._send_frame(self._frame(seq, size, crc))
+                self.bytes_done += n
+                seq += 1
+        for _ in range(MODEM_RETRIES):
+            self.ser.write(bytes((EOT,)))
+            if self._getc(10.0) == ACK:
+                break
+            self.retries += 1
+        else:
+            raise ModemError("EOT not acknowledged")
+        if self.ymodem:
+            self._send_header(b"", self._wait_start())
+        self.files.append(self.path)
+
+    # -- receiving ------------------------------------------------------
+
+    def _recv_packet(self, start: bool) -> tuple[int, int]:
+        """Return (seq, size) of the next valid packet, or (-1, 0) for EOT."""
+        poke: Optional[int] = CRC_REQ if start else None
+        for _ in range(MODEM_RETRIES):
+            if poke is not None:
+                self.ser.write(bytes((poke,)))
+            c = self._getc(3.0 if start else 10.0)
+            poke = CRC_REQ if start else NAK
+            if c == EOT:
+                return -1, 0
+            if c == CAN and self._getc(1.0) == CAN:
+                raise ModemError("cancelled by sender")
+            if c not in (SOH, STX):
+                if c is not None:
+                    self._purge()
+                self.retries += 1
+                continue
+            size = 1024 if c == STX else 128
+            pkt = self.pkt
+            if (self._read_into(self.mv[1:5 + size], 1.0)
+                    and pkt[1] + pkt[2] == 0xFF
+                    and binascii.crc_hqx(self.mv[3:3 + size], 0) == (pkt[3 + size] << 8 | pkt[4 + size])):
+                return pkt[1], size
+            self._purge()
+            self.retries += 1
+        raise ModemError(f"no valid packet after {MODEM_RETRIES} tries")
+
+    def _recv_data(self, out: Any) -> int:
+        """Receive data blocks up to EOT into a file; return bytes written."""
+        expected, start, eot_seen, written = 1, True, False, 0
+        while True:
+            seq, size = self._recv_packet(start)
+            if seq < 0:
+                if self.ymodem and not eot_seen:
+                    # YMODEM senders expect the first EOT to be NAKed
+                    eot_seen = True
+                    self.ser.write(bytes((NAK,)))
+                    start = False
+                    continue
+                self.ser.write(bytes((ACK,)))
+                return written
+            if seq == expected & 0xFF:
+                out.write(self.mv[3:3 + size])
+                written += size
+                self.bytes_done += size
+                self.blocks += 1
+                expected += 1
+                start = False
+            elif seq != (expected - 1) & 0xFF:
+                raise ModemError(f"sequence error: got block {seq}, expected {expected & 0xFF}")
+            self.ser.write(bytes((ACK,)))
+
+    def _recv_batch(self) -> None:
+        while True:
+            seq, size = self._recv_packet(True)
+            if seq != 0:
+                raise ModemError("expected YMODEM header block")
+            name, _, rest = bytes(self.mv[3:3 + size]).partition(b"\0")
+            self.ser.write(bytes((ACK,)))
+            if not name:
+                return
+            fields = rest.split(b"\0", 1)[0].split()
+            length = int(fields[0]) if fields and fields[0].isdigit() else None
+            self.total += length or 0
+            target = os.path.join(self.path, os.path.basename(name.decode(errors="replace")))
+            with open(target, "wb") as out:
+                self._recv_data(out)
+                if length is not None:
+                    out.truncate(length)
+            self.files.append(target)
+
+
+# Binary framing: largest accepted frame, rows kept for the frame view, view refresh
+FRAME_MAX = 4096
+FRAME_ROWS = 2000
+FRAME_TICK_MS = 100
+FRAME_KINDS = ("cobs", "slip", "length")
+FRAME_CRC_SIZES = {"none": 0, "crc16": 2, "crc32": 4}
+_SLIP_END, _SLIP_ESC = 0xC0, 0xDB
+
+
+class FrameDecoder:
+    """Splits a raw RX byte stream into binary frames.
+
+    kind is "cobs" (0x00-delimited), "slip" (0xC0-delimited) or "length"
+    (little-endian length prefix of `length_bytes`). With crc="crc16"
+    (CRC-16/CCITT, init 0xFFFF) or "crc32" each frame ends in a
+    little-endian checksum of its payload. Bytes accumulate in one
+    bytearray; delimiters are located with bytearray.find and frames sliced
+    through a memoryview, so work is per frame rather than per byte.
+    """
+
+    def __init__(self, kind: str, crc: str = "none", length_bytes: int = 2, max_frame: int = FRAME_MAX) -> None:
+        if kind not in FRAME_KINDS:
+            raise ValueError(f"unknown framing: {kind}")
+        self.kind = kind
+        self.crc = crc
+        self.crc_size = FRAME_CRC_SIZES[crc]
+        self.header = struct.Struct({1: "<B", 2: "<H", 4: "<I"}[length_bytes])
+        self.max_frame = max_frame
+        self.buf = bytearray()
+        self.pos = 0
+        self.frames = 0
+        self.errors = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Append RX bytes and return the payloads of every completed frame."""
+        self.buf += data
+        out: list[bytes] = []
+        with memoryview(self.buf) as mv:
+            if self.kind == "length":
+                self._scan_length(mv, out)
+            else:
+                self._scan_delimited(mv, out)
+        if self.pos == len(self.buf):
+            self.buf.clear()
+            self.pos = 0
+        elif self.pos > self.max_frame:
+            del self.buf[:self.pos]
+            self.pos = 0
+        if len(self.buf) - self.pos > 2 * self.max_frame + self.header.size:
+            # No frame boundary in sight: drop the backlog and resynchronise
+            self.errors += 1
+            self.buf.clear()
+            self.pos = 0
+        return out
+
+    def _accept(self, payload: Optional[bytes], out: list[bytes]) -> bool:
+        k = self.crc_size
+        if payload is None or len(payload) < k:
+            self.errors += 1
+            return False
+        if k:
+            body = payload[:-k]
+            want = int.from_bytes(payload[-k:], "little")
+            got = binascii.crc_hqx(body, 0xFFFF) if k == 2 else zlib.crc32(body)
+            if got != want:
+                self.errors += 1
+                return False
+            payload = body
+        self.frames += 1
+        out.append(payload)
+        return True
+
+    def _scan_delimited(self, mv: memoryview, out: list[bytes]) -> None:
+        delim = 0 if self.kind == "cobs" else _SLIP_END
+        decode = self._cobs if self.kind == "cobs" else self._slip
+        buf = self.buf
+        while True:
+            end = buf.find(delim, self.pos)
+            if end < 0:
+                return
+            if end > self.pos:
+                self._accept(decode(mv[self.pos:end]), out)
+            self.pos = end + 1
+
+    def _scan_length(self, mv: memoryview, out: list[bytes]) -> None:
+        hsize, k, avail = self.header.size, self.crc_size, len(self.buf)
+        while avail - self.pos >= hsize:
+            n = self.header.unpack_from(mv, self.pos)[0]
+            total = hsize + n + k
+            if n > self.max_frame:
+                self.errors += 1
+                self.pos += 1
+                continue
+            if avail - self.pos < total:
+                return
+            if self._accept(mv[self.pos + hsize:self.pos + total].tobytes(), out):
+                self.pos += total
+            elif k:
+                self.pos += 1  # Bad checksum: slide one byte to find the next header
+            else:
+                self.pos += total
+
+    @staticmethod
+    def _cobs(mv: memoryview) -> Optional[bytes]:
+        out = bytearray()
+        i, n = 0, len(mv)
+        while i < n:
+            code = mv[i]
+            end = i + code
+            if code == 0 or end > n:
+                return None
+            out += mv[i + 1:end]
+            i = end
+            if code < 0xFF and i < n:
+                out.append(0)
+        return bytes(out)
+
+    @staticmethod
+    def _slip(mv: memoryview) -> bytes:
+        frame = mv.tobytes()
+        if _SLIP_ESC in frame:
+            frame = frame.replace(b"\xdb\xdc", b"\xc0").replace(b"\xdb\xdd", b"\xdb")
+        return frame
+
+
+class FrameLayouts:
+    """Struct layouts per message type for decoded frames.
+
+    cfg["frame_layouts"] maps a type id (the payload byte at type_offset) to
+    {"name": ..., "format": struct format, "fields": [names]}; formats are
+    compiled once.
+    """
+
+    def __init__(self, layouts: dict[str, dict[str, Any]], type_offset: int = 0) -> None:
+        self.type_offset = type_offset
+        self.layouts: dict[int, tuple[str, struct.Struct, list[str]]] = {}
+        for key, spec in layouts.items():
+            try:
+                st = struct.Struct(spec["format"])
+            except (KeyError, struct.error) as e:
+                raise ValueError(f"frame layout {key}: {e}") from e
+            self.layouts[int(key, 0)] = (spec.get("name", key), st, list(spec.get("fields", [])))
+
+    def describe(self, payload: bytes) -> tuple[str, str]:
+        """Return (type name, field text) for a frame payload."""
+        if len(payload) <= self.type_offset:
+            return "", payload.hex(" ")
+        msg_type = payload[self.type_offset]
+        layout = self.layouts.get(msg_type)
+        if layout is None or len(payload) < layout[1].size:
+            return f"0x{msg_type:02X}", payload.hex(" ")
+        name, st, fields = layout
+        values = st.unpack_from(payload)
+        names = fields or [f"f{i}" for i in range(len(values))]
+        return name, " ".join(f"{k}={v}" for k, v in zip(names, values))
+
+
+class FrameView:
+    """Rows of decoded frames; new rows are described and inserted in batches each tick."""
+
+    COLUMNS = ("#", "Time", "Type", "Len", "Fields")
+
+    def __init__(self, app: "App") -> None:
+        self.app = app
+        self.shown = 0
+        self.after_id: Optional[str] = None
+        framing = app.cfg.get("framing", {})
+
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Binary Frames")
+        self.win.geometry("820x420")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        top = ttk.Frame(self.win)
+        top.pack(fill="x", padx=8, pady=4)
+        ttk.Label(top, text="Framing:").pack(side="left")
+        self.kind_var = tk.StringVar(value=framing.get("kind", "off") if app.framer else "off")
+        ttk.Combobox(top, textvariable=self.kind_var, values=["off", *FRAME_KINDS],
+                     state="readonly", width=8).pack(side="left", padx=4)
+        ttk.Label(top, text="CRC:").pack(side="left")
+        self.crc_var = tk.StringVar(value=framing.get("crc", "none"))
+        ttk.Combobox(top, textvariable=self.crc_var, values=list(FRAME_CRC_SIZES),
+                     state="readonly", width=7).pack(side="left", padx=4)
+        ttk.Button(top, text="Apply", command=self._apply).pack(side="left", padx=4)
+        self.stats_label = ttk.Label(top, text="")
+        self.stats_label.pack(side="right")
+
+        self.tree = ttk.Treeview(self.win, columns=self.COLUMNS, show="headings")
+        for col, width in zip(self.COLUMNS, (60, 90, 90, 50, 500)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor="w", stretch=col == "Fields")
+        self.tree.pack(fill="both", expand=True, padx=8, pady=4)
+        self._tick()
+
+    def _apply(self) -> None:
+        framing = dict(self.app.cfg.get("framing", {}))
+        framing.update(kind=self.kind_var.get(), crc=self.crc_var.get())
+        self.app.set_framing(framing)
+
+    def _tick(self) -> None:
+        self.after_id = self.win.after(FRAME_TICK_MS, self._tick)
+        rows, seq = self.app.frame_rows, self.app.frame_seq
+        new = min(seq - self.shown, len(rows))
+        describe = self.app.frame_layouts.describe
+        for i in range(len(rows) - new, len(rows)):
+            n, ts, payload = rows[i]
+            name, text = describe(payload)
+            self.tree.insert("", "end", values=(n, ts, name, len(payload), text))
+        self.shown = seq
+        children = self.tree.get_children()
+        if len(children) > FRAME_ROWS:
+            self.tree.delete(*children[:len(children) - FRAME_ROWS])
+        if new:
+            self.tree.see(self.tree.get_children()[-1])
+        framer = self.app.framer
+        if framer is not None:
+            self.stats_label.config(text=f"frames {framer.frames}  errors {framer.errors}")
+        else:
+            self.stats_label.config(text="framing off")
+
+    def lift(self) -> None:
+        self.win.deiconify()
+        self.win.lift()
+
+    def close(self) -> None:
+        if self.after_id is not None:
+            self.win.after_cancel(self.after_id)
+        self.win.destroy()
+
+
+# Raw byte history kept per direction for the hex dump (cfg: raw_capture_bytes)
+RAW_CAPTURE_BYTES = 16 << 20
+HEX_ROW = 16
+HEX_TICK_MS = 200
+HEX_LABEL_MS = 200
+HEX_LABEL_BYTES = 64
+_HEX_ASCII = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
+
+
+class RawCapture:
+    """Raw bytes of one direction: a bytearray arena plus a chunk time index.
+
+    Offsets are absolute (bytes since capture start), so they stay valid
+    while the oldest quarter is trimmed once `limit` is exceeded. Appends may
+    come from worker threads.
+    """
+
+    def __init__(self, limit: int = RAW_CAPTURE_BYTES) -> None:
+        self.limit = limit
+        self.data = bytearray()
+        self.base = 0
+        self.starts = array("Q")
+        self.times = array("d")
+        self.lock = threading.Lock()
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.data)
+
+    def append(self, chunk: bytes, t: Optional[float] = None) -> None:
+        with self.lock:
+            self.starts.append(self.end)
+            self.times.append(time.time() if t is None else t)
+            self.data += chunk
+            if len(self.data) > self.limit:
+                cut = len(self.data) - self.limit * 3 // 4
+                del self.data[:cut]
+                self.base += cut
+                k = bisect.bisect_right(self.starts, self.base) - 1
+                if k > 0:
+                    del self.starts[:k]
+                    del self.times[:k]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.base = self.end
+            self.data.clear()
+            del self.starts[:]
+            del self.times[:]
+
+    def read(self, start: int, n: int) -> bytes:
+        with self.lock:
+            lo = max(0, start - self.base)
+            return bytes(self.data[lo:max(lo, start + n - self.base)])
+
+    def find(self, needle: bytes, start: int) -> int:
+        """Absolute offset of the next occurrence at or after start, or -1."""
+        with self.lock:
+            pos = self.data.find(needle, max(0, start - self.base))
+            return -1 if pos < 0 else self.base + pos
+
+    def offset_at(self, t: float) -> int:
+        """Offset of the first chunk received at or after time t."""
+        with self.lock:
+            i = bisect.bisect_left(self.times, t)
+            return max(self.starts[i], self.base) if i < len(self.starts) else self.end
+
+    def time_at(self, offset: int) -> Optional[float]:
+        """Receive time of the chunk containing offset."""
+        with self.lock:
+            i = bisect.bisect_right(self.starts, offset) - 1
+            return self.times[i] if i >= 0 else None
+
+    def chunks_since(self, t: float) -> list[tuple[float, bytes]]:
+        """(time, bytes) of every chunk received at or after time t."""
+        with self.lock:
+            i = bisect.bisect_left(self.times, t)
+            if i >= len(self.starts):
+                return []
+            lo = max(self.starts[i], self.base)
+            blob = bytes(self.data[lo - self.base:])
+            bounds = list(self.starts[i + 1:]) + [self.end]
+            times = self.times[i:]
+        out = []
+        for ts, end in zip(times, bounds):
+            out.append((ts, blob[:end - lo]))
+            blob = blob[end - lo:]
+            lo = end
+        return out
+
+
+# Flight recorder dumps (cfg: flight_dir, flight_seconds, flight_min_interval)
+FLIGHT_DIR = "flight"
+FLIGHT_SECONDS = 60.0
+FLIGHT_MIN_INTERVAL = 5.0
+FLIGHT_POLL_MS = 250
+
+
+class FlightRecorder:
+    """Writes the last few seconds of raw RX/TX to disk when something fails.
+
+    Nothing is recorded here: the RawCapture rings are already always on, so
+    a dump only snapshots a time window from them and formats it in a worker
+    thread. Automatic dumps are rate-limited so a timeout storm writes one file.
+    """
+
+    def __init__(self, captures: dict[str, RawCapture], cfg: dict) -> None:
+        self.captures = captures
+        self.folder = cfg.get("flight_dir", FLIGHT_DIR)
+        self.seconds = float(cfg.get("flight_seconds", FLIGHT_SECONDS))
+        self.min_interval = float(cfg.get("flight_min_interval", FLIGHT_MIN_INTERVAL))
+        self.last_auto = -self.min_interval
+        self.errors: "queue.Queue[str]" = queue.Queue()
+        self.writers: list[threading.Thread] = []
+
+    def dump(self, reason: str, note: str = "", auto: bool = False) -> Optional[str]:
+        """Start writing a dump; returns its path, or None when rate-limited."""
+        now = time.monotonic()
+        if auto and now - self.last_auto < self.min_interval:
+            return None
+        if auto:
+            self.last_auto = now
+        t = time.time()
+        stamp = datetime.fromtimestamp(t).strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.folder, f"{stamp}-{reason}.flight.txt")
+        writer = threading.Thread(target=self._write, args=(path, reason, note, t), daemon=True)
+        writer.start()
+        self.writers = [w for w in self.writers if w.is_alive()] + [writer]
+        return path
+
+    @property
+    def busy(self) -> bool:
+        return any(w.is_alive() for w in self.writers)
+
+    def _write(self, path: str, reason: str, note: str, t: float) -> None:
+        since = t - self.seconds
+        streams = [[(ts, name, data) for ts, data in cap.chunks_since(since)]
+                   for name, cap in self.captures.items()]
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# myterm flight recorder: {reason}\n")
+                if note:
+                    f.write(f"# {note}\n")
+                f.write(f"# dumped {datetime.fromtimestamp(t).isoformat(timespec='milliseconds')}, "
+                        f"window {self.seconds:g} s\n")
+                for ts, name, data in heapq.merge(*streams, key=lambda c: c[0]):
+                    stamp = datetime.fromtimestamp(ts).isoformat(timespec="microseconds")
+                    f.write(f"{stamp} {name} {len(data)} bytes\n")
+                    for r in range(0, len(data), HEX_ROW):
+                        row = data[r:r + HEX_ROW]
+                        f.write(f"  {r:06X}  {row.hex(' '):<{HEX_ROW * 3 - 1}}  "
+                                f"{row.translate(_HEX_ASCII).decode('ascii')}\n")
+        except OSError as e:
+            self.errors.put(f"flight recorder: {e}")
+
+
+class HexView:
+    """Virtual hex/ASCII dump of a RawCapture.
+
+    Only the rows in view are formatted (bytes.hex and a translate table),
+    on scroll or when new data arrives, so the cost is independent of
+    history size.
+    """
+
+    def __init__(self, root: tk.Tk, captures: dict[str, RawCapture]) -> None:
+        self.captures = captures
+        self.top_row = 0
+        self.rows_visible = 32
+        self.drawn: Optional[tuple] = None
+        self.match: Optional[tuple[int, int]] = None
+        self.after_id: Optional[str] = None
+
+        self.win = tk.Toplevel(root)
+        self.win.title("Hex Dump")
+        self.win.geometry("860x560")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        top = ttk.Frame(self.win)
+        top.pack(fill="x", padx=8, pady=4)
+        self.dir_var = tk.StringVar(value="RX")
+        ttk.Combobox(top, textvariable=self.dir_var, values=list(captures), state="readonly",
+                     width=4).pack(side="left")
+        self.follow = tk.BooleanVar(value=True)
+        ttk.Checkbutton(top, text="Follow", variable=self.follow).pack(side="left", padx=6)
+        ttk.Label(top, text="Find:").pack(side="left")
+        self.find_var = tk.StringVar()
+        find_entry = ttk.Entry(top, textvariable=self.find_var, width=18)
+        find_entry.pack(side="left")
+        find_entry.bind("<Return>", lambda e: self.find_next())
+        self.find_hex = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="Hex", variable=self.find_hex).pack(side="left")
+        ttk.Button(top, text="Next", command=self.find_next).pack(side="left", padx=2)
+        ttk.Label(top, text="Time:").pack(side="left", padx=(8, 0))
+        self.time_var = tk.StringVar()
+        time_entry = ttk.Entry(top, textvariable=self.time_var, width=12)
+        time_entry.pack(side="left")
+        time_entry.bind("<Return>", lambda e: self.jump_to_time())
+        ttk.Button(top, text="Go", command=self.jump_to_time).pack(side="left", padx=2)
+        self.info = ttk.Label(top, text="")
+        self.info.pack(side="right")
+
+        body = ttk.Frame(self.win)
+        body.pack(fill="both", expand=True, padx=8, pady=4)
+        self.text = tk.Text(body, font=("Menlo", 11), wrap="none", bg="#111", fg="#ddd")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("match", background="#665500")
+        self.text.tag_configure("offset", foreground="#6a9fb5")
+        self.scroll = ttk.Scrollbar(body, orient="vertical", command=self._on_scroll)
+        self.scroll.pack(side="right", fill="y")
+        self.linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self._scroll_rows(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self._tick()
+
+    @property
+    def capture(self) -> RawCapture:
+        return self.captures[self.dir_var.get()]
+
+    def _row_range(self) -> tuple[int, int]:
+        cap = self.capture
+        # Rows are 16-byte aligned; a partly trimmed oldest row is not shown
+        return -(-cap.base // HEX_ROW), -(-cap.end // HEX_ROW)
+
+    def _on_resize(self, event: tk.Event) -> None:
+        self.rows_visible = max(1, event.height // self.linespace)
+        self.drawn = None
+
+    def _scroll_rows(self, delta: int) -> str:
+        self.follow.set(False)
+        self.top_row += delta
+        self._render()
+        return "break"
+
+    def _on_scroll(self, *args: str) -> None:
+        first, last = self._row_range()
+        if args[0] == "moveto":
+            self.top_row = first + int(float(args[1]) * (last - first))
+        elif args[0] == "scroll":
+            step = self.rows_visible if args[2] == "pages" else 1
+            self.top_row += int(args[1]) * step
+        self.follow.set(False)
+        self._render()
+
+    def _tick(self) -> None:
+        self.after_id = self.win.after(HEX_TICK_MS, self._tick)
+        if self.follow.get():
+            self.top_row = self._row_range()[1] - self.rows_visible
+        self._render()
+
+    def _render(self) -> None:
+        cap = self.capture
+        first, last = self._row_range()
+        self.top_row = max(first, min(self.top_row, last - self.rows_visible))
+        key = (self.dir_var.get(), self.top_row, self.rows_visible, cap.end, self.match)
+        if key == self.drawn:
+            return
+        self.drawn = key
+        start = self.top_row * HEX_ROW
+        data = cap.read(start, self.rows_visible * HEX_ROW)
+        lines = []
+        for r in range(0, len(data), HEX_ROW):
+            row = data[r:r + HEX_ROW]
+            t = cap.time_at(start + r)
+            ts = datetime.fromtimestamp(t).strftime("%H:%M:%S.%f")[:-3] if t else ""
+            lines.append(f"{start + r:010X} {ts:12s}  {row.hex(' '):<47}  {row.translate(_HEX_ASCII).decode('ascii')}")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(lines))
+        for i in range(len(lines)):
+            self.text.tag_add("offset", f"{i + 1}.0", f"{i + 1}.10")
+        if self.match is not None:
+            m_start, m_len = self.match
+            for off in range(m_start, m_start + m_len):
+                line = (off - start) // HEX_ROW
+                if 0 <= line < len(lines):
+                    col = 25 + 3 * ((off - start) % HEX_ROW)
+                    self.text.tag_add("match", f"{line + 1}.{col}", f"{line + 1}.{col + 2}")
+        total = max(1, last - first)
+        self.scroll.set((self.top_row - first) / total, (self.top_row - first + self.rows_visible) / total)
+        self.info.config(text=f"{cap.end - cap.base} bytes  offset {cap.base:X}-{cap.end:X}")
+
+    def _show_offset(self, off: int) -> None:
+        self.follow.set(False)
+        self.top_row = off // HEX_ROW - self.rows_visible // 3
+        self._render()
+
+    def find_next(self) -> None:
+        text = self.find_var.get()
+        if not text:
+            return
+        try:
+            needle = bytes.fromhex(text) if self.find_hex.get() else text.encode()
+        except ValueError:
+            self.info.config(text="invalid hex")
+            return
+        cap = self.capture
+        start = self.match[0] + 1 if self.match else self.top_row * HEX_ROW
+        pos = cap.find(needle, start)
+        if pos < 0 and start > cap.base:
+            pos = cap.find(needle, cap.base)  # Wrap around
+        if pos < 0:
+            self.match = None
+            self.info.config(text="not found")
+            return
+        self.match = (pos, len(needle))
+        self._show_offset(pos)
+
+    def jump_to_time(self) -> None:
+        """Scroll to the first byte received at or after HH:MM:SS[.fff] today."""
+        raw = self.time_var.get().strip()
+        for fmt in ("%H:%M:%S.%f", "%H:%M:%S", "%H:%M"):
+            try:
+                tod = datetime.strptime(raw, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            self.info.config(text="time: HH:MM:SS[.fff]")
+            return
+        t = datetime.now().replace(hour=tod.hour, minute=tod.minute, second=tod.second,
+                                   microsecond=tod.microsecond).timestamp()
+        self._show_offset(self.capture.offset_at(t))
+
+    def lift(self) -> None:
+        self.win.deiconify()
+        self.win.lift()
+
+    def close(self) -> None:
+        if self.after_id is not None:
+            self.win.after_cancel(self.after_id)
+        self.win.destroy()
+
+
+# Fastest repeat rate (1 kHz) and how often its progress is shown
+REPEAT_MIN_PERIOD = 0.001
+REPEAT_TICK_MS = 250
+REPEAT_JITTER_SAMPLES = 10000
+REPEAT_SPIN = 0.0002
+
+
+class RepeatScheduler:
+    """Sends one payload on a fixed period from a worker thread.
+
+    Deadlines are start + k * period on the monotonic clock, so send time
+    and scheduling latency never accumulate into drift. A tick that is more
+    than one period late is skipped (and counted) rather than sent in a
+    burst. Lateness of every send is sampled for jitter statistics.
+    """
+
+    def __init__(self, write: Callable[[bytes], None], payload: bytes, period: float, count: int = 0) -> None:
+        self.write = write
+        self.payload = payload
+        self.period = max(REPEAT_MIN_PERIOD, period)
+        self.count = count
+        self.sent = 0
+        self.skipped = 0
+        self.late: deque = deque(maxlen=REPEAT_JITTER_SAMPLES)
+        self.late_max = 0.0
+        self.error: Optional[str] = None
+        self.done = False
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="repeat", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def _run(self) -> None:
+        period, stop = self.period, self.stop_event
+        k = 0
+        try:
+            while not stop.is_set() and (self.count <= 0 or self.sent < self.count):
+                deadline = self.started + k * period
+                now = time.monotonic()
+                if deadline > now:
+                    # Long waits go through the stop event; the last REPEAT_SPIN is busy-waited
+                    # because sleep() overshoots by about that much
+                    if deadline - now > 0.05:
+                        stop.wait(deadline - now - 0.01)
+                    elif deadline - now > REPEAT_SPIN:
+                        time.sleep(deadline - now - REPEAT_SPIN)
+                    else:
+                        while time.monotonic() < deadline:
+                            pass
+                    continue
+                late = now - deadline
+                if late > period:
+                    missed = int(late // period)
+                    self.skipped += missed
+                    k += missed
+                    continue
+                self.write(self.payload)
+                self.sent += 1
+                self.late.append(late)
+                if late > self.late_max:
+                    self.late_max = late
+                k += 1
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self.finished = time.monotonic()
+            self.done = True
+
+    def stats(self) -> dict[str, Any]:
+        """Achieved rate, jitter (lateness mean/p99/max in ms) and skipped ticks."""
+        elapsed = (self.finished or time.monotonic()) - self.started
+        late = sorted(list(self.late))
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "elapsed": elapsed,
+            "rate": self.sent / elapsed if elapsed > 0 else 0.0,
+            "target_rate": 1.0 / self.period,
+            "jitter_mean_ms": 1000 * sum(late) / len(late) if late else 0.0,
+            "jitter_p99_ms": 1000 * _percentile(late, 99) if late else 0.0,
+            "jitter_max_ms": 1000 * self.late_max,
+        }
+
+
+# Load test defaults: rate ramp factor, latency growth that counts as saturated, refresh
+LOAD_RAMP_FACTOR = 1.5
+LOAD_MAX_LOSS = 0.01
+LOAD_LATENCY_KNEE = 5.0
+LOAD_TICK_MS = 250
+
+
+class LoadStep:
+    """Counters for one load level (send rate or outstanding limit)."""
+
+    def __init__(self, level: float) -> None:
+        self.level = level
+        self.sent = 0
+        self.ok = 0
+        self.lost = 0
+        self.latencies: list[float] = []
+        self.duration = 0.0
+        self.saturated = False
+
+    def summary(self) -> dict[str, Any]:
+        lat = sorted(self.latencies)
+        d = self.duration or 1.0
+        return {
+            "level": self.level, "sent": self.sent, "ok": self.ok, "lost": self.lost,
+            "offered_rate": self.sent / d, "response_rate": self.ok / d,
+            "loss": self.lost / self.sent if self.sent else 0.0,
+            "p50_ms": 1000 * _percentile(lat, 50) if lat else None,
+            "p99_ms": 1000 * _percentile(lat, 99) if lat else None,
+            "saturated": self.saturated,
+        }
+
+
+class LoadGenerator:
+    """Floods the device with a weighted command mix and finds its saturation point.
+
+    Owns the raw port (backend suspended) with a sender and a reader thread,
+    so the UI loop never limits the rate. Open loop ramps the send rate by
+    LOAD_RAMP_FACTOR per step; closed loop doubles the number of outstanding
+    requests. Every occurrence of `pattern` in RX answers the oldest
+    outstanding request (devices reply in order); requests unanswered after
+    `timeout` are lost. After each step the line is drained and the step is
+    judged; the run stops at the first saturated step.
+    """
+
+    def __init__(
+        self,
+        ser: Any,
+        mix: list[tuple[str, float]],
+        pattern: str,
+        mode: str = "open",
+        start: float = 10.0,
+        limit: float = 1000.0,
+        step_s: float = 5.0,
+        timeout: float = 2.0,
+        line_ending: bytes = b"\r",
+    ) -> None:
+        import random
+
+        self.ser = ser
+        payloads = [(cmd + line_ending.decode()).encode() for cmd, _ in mix]
+        self.sequence = random.choices(payloads, weights=[w for _, w in mix], k=4096)
+        self.pattern = pattern.encode()
+        self.mode = mode
+        self.start = start
+        self.limit = limit
+        self.step_s = step_s
+        self.timeout = timeout
+        self.steps: list[LoadStep] = []
+        self.outstanding: deque = deque()  # (send time, step)
+        self.cond = threading.Condition()
+        self.saturation: Optional[dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = False
+        self.stop_event = threading.Event()
+        self.reader_done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="load-send", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        with self.cond:
+            self.cond.notify_all()
+
+    def _levels(self):
+        level = self.start
+        while level <= self.limit:
+            yield level
+            level = level * LOAD_RAMP_FACTOR if self.mode == "open" else level * 2
+
+    def _reader(self) -> None:
+        """Match response patterns to outstanding requests, oldest first."""
+        tail = b""
+        keep = len(self.pattern) - 1
+        while not self.reader_done.is_set():
+            data = self.ser.read(4096)
+            if not data:
+                continue
+            now = time.monotonic()
+            buf = tail + data
+            hits = buf.count(self.pattern)
+            tail = buf[-keep:] if keep else b""  # A pattern split across reads
+            with self.cond:
+                for _ in range(hits):
+                    if not self.outstanding:
+                        break
+                    sent_at, step = self.outstanding.popleft()
+                    step.ok += 1
+                    step.latencies.append(now - sent_at)
+                self.cond.notify_all()
+
+    def _expire(self, now: float) -> None:
+        """Count requests older than the timeout as lost (caller holds cond)."""
+        while self.outstanding and now - self.outstanding[0][0] > self.timeout:
+            self.outstanding.popleft()[1].lost += 1
+
+    def _run(self) -> None:
+        old_timeout = self.ser.timeout
+        self.ser.timeout = 0.02
+        reader = threading.Thread(target=self._reader, name="load-read", daemon=True)
+        try:
+            self.ser.reset_input_buffer()
+            reader.start()
+            i = 0
+            for level in self._levels():
+                if self.stop_event.is_set():
+                    break
+                step = LoadStep(level)
+                self.steps.append(step)
+                i = self._run_step(step, i)
+                # Drain: let the step's last requests answer or time out
+                with self.cond:
+                    while self.outstanding and not self.stop_event.is_set():
+                        self._expire(time.monotonic())
+                        self.cond.wait(0.05)
+                if self._judge(step):
+                    break
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.reader_done.set()
+            if reader.is_alive():
+                reader.join(1.0)
+            self.ser.timeout = old_timeout
+            self.done = True
+
+    def _run_step(self, step: LoadStep, i: int) -> int:
+        seq, n = self.sequence, len(self.sequence)
+        t0 = time.monotonic()
+        end = t0 + self.step_s
+        k = 0
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            if now >= end:
+                break
+            if self.mode == "open":
+                deadline = t0 + k / step.level
+                if deadline > now:
+                    time.sleep(min(deadline - now, end - now))
+                    continue
+            with self.cond:
+                self._expire(now)
+                if self.mode == "closed":
+                    while len(self.outstanding) >= step.level and not self.stop_event.is_set():
+                        self.cond.wait(0.05)
+                        self._expire(time.monotonic())
+                    if time.monotonic() >= end:
+                        break
+                self.outstanding.append((time.monotonic(), step))
+            self.ser.write(seq[i % n])
+            step.sent += 1
+            i += 1
+            k += 1
+        step.duration = time.monotonic() - t0
+        return i
+
+    def _judge(self, step: LoadStep) -> bool:
+        """Mark the step saturated if loss, throughput or latency gave out."""
+        s = step.summary()
+        base = self.steps[0].summary()
+        saturated = s["loss"] > LOAD_MAX_LOSS
+        if self.mode == "open":
+            saturated |= s["response_rate"] < 0.9 * step.level
+        elif len(self.steps) > 1:
+            saturated |= s["response_rate"] < 1.1 * self.steps[-2].summary()["response_rate"]
+        if s["p99_ms"] and base["p99_ms"] and len(self.steps) > 1:
+            saturated |= s["p99_ms"] > LOAD_LATENCY_KNEE * base["p99_ms"]
+        step.saturated = saturated
+        if saturated:
+            good = [st.summary() for st in self.steps if not st.saturated]
+            self.saturation = good[-1] if good else s
+        return saturated
+
+
+# Line flags in LineStore; lines kept in the log Text widget (cfg: log_view_lines)
+LINE_RX, LINE_TX = 0, 1
+LOG_VIEW_LINES = 50000
+LOG_VIEW_TRIM_EVERY = 1000
+
+
+class LineStore:
+    """Session log lines packed as UTF-8 into one bytearray.
+
+    offsets[i]:offsets[i + 1] is line i (including its newline); receive
+    times and flags sit in parallel arrays. A short AT response costs its
+    bytes plus 17 bytes of index instead of a str object and a list slot.
+    Lines are decoded only when read; whole-log export and filtering run on
+    the bytes. Supports the list operations the app used on log_buffer.
+    """
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.times = array("d")
+        self.flags = array("B")
+
+    def append(self, line: str, flags: Optional[int] = None, t: Optional[float] = None) -> None:
+        self.data += line.encode("utf-8", "replace")
+        self.offsets.append(len(self.data))
+        self.times.append(time.time() if t is None else t)
+        if flags is None:
+            flags = LINE_TX if line.startswith(">>") else LINE_RX
+        self.flags.append(flags)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8", "replace")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def clear(self) -> None:
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.times = array("d")
+        self.flags = array("B")
+
+    def text(self, start: int = 0) -> str:
+        """Lines from `start` to the end as one string."""
+        start = max(0, min(start, len(self)))
+        return self.data[self.offsets[start]:].decode("utf-8", "replace")
+
+    def line_at(self, pos: int) -> int:
+        """Index of the line containing byte position pos."""
+        return bisect.bisect_right(self.offsets, pos) - 1
+
+    def grep(self, term: str, ignore_case: bool = True) -> list[int]:
+        """Indices of lines containing term, searched in the byte arena."""
+        if not term.isascii():
+            needle = term.lower() if ignore_case else term
+            return [i for i, line in enumerate(self) if needle in (line.lower() if ignore_case else line)]
+        hay = self.data.lower() if ignore_case else self.data
+        needle = (term.lower() if ignore_case else term).encode()
+        found: list[int] = []
+        pos = hay.find(needle)
+        while pos >= 0:
+            i = self.line_at(pos)
+            found.append(i)
+            pos = hay.find(needle, self.offsets[i + 1])
+        return found
+
+    def join(self, indices: list[int]) -> str:
+        """Concatenate the given lines."""
+        data, offsets = self.data, self.offsets
+        return b"".join(data[offsets[i]:offsets[i + 1]] for i in indices).decode("utf-8", "replace")
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store."""
+        return (len(self.data) + self.offsets.itemsize * len(self.offsets)
+                + self.times.itemsize * len(self.times) + len(self.flags))
+
+
+# Saved-log viewer: bytes per newline-index entry, filter scan block, longest line shown
+LOG_INDEX_CHUNK = 1 << 16
+LOG_SCAN_BLOCK = 1 << 22
+LOG_LINE_MAX = 2000
+
+
+class MappedLog:
+    """A saved log file opened through mmap with a sparse line index.
+
+    A background thread counts newlines per LOG_INDEX_CHUNK bytes
+    (bytes.count over 4 MiB blocks), so chunk_lines[k] is the number of
+    lines before chunk k. Finding line L costs one bisect plus at most a
+    chunk's worth of find calls, and the first screen is readable before
+    indexing finishes.
+    """
+
+    def __init__(self, path: str) -> None:
+        import mmap
+
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.chunk_lines = array("Q", [0])
+        self.indexed = 0
+        self.done = False
+        self.cancelled = threading.Event()
+        threading.Thread(target=self._build_index, name="log-index", daemon=True).start()
+
+    def _build_index(self) -> None:
+        step = LOG_INDEX_CHUNK
+        total = 0
+        for base in range(0, self.size, LOG_SCAN_BLOCK):
+            if self.cancelled.is_set():
+                return
+            try:
+                block = self.mm[base:base + LOG_SCAN_BLOCK]
+            except ValueError:
+                return  # Closed while indexing
+            for off in range(0, len(block), step):
+                total += block.count(b"\n", off, off + step)
+                self.chunk_lines.append(total)
+            self.indexed = base + len(block)
+        self.done = True
+
+    @property
+    def line_count(self) -> int:
+        """Lines indexed so far (all lines once done)."""
+        n = self.chunk_lines[-1]
+        if self.done and self.size and self.mm[self.size - 1:self.size] != b"\n":
+            n += 1
+        return n
+
+    def line_start(self, line: int) -> int:
+        """Byte offset of the first byte of a (0-based, indexed) line."""
+        if line <= 0:
+            return 0
+        c = bisect.bisect_left(self.chunk_lines, line) - 1
+        pos = c * LOG_INDEX_CHUNK
+        for _ in range(line - self.chunk_lines[c]):
+            pos = self.mm.find(b"\n", pos) + 1
+        return pos
+
+    def line_of(self, pos: int) -> Optional[int]:
+        """Line number containing byte offset pos, or None if not indexed yet."""
+        c = pos // LOG_INDEX_CHUNK
+        if c + 1 >= len(self.chunk_lines):
+            return None
+        return self.chunk_lines[c] + self.mm[c * LOG_INDEX_CHUNK:pos].count(b"\n")
+
+    def read_line(self, pos: int) -> tuple[str, int]:
+        """Decode the line starting at pos; return it and the next line's offset."""
+        end = self.mm.find(b"\n", pos)
+        if end < 0:
+            end = self.size
+        text = self.mm[pos:min(end, pos + LOG_LINE_MAX)].decode("utf-8", "replace").rstrip("\r")
+        return text, end + 1
+
+    def lines(self, first: int, count: int) -> list[str]:
+        out: list[str] = []
+        pos = self.line_start(first)
+        while len(out) < count and pos < self.size:
+            text, pos = self.read_line(pos)
+            out.append(text)
+        return out
+
+    def filter(self, pattern: re.Pattern, out: array, stop: threading.Event) -> None:
+        """Append the start offset of every line matching pattern to out."""
+        pos = 0
+        while pos < self.size and not stop.is_set():
+            end = self.mm.find(b"\n", min(pos + LOG_SCAN_BLOCK, self.size - 1)) + 1 or self.size
+            while not stop.is_set():
+                m = pattern.search(self.mm, pos, end)
+                if m is None:
+                    break
+                out.append(self.mm.rfind(b"\n", 0, m.start()) + 1)
+                pos = self.mm.find(b"\n", m.end(), end) + 1 or end
+            pos = end
+
+    def find(self, pattern: re.Pattern, pos: int, stop: threading.Event) -> Optional[tuple[int, int]]:
+        """(start, end) of the first match at or after pos, wrapping to the top once."""
+        for lo, hi in ((pos, self.size), (0, min(pos, self.size))):
+            while lo < hi and not stop.is_set():
+                end = min(hi, self.mm.find(b"\n", min(lo + LOG_SCAN_BLOCK, self.size - 1)) + 1 or self.size)
+                m = pattern.search(self.mm, lo, end)
+                if m is not None:
+                    return m.start(), m.end()
+                lo = end
+        return None
+
+    def close(self) -> None:
+        self.cancelled.set()
+        if self.size:
+            try:
+                self.mm.close()
+            except BufferError:
+                pass  # A filter thread still holds a view; the map goes with the process
+        self.file.close()
+
+
+class LogFileView:
+    """Virtual view of a MappedLog: only the lines on screen are decoded.
+
+    Filtering runs on a thread and streams matching line offsets into an
+    array, which the view pages through instead of the full line index.
+    """
+
+    def __init__(self, root: tk.Tk, log: MappedLog) -> None:
+        self.log = log
+        self.top = 0
+        self.rows_visible = 40
+        self.drawn: Optional[tuple] = None
+        self.matches: Optional[array] = None
+        self.filter_stop = threading.Event()
+        self.find_pos = 0
+        self.find_stop = threading.Event()
+        self.mark: Optional[int] = None
+        self.goto: Optional[int] = None
+        self.after_id: Optional[str] = None
+
+        self.win = tk.Toplevel(root)
+        self.win.title(os.path.basename(log.path))
+        self.win.geometry("1000x600")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        bar = ttk.Frame(self.win)
+        bar.pack(fill="x", padx=8, pady=4)
+        self.term_var = tk.StringVar()
+        entry = ttk.Entry(bar, textvariable=self.term_var, width=30)
+        entry.pack(side="left")
+        entry.bind("<Return>", lambda e: self.find_next())
+        ttk.Button(bar, text="Find next", command=self.find_next).pack(side="left", padx=2)
+        ttk.Button(bar, text="Filter", command=self.apply_filter).pack(side="left", padx=2)
+        ttk.Button(bar, text="Show all", command=self.clear_filter).pack(side="left", padx=2)
+        self.regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="Regex", variable=self.regex_var).pack(side="left", padx=4)
+        self.case_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(bar, text="Ignore case", variable=self.case_var).pack(side="left")
+        self.info = ttk.Label(bar, text="")
+        self.info.pack(side="right")
 
+        body = ttk.Frame(self.win)
+        body.pack(fill="both", expand=True, padx=8, pady=4)
+        self.text = tk.Text(body, font=("Menlo", 11), wrap="none")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("mark", background="#665500")
+        self.scroll = ttk.Scrollbar(body, orient="vertical", command=self._on_scroll)
+        self.scroll.pack(side="right", fill="y")
+        self.linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self._scroll_rows(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self.text.bind("<Prior>", lambda e: self._scroll_rows(-self.rows_visible))
+        self.text.bind("<Next>", lambda e: self._scroll_rows(self.rows_visible))
+        self._tick()
 
-# Constants
-LINES_COUNT = 40
-PROFILE_DIR = "profiles"
-DEFAULT_PROFILE = os.path.join(PROFILE_DIR, "profile_usb_st.json")
+    def _rows(self) -> int:
+        return len(self.matches) if self.matches is not None else self.log.line_count
 
-# Create profiles directory
-os.makedirs(PROFILE_DIR, exist_ok=True)
+    def _pattern(self) -> Optional[re.Pattern]:
+        term = self.term_var.get()
+        if not term:
+            return None
+        try:
+            raw = term.encode() if self.regex_var.get() else re.escape(term.encode())
+            return re.compile(raw, re.MULTILINE | (re.IGNORECASE if self.case_var.get() else 0))
+        except re.error as e:
+            self.info.config(text=f"regex: {e}")
+            return None
 
-# Themes
-THEMES = {
-    "dark": {"bg": "#111", "fg": "#00FFAA"},
-    "amber": {"bg": "#1b1200", "fg": "#FFB000"},
-    "blue": {"bg": "#0b1320", "fg": "#7FDBFF"},
-    "white_on_black": {"bg": "#000", "fg": "#FFF"},
-    "white_on_blue": {"bg": "#002b55", "fg": "#FFF"},
-}
+    def _on_resize(self, event: tk.Event) -> None:
+        self.rows_visible = max(1, event.height // self.linespace)
+        self.drawn = None
 
+    def _scroll_rows(self, delta: int) -> str:
+        self.top += delta
+        self._render()
+        return "break"
 
-class SerialBackend:
-    """Handles serial communication with a USB device."""
-    
-    def __init__(
-        self,
-        cfg: dict[str, Any],
-        rx_callback: Callable[[bytes], None],
-        status_callback: Callable[[str], None],
-        root: tk.Tk
-    ) -> None:
-        self.cfg = cfg
-        self.rx_callback = rx_callback
-        self.status_callback = status_callback
-        self.root = root
-        self.running = True
-        self.virtual = cfg["port"] == "VIRTUAL"
-        self.ser: Optional[serial.Serial] = None
-        self.after_id: Optional[str] = None
-        
-        self.auto_reconnect = cfg.get("auto_reconnect", True)
-        self.reconnect_delay = cfg.get("reconnect_delay", 2000)
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = cfg.get("max_reconnect_attempts", 5)
-        
-        if not self.virtual:
+    def _on_scroll(self, *args: str) -> None:
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self._rows())
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.rows_visible if args[2] == "pages" else 1)
+        self._render()
+
+    def _tick(self) -> None:
+        busy = not self.log.done or (self.matches is not None and not self.filter_stop.is_set())
+        self.after_id = self.win.after(HEX_TICK_MS if busy else 1000, self._tick)
+        if self.goto is not None:
+            self.goto_offset(self.goto)
+        self._render()
+
+    def goto_offset(self, pos: int) -> None:
+        """Mark the line at byte offset pos, once indexing has reached it."""
+        row = self.log.line_of(pos)
+        self.goto = pos if row is None else None
+        if row is not None:
+            self.clear_filter()
+            self.mark = row
+            self.top = row - self.rows_visible // 3
+            self._render()
+
+    def _render(self) -> None:
+        rows = self._rows()
+        self.top = max(0, min(self.top, rows - self.rows_visible))
+        key = (self.top, self.rows_visible, rows, self.mark, self.matches is None)
+        if key != self.drawn:
+            self.drawn = key
+            if self.matches is None:
+                lines = self.log.lines(self.top, self.rows_visible)
+                starts = None
+            else:
+                starts = self.matches[self.top:self.top + self.rows_visible]
+                lines = [self.log.read_line(p)[0] for p in starts]
+            self.text.delete("1.0", "end")
+            self.text.insert("1.0", "\n".join(lines))
+            if self.mark is not None:
+                row = self.mark - self.top
+                if 0 <= row < len(lines):
+                    self.text.tag_add("mark", f"{row + 1}.0", f"{row + 1}.end")
+            total = max(1, rows)
+            self.scroll.set(self.top / total, min(1.0, (self.top + self.rows_visible) / total))
+        if not self.log.done:
+            pct = 100 * self.log.indexed / self.log.size if self.log.size else 100
+            status = f"indexing {pct:.0f}%  {self.log.line_count:,} lines"
+        else:
+            status = f"{self.log.line_count:,} lines"
+        if self.matches is not None:
+            status += f"  |  {len(self.matches):,} matching"
+        self.info.config(text=status)
+
+    def apply_filter(self) -> None:
+        pattern = self._pattern()
+        if pattern is None:
+            return
+        self.filter_stop.set()
+        self.filter_stop = stop = threading.Event()
+        self.matches = out = array("Q")
+        self.top, self.mark = 0, None
+
+        def run() -> None:
             try:
-                self.ser = serial.Serial(
-                    cfg["port"],
-                    cfg["baud"],
-                    timeout=0.05
-                )
-                self.status_callback("connected")
-            except Exception as e:
-                self.status_callback(f"error: {e}")
-                self.virtual = True
-        
-        self._poll()
-    
-    def _poll(self) -> None:
-        """Poll serial port for incoming data."""
-        if not self.running:
+                self.log.filter(pattern, out, stop)
+            except ValueError:
+                pass  # Viewer closed mid-scan
+            stop.set()
+        threading.Thread(target=run, name="log-filter", daemon=True).start()
+        self._render()
+
+    def clear_filter(self) -> None:
+        self.filter_stop.set()
+        self.matches = None
+        self.mark = None
+        self._render()
+
+    def find_next(self) -> None:
+        """Jump to the next match after the last one found (searched on a thread)."""
+        pattern = self._pattern()
+        if pattern is None:
             return
-        
-        if self.virtual or not self.ser or not self.ser.is_open:
-            if self.auto_reconnect and self.reconnect_attempts < self.max_reconnect_attempts:
-                self.reconnect_attempts += 1
-                self.status_callback(f"reconnecting... ({self.reconnect_attempts}/{self.max_reconnect_attempts})")
-                self._try_reconnect()
-                self.after_id = self.root.after(self.reconnect_delay, self._poll)
-            else:
-                self.after_id = self.root.after(50, self._poll)
+        self.find_stop.set()
+        self.find_stop = stop = threading.Event()
+        found: list[Optional[tuple[int, int]]] = []
+
+        def run() -> None:
+            try:
+                found.append(self.log.find(pattern, self.find_pos, stop))
+            except ValueError:
+                found.append(None)  # Viewer closed mid-scan
+        threading.Thread(target=run, name="log-find", daemon=True).start()
+        self.info.config(text="searching...")
+        self.win.after(HEX_TICK_MS, self._find_done, found, stop)
+
+    def _find_done(self, found: list, stop: threading.Event) -> None:
+        if stop is not self.find_stop or stop.is_set() or not self.win.winfo_exists():
+            return  # Superseded or closed
+        if not found:
+            self.win.after(HEX_TICK_MS, self._find_done, found, stop)
             return
-        
-        try:
-            if self.ser.in_waiting:
-                data = self.ser.read(self.ser.in_waiting)
-                if data:
-                    self.rx_callback(data)
-        except Exception as e:
-            self.status_callback(f"disconnected: {e}")
-            if self.ser and self.ser.is_open:
-                try:
-                    self.ser.close()
-                except Exception:
-                    pass
-            self.ser = None
-            self.after_id = self.root.after(100, self._poll)
+        if found[0] is None:
+            self.info.config(text="not found")
             return
-        
-        self.reconnect_attempts = 0
-        self.after_id = self.root.after(10, self._poll)
-        
-    def _try_reconnect(self) -> None:
-        """Attempt to reconnect to serial port."""
+        m_start, m_end = found[0]
+        self.find_pos = max(m_end, m_start + 1)
+        start = self.log.mm.rfind(b"\n", 0, m_start) + 1
+        if self.matches is not None:
+            row = bisect.bisect_left(self.matches, start)
+            if row >= len(self.matches) or self.matches[row] != start:
+                self.info.config(text="next match is outside the filter")
+                return
+        else:
+            row = self.log.line_of(start)
+            if row is None:
+                self.info.config(text="match is past the indexed part; try again shortly")
+                return
+        self.mark = row
+        self.top = row - self.rows_visible // 3
+        self._render()
+
+    def lift(self) -> None:
+        self.win.deiconify()
+        self.win.lift()
+
+    def close(self) -> None:
+        self.filter_stop.set()
+        self.find_stop.set()
+        if self.after_id is not None:
+            self.win.after_cancel(self.after_id)
+        self.log.close()
+        self.win.destroy()
+
+
+# Archive search: chunk size per pool task, files searched, rows kept in the result view
+ARCHIVE_CHUNK = 8 << 20
+ARCHIVE_GLOBS = ("*.log.txt", "*.log", "*.txt", "*.csv")
+ARCHIVE_SIDECAR = ".myidx.json"
+ARCHIVE_MAX_ROWS = 20000
+ARCHIVE_TICK_MS = 100
+_ARCHIVE_TS_RE = re.compile(rb"(\d{4}-\d\d-\d\d)[ T](\d\d:\d\d:\d\d(?:\.\d+)?)|\[(\d\d:\d\d:\d\d)\]")
+_ARCHIVE_NAME_DATE_RE = re.compile(r"(\d{4}-\d\d-\d\d)_\d\d-\d\d-\d\d")
+
+
+def _archive_line_time(line: bytes, day: float) -> Optional[float]:
+    """Timestamp of a log line: ISO date-time, or [HH:MM:SS] on the file's day."""
+    m = _ARCHIVE_TS_RE.search(line)
+    if m is None:
+        return None
+    if m.group(1):
+        ts = f"{m.group(1).decode()} {m.group(2).decode()}"
         try:
-            if not self.virtual:
-                self.ser = serial.Serial(
-                    self.cfg["port"],
-                    self.cfg["baud"],
-                    timeout=0.05
-                )
-                self.reconnect_attempts = 0
-                self.status_callback("reconnected")
+            return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S.%f" if "." in ts else "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError:
+            return None  # Date-like device output such as +CCLK: 2000-00-00
+    h, mi, s = (int(x) for x in m.group(3).split(b":"))
+    return day + h * 3600 + mi * 60 + s
+
+
+def _archive_file_day(path: str) -> float:
+    """Midnight of the day a log was saved (from its name, else its mtime)."""
+    m = _ARCHIVE_NAME_DATE_RE.search(os.path.basename(path))
+    d = datetime.strptime(m.group(1), "%Y-%m-%d") if m else datetime.fromtimestamp(os.path.getmtime(path))
+    return d.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def _archive_search_chunk(
+    path: str, start: int, end: int, pattern: bytes, flags: int,
+    t0: Optional[float], t1: Optional[float], day: float,
+) -> tuple[int, Optional[float], Optional[float], list[tuple[int, int, Optional[float], str]]]:
+    """Pool task: search one newline-aligned chunk of a file.
+
+    Returns the chunk's line count, its first and last timestamps (for the
+    sidecar index) and matches as (line offset in chunk, byte offset,
+    timestamp, text). Lines without a timestamp pass any time range.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    first = last = None
+    m = _ARCHIVE_TS_RE.search(data)
+    if m is not None:
+        first = _archive_line_time(m.group(0), day)
+        tail = None
+        for tail in _ARCHIVE_TS_RE.finditer(data, max(0, len(data) - 65536)):
+            pass
+        last = _archive_line_time((tail or m).group(0), day)
+    matches = []
+    rx = re.compile(pattern, flags)
+    line_no, counted, pos = 0, 0, 0
+    while True:
+        m = rx.search(data, pos)
+        if m is None:
+            break
+        ls = data.rfind(b"\n", 0, m.start()) + 1
+        le = data.find(b"\n", m.end())
+        if le < 0:
+            le = len(data)
+        line_no += data.count(b"\n", counted, ls)
+        counted = ls
+        line = data[ls:le]
+        ts = _archive_line_time(line, day)
+        if ts is None or ((t0 is None or ts >= t0) and (t1 is None or ts <= t1)):
+            matches.append((line_no, start + ls, ts, line[:LOG_LINE_MAX].decode("utf-8", "replace").rstrip("\r")))
+        pos = le + 1
+    return data.count(b"\n"), first, last, matches
+
+
+class ArchiveSearch:
+    """Regex search over every saved log under a folder, on a process pool.
+
+    Files are split into newline-aligned chunks searched in parallel.
+    Matches stream into `results` as (path, line, byte offset, timestamp,
+    text) in file order, once the line counts of earlier chunks are known.
+    A sidecar index per file (name + ARCHIVE_SIDECAR) keeps chunk bounds,
+    line counts and time spans, so later searches skip counting and skip
+    chunks outside the time range.
+    """
+
+    def __init__(
+        self, folder: str, pattern: bytes, flags: int = 0,
+        t0: Optional[float] = None, t1: Optional[float] = None,
+        globs: tuple[str, ...] = ARCHIVE_GLOBS, workers: Optional[int] = None, sidecar: bool = True,
+    ) -> None:
+        re.compile(pattern, flags)  # Raise re.error here, not in the pool
+        self.folder = folder
+        self.pattern = pattern
+        self.flags = flags
+        self.t0 = t0
+        self.t1 = t1
+        self.globs = globs
+        self.workers = workers
+        self.sidecar = sidecar
+        self.results: queue.Queue = queue.Queue()
+        self.files = 0
+        self.chunks = 0
+        self.chunks_done = 0
+        self.matches = 0
+        self.error: Optional[str] = None
+        self.failed: list[str] = []  # "file: error" for chunks that could not be searched
+        self.done = False
+        self.cancelled = threading.Event()
+        threading.Thread(target=self._run, name="archive-search", daemon=True).start()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def _files(self) -> list[str]:
+        import fnmatch
+
+        found = []
+        for dirpath, _, names in os.walk(self.folder):
+            for name in names:
+                if not name.endswith(ARCHIVE_SIDECAR) and any(fnmatch.fnmatch(name, g) for g in self.globs):
+                    found.append(os.path.join(dirpath, name))
+        return sorted(found)
+
+    @staticmethod
+    def _load_sidecar(path: str) -> Optional[list[list]]:
+        try:
+            with open(path + ARCHIVE_SIDECAR, encoding="utf-8") as f:
+                idx = json.load(f)
+            st = os.stat(path)
+            if idx.get("size") == st.st_size and idx.get("mtime") == st.st_mtime:
+                return idx["chunks"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    @staticmethod
+    def _split(path: str) -> list[list]:
+        """Chunk bounds [start, end, lines, first_ts, last_ts] aligned to newlines."""
+        size = os.path.getsize(path)
+        bounds = [0]
+        with open(path, "rb") as f:
+            while bounds[-1] + ARCHIVE_CHUNK < size:
+                f.seek(bounds[-1] + ARCHIVE_CHUNK)
+                f.readline()
+                if f.tell() >= size:
+                    break
+                bounds.append(f.tell())
+        bounds.append(size)
+        return [[s, e, None, None, None] for s, e in zip(bounds, bounds[1:]) if e > s]
+
+    def _outside_range(self, chunk: list) -> bool:
+        _, _, _, first, last = chunk
+        return ((self.t1 is not None and first is not None and first > self.t1)
+                or (self.t0 is not None and last is not None and last < self.t0))
+
+    def _run(self) -> None:
+        import concurrent.futures  # Pulls in logging; only archive searches pay for it
+
+        try:
+            files = self._files()
+            self.files = len(files)
+            plans: dict[str, tuple[list[list], bool, float]] = {}
+            with concurrent.futures.ProcessPoolExecutor(self.workers) as pool:
+                futures = {}
+                for path in files:
+                    chunks = self._load_sidecar(path)
+                    cached = chunks is not None
+                    if chunks is None:
+                        chunks = self._split(path)
+                    day = _archive_file_day(path)
+                    plans[path] = (chunks, cached, day)
+                    for k, chunk in enumerate(chunks):
+                        if cached and self._outside_range(chunk):
+                            continue
+                        fut = pool.submit(_archive_search_chunk, path, chunk[0], chunk[1],
+                                          self.pattern, self.flags, self.t0, self.t1, day)
+                        futures[fut] = (path, k)
+                self.chunks = len(futures)
+                # Matches per (path, chunk) wait until every earlier chunk is searched or skipped
+                pending: dict[str, dict[int, list]] = {p: {} for p in files}
+                emitted = {p: 0 for p in files}
+                waiting: dict[str, set[int]] = {p: set() for p in files}
+                for path, k in futures.values():
+                    waiting[path].add(k)
+                for fut in concurrent.futures.as_completed(futures):
+                    if self.cancelled.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        return
+                    path, k = futures[fut]
+                    self.chunks_done += 1
+                    try:
+                        lines, first, last, matches = fut.result()
+                    except Exception as e:
+                        # Chunk k stays in `waiting`, so this file stops emitting before it
+                        # (later line numbers are unknown) and gets no sidecar; others go on
+                        self.failed.append(f"{os.path.basename(path)}: {type(e).__name__}: {e}")
+                        continue
+                    chunks, cached, _ = plans[path]
+                    chunks[k][2:] = [lines, first, last]
+                    pending[path][k] = matches
+                    waiting[path].discard(k)
+                    self._emit(path, chunks, pending[path], waiting[path], emitted)
+                    if self.sidecar and not cached and not waiting[path]:
+                        self._save_sidecar(path, chunks)
         except Exception as e:
-            self.status_callback(f"reconnect failed: {e}")
-    
-    def write(self, data: bytes) -> None:
-        """Write data to serial port."""
-        if self.virtual or not self.ser or not self.ser.is_open:
-            self.rx_callback(b"[echo] " + data)
-            return
-        
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.done = True
+
+    def _emit(self, path: str, chunks: list[list], pending: dict[int, list],
+              waiting: set[int], emitted: dict[str, int]) -> None:
+        k = emitted[path]
+        while k < len(chunks) and k not in waiting:
+            base = sum(c[2] for c in chunks[:k])
+            for line_no, offset, ts, text in pending.pop(k, []):
+                self.matches += 1
+                self.results.put((path, base + line_no + 1, offset, ts, text))
+            k += 1
+        emitted[path] = k
+
+    @staticmethod
+    def _save_sidecar(path: str, chunks: list[list]) -> None:
+        st = os.stat(path)
         try:
-            self.ser.write(data)
-        except Exception:
-            self.status_callback("write failed")
-    
-    def close(self) -> None:
-        """Close serial connection and cleanup."""
-        self.running = False
-        
-        if self.after_id:
-            try:
-                self.root.after_cancel(self.after_id)
-            except Exception:
-                pass
-        
-        if self.ser and self.ser.is_open:
+            with open(path + ARCHIVE_SIDECAR, "w", encoding="utf-8") as f:
+                json.dump({"size": st.st_size, "mtime": st.st_mtime, "chunks": chunks}, f)
+        except OSError:
+            pass  # Read-only archive: search still works, just without the index
+
+
+# Lines of a timestamped export / merged log start with an ISO time and a tab
+_MERGE_PREFIX_RE = re.compile(rb"^\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:\.\d+)?\t")
+MERGE_TS_SCAN = 64
+
+
+def parse_merge_source(arg: str) -> tuple[str, str, float]:
+    """Split PATH[@OFFSET] (clock offset in seconds, added to every timestamp)."""
+    path, sep, tail = arg.rpartition("@")
+    if sep:
+        try:
+            return path, os.path.basename(path), float(tail)
+        except ValueError:
+            pass
+    return arg, os.path.basename(arg), 0.0
+
+
+def _merge_stream(path: str, label: str, offset: float):
+    """Yield (time, line number, label, text) for one log, read line by line.
+
+    The time comes from the start of the line (ISO date-time, or [HH:MM:SS]
+    on the day from the file name); lines without one keep the previous
+    line's time so multi-line output stays together.
+    """
+    day = _archive_file_day(path)
+    last = day + offset
+    with open(path, "rb") as f:
+        for n, raw in enumerate(f):
+            ts = _archive_line_time(raw[:MERGE_TS_SCAN], day)
+            if ts is not None:
+                last = ts + offset
+            m = _MERGE_PREFIX_RE.match(raw)
+            if m:
+                raw = raw[m.end():]
+            yield last, n, label, raw.rstrip(b"\r\n").decode("utf-8", "replace")
+
+
+def merge_logs(sources: list[tuple[str, str, float]], out: Any) -> int:
+    """k-way merge of time-sorted logs into out as 'ISO time<TAB>[label]<TAB>line'.
+
+    heapq.merge keeps one pending line per source, so memory does not grow
+    with log size. Returns the number of lines written.
+    """
+    count = 0
+    for ts, _, label, text in heapq.merge(*(_merge_stream(*s) for s in sources)):
+        out.write(f"{datetime.fromtimestamp(ts).isoformat(timespec='milliseconds')}\t[{label}]\t{text}\n")
+        count += 1
+    return count
+
+
+class CommandListModel:
+    """Command list state (text, selection, status) kept separate from the Treeview.
+
+    Every mutation records which rows changed; the view pulls those diffs in
+    one batch instead of touching Treeview items per change.
+    """
+
+    def __init__(self, commands: list[str]) -> None:
+        self.commands: list[str] = commands
+        self.selected: set[int] = set()
+        self.status: dict[int, str] = {}
+        self.dirty: set[int] = set()
+        self.all_dirty = True
+        self.listeners: list[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def _changed(self, idx: Optional[int] = None) -> None:
+        if idx is None:
+            self.all_dirty = True
+        else:
+            self.dirty.add(idx)
+        for listener in self.listeners:
+            listener()
+
+    def row(self, idx: int) -> tuple[tuple, tuple]:
+        """Return (values, tags) for one row, always all 4 columns."""
+        status = self.status.get(idx, "")
+        selected = idx in self.selected
+        values = ("☑" if selected else "☐", idx + 1, self.commands[idx], status)
+        tags = []
+        if selected:
+            tags.append("selected")
+        if status == "✓":
+            tags.append("success")
+        elif status == "✗":
+            tags.append("failed")
+        elif status == "≠":
+            tags.append("mismatch")
+        return values, tuple(tags)
+
+    def set_commands(self, commands: list[str]) -> None:
+        self.commands = commands
+        self.selected.clear()
+        self.status.clear()
+        self._changed()
+
+    def set_text(self, idx: int, text: str) -> None:
+        self.commands[idx] = text
+        self._changed(idx)
+
+    def insert(self, idx: int, text: str) -> None:
+        """Insert a command, shifting selection and status of the rows below."""
+        self.commands.insert(idx, text)
+        self.selected = {i + 1 if i >= idx else i for i in self.selected}
+        self.status = {(i + 1 if i >= idx else i): s for i, s in self.status.items()}
+        self._changed()
+
+    def delete(self, idx: int) -> None:
+        """Delete a command, shifting selection and status of the rows below."""
+        self.commands.pop(idx)
+        self.selected = {i - 1 if i > idx else i for i in self.selected if i != idx}
+        self.status = {(i - 1 if i > idx else i): s for i, s in self.status.items() if i != idx}
+        self._changed()
+
+    def toggle(self, idx: int) -> None:
+        if idx in self.selected:
+            self.selected.discard(idx)
+        else:
+            self.selected.add(idx)
+        self._changed(idx)
+
+    def select_all(self) -> None:
+        self.selected = set(range(len(self.commands)))
+        self._changed()
+
+    def deselect_all(self) -> None:
+        self.selected.clear()
+        self._changed()
+
+    def set_status(self, idx: int, status: str) -> None:
+        if status:
+            self.status[idx] = status
+        else:
+            self.status.pop(idx, None)
+        self._changed(idx)
+
+    def clear_statuses(self) -> None:
+        self.status.clear()
+        self._changed()
+
+
+class CommandListView:
+    """Treeview that renders only the rows currently in view.
+
+    The Treeview holds at most one screenful of items (iid = command index);
+    scrolling re-renders the window, and model diffs are applied once per idle pass.
+    """
+
+    def __init__(self, parent: tk.Widget, model: CommandListModel, root: tk.Tk) -> None:
+        self.model = model
+        self.root = root
+        self.top = 0
+        self.rows = 20
+        self.rendered: tuple[int, int] = (0, 0)
+        self.current: Optional[int] = None
+        self.flush_pending = False
+
+        frame = ttk.Frame(parent)
+        frame.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(frame, columns=("Select", "#", "Command", "Status"), show="headings", height=20)
+        self.tree.heading("Select", text="Select")
+        self.tree.heading("#", text="#")
+        self.tree.heading("Command", text="Command")
+        self.tree.heading("Status", text="Status")
+        self.tree.column("Select", width=60, anchor="center")
+        self.tree.column("#", width=40, anchor="center")
+        self.tree.column("Command", width=280)
+        self.tree.column("Status", width=60, anchor="center")
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        # Tags are configured once; rows only switch between them. A tag created
+        # later wins, so 'selected' comes last to keep its background over a status
+        self.tree.tag_configure('success', foreground='#00ff00', background='#1a1a1a')
+        self.tree.tag_configure('failed', foreground='#ff4444', background='#1a1a1a')
+        self.tree.tag_configure('mismatch', foreground='#ffaa00', background='#1a1a1a')
+        self.tree.tag_configure('selected', background='#3a3a3a')  # Darker background for selected rows
+
+        style = ttk.Style()
+        try:
+            self.row_height = int(style.lookup("Treeview", "rowheight") or 0)
+        except (ValueError, tk.TclError):
+            self.row_height = 0
+        if not self.row_height:
+            self.row_height = 20
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_current(-1))
+        self.tree.bind("<Down>", lambda e: self._move_current(1))
+        self.tree.bind("<Prior>", lambda e: self._move_current(-self.rows))
+        self.tree.bind("<Next>", lambda e: self._move_current(self.rows))
+        model.listeners.append(self.schedule)
+
+    def schedule(self) -> None:
+        """Coalesce model changes into a single refresh on the next idle pass."""
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.root.after_idle(self.flush)
+
+    def flush(self) -> None:
+        """Apply pending model diffs to the rendered window."""
+        self.flush_pending = False
+        total = len(self.model)
+        self.top = max(0, min(self.top, total - self.rows))
+        window = (self.top, min(total, self.top + self.rows + 1))
+        if self.model.all_dirty or window != self.rendered:
+            self._render(window)
+        else:
+            start, end = window
+            for idx in self.model.dirty:
+                if start <= idx < end:
+                    values, tags = self.model.row(idx)
+                    self.tree.item(str(idx), values=values, tags=tags)
+        self.model.dirty.clear()
+        self.model.all_dirty = False
+        self._update_scrollbar()
+
+    def _render(self, window: tuple[int, int]) -> None:
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        start, end = window
+        for idx in range(start, end):
+            values, tags = self.model.row(idx)
+            self.tree.insert("", "end", iid=str(idx), values=values, tags=tags)
+        self.rendered = window
+        if self.current is not None and start <= self.current < end:
+            self.tree.selection_set(str(self.current))
+        self.tree.yview_moveto(0)
+
+    def _update_scrollbar(self) -> None:
+        total = len(self.model)
+        if total <= self.rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+
+    def scroll_to(self, top: int) -> None:
+        top = max(0, min(top, len(self.model) - self.rows))
+        if top != self.top:
+            self.top = top
+            self.schedule()
+
+    def see(self, idx: int) -> None:
+        """Scroll so that the given command index is in view."""
+        if idx < self.top:
+            self.scroll_to(idx)
+        elif idx >= self.top + self.rows:
+            self.scroll_to(idx - self.rows + 1)
+
+    def _scroll_by(self, delta: int) -> str:
+        self.scroll_to(self.top + delta)
+        return "break"
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self._scroll_by(step * 3 if step else 0)
+
+    def _on_scrollbar(self, *args: str) -> None:
+        total = len(self.model)
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1]) * (self.rows if args[2] == "pages" else 1)
+            self.scroll_to(self.top + amount)
+
+    def _on_configure(self, event: tk.Event) -> None:
+        # One heading row plus as many body rows as fit
+        rows = max(1, event.height // self.row_height - 1)
+        if rows != self.rows:
+            self.rows = rows
+            self.schedule()
+
+    def _on_select(self, event: tk.Event) -> None:
+        selection = self.tree.selection()
+        if selection:
             try:
-                self.ser.close()
-            except Exception:
+                self.current = int(selection[0])
+            except ValueError:
                 pass
 
+    def _move_current(self, delta: int) -> str:
+        if not len(self.model):
+            return "break"
+        idx = 0 if self.current is None else self.current + delta
+        idx = max(0, min(idx, len(self.model) - 1))
+        self.current = idx
+        self.see(idx)
+        self.flush()
+        if self.tree.exists(str(idx)):
+            self.tree.selection_set(str(idx))
+            self.tree.focus(str(idx))
+        return "break"
+
 
 class App:
     """Main application class for the Serial Terminal."""
     
-    def __init__(self, root: tk.Tk, cfg: dict[str, Any]) -> None:
+    def __init__(self, root: tk.Tk, cfg: dict[str, Any], trace: Optional[StartupTrace] = None) -> None:
         self.root = root
         self.cfg = cfg
-        self.log_buffer: list[str] = []
+        self.trace = trace or StartupTrace()
+        self.log_buffer = LineStore()
         self.last_cmd = ""
-        self.repeat_after: Optional[str] = None
+        self.repeater: Optional[RepeatScheduler] = None
+        self.loadgen: Optional[LoadGenerator] = None
+        # Per-command output: command index -> [(first line, end line, command, status, sent at)]
+        self.cmd_spans: dict[int, list[tuple[int, int, str, str, float]]] = {}
+        self.span_start = 0
+        # Latest span per command as Text marks cmd<N>_start/_end (the view has more
+        # lines than log_buffer entries); log_view_trimmed counts lines cut from the top
+        self.span_marks: dict[int, tuple[tuple[int, int, str, str, float], int]] = {}
+        self.span_start_line = 1
+        self.log_view_trimmed = 0
         self.help_shown = False
         self.font_size = 7
         self.eol_mode = cfg.get("eol_mode", "none")
@@ -212,7 +4133,7 @@ class App:
         self.line_counter = 0
         
         # Execution engine
-        self.exec_mode: Optional[str] = None  # 'seq', 'repeat', 'range', 'selected'
+        self.exec_mode: Optional[str] = None  # 'seq', 'repeat', 'range', 'selected', 'script'
         self.last_executed_real_idx = None  # Real index of last executed command (for 'selected' mode)
         self.exec_state = "IDLE"  # 'IDLE', 'WAIT_START', 'WAIT_COMPLETE'
         self.exec_timeout_id: Optional[str] = None
@@ -220,8 +4141,18 @@ class App:
         self.repeat_current = 0
         self.seq_current = 0
         self.seq_end = 0
-        self.command_status = {}  # Store status for each command: ✓ success, ✗ failed
-        self.selected_commands = set()  # Store indices of selected commands for Run Selected
+        # Command list state: text, selection (Run Selected) and status (✓ success, ✗ failed)
+        self.cmd_model = CommandListModel(cfg.get("commands", [""] * LINES_COUNT))
+        
+        # Command script execution ('script' mode)
+        self.script: Optional[CommandScript] = None
+        self.script_gen = 0  # Invalidates timers left over from a previous script run
+        self.script_pc = 0
+        self.script_vars: dict[str, Any] = {}
+        self.script_expect: Optional[tuple] = None
+        self.script_sent = 0
+        self.script_response: list[str] = []  # RX lines since the last script send
+        self.script_scan_from = 0  # First line an expect/until may still match
         
         # Stats
         self.stats = {
@@ -232,7 +4163,59 @@ class App:
         }
         self.last_cmd_time = None
         
-        self.backend = SerialBackend(cfg, self.on_rx, self.set_status, root)
+        # Numeric values extracted from responses (cfg["capture_rules"])
+        self.series = SeriesStore(cfg.get("capture_rules", {}))
+        self.plot: Optional[LivePlot] = None
+        
+        # Per-command execution record (see _on_command_sent / _finish_command)
+        self.cmd_in_flight = ""
+        self.cmd_response: list[str] = []
+        self.cmd_response_len = 0
+        self.cmd_sent_at = 0.0
+        self.cmd_sent_mono = 0.0
+        self.run_id: Optional[int] = None
+        self.results: Optional[ResultsStore] = None  # Opened on first run
+        self.golden: Optional[GoldenBaseline] = None  # Baseline of the current profile, if any
+        self.run_fingerprints: dict[str, dict[str, Any]] = {}
+        self.run_report: Optional[RunReport] = None
+        
+        # Timeline of execution events (Tools -> Record trace)
+        self.tracer = TraceRecorder(cfg.get("trace_max_events", TRACE_MAX_EVENTS))
+        self.trace_first_byte = False  # Waiting for the first RX byte after a send
+        self.cmd_start_seen = False  # "Start" already reported for the command in flight
+        self.trace_delay_start: Optional[float] = None  # Start of the inter-command delay
+        # Main-loop heartbeat, lag percentiles and stall stacks (Tools -> UI responsiveness report)
+        self.watchdog: Optional[LoopWatchdog] = None
+        self.lag_status_at = 0.0
+        
+        # JSON-RPC control socket (cfg["control_socket"] or --control), started after first paint
+        self.control: Optional[ControlServer] = None
+        self.control_pump_id: Optional[str] = None
+        # Raw port sharing with other local processes (Tools -> Share port, --share)
+        self.share: Optional[PortShareServer] = None
+        self.share_pump_id: Optional[str] = None
+        self.file_sender: Optional[FileSender] = None
+        self.modem: Optional[ModemTransfer] = None
+        # Binary framed protocol mode (Tools -> Binary frames, cfg "framing")
+        self.framer: Optional[FrameDecoder] = None
+        self.frame_layouts = FrameLayouts({})
+        self.frame_rows: deque = deque(maxlen=FRAME_ROWS)
+        self.frame_seq = 0
+        self.frame_view: Optional[FrameView] = None
+        # Raw byte history for the hex dump; the HEX label shows the latest RX chunk
+        limit = cfg.get("raw_capture_bytes", RAW_CAPTURE_BYTES)
+        self.rx_capture = RawCapture(limit)
+        self.tx_capture = RawCapture(limit)
+        self.hex_view: Optional[HexView] = None
+        self.last_rx_chunk = b""
+        self.hex_label_id: Optional[str] = None
+        
+        # The flight recorder dumps a window of that history on timeout/disconnect
+        self.flight = FlightRecorder({"RX": self.rx_capture, "TX": self.tx_capture}, cfg)
+        
+        self.backend = SerialBackend(cfg, self.on_rx, self._on_port_status, root)
+        self.backend.tx_tap = self.tx_capture.append
+        self.trace.mark("serial backend")
         
         self.build_ui()
         self.apply_theme()
@@ -240,6 +4223,9 @@ class App:
         self._load_window_settings()
         self.bind_keys()
         self.root.protocol("WM_DELETE_WINDOW", self.quit)
+        self.trace.mark("build ui")
+        # Non-essential work runs once the first frame is on screen
+        self.root.after(0, self._after_first_frame)
     
     def build_ui(self) -> None:
         """Build the user interface."""
@@ -276,12 +4262,36 @@ class App:
         # Other menus
         menubar.add_command(label="Port settings", command=self.port_settings)
         menubar.add_command(label="Save log", command=self.save_log_manual)
+        menubar.add_command(label="Open log", command=self.open_log_file)
         
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
         tools_menu.add_command(label="Search log (Ctrl+F)", command=self.search_log)
         tools_menu.add_command(label="Command statistics", command=self.show_statistics)
         tools_menu.add_command(label="Export filtered log", command=self.export_filtered_log)
+        tools_menu.add_command(label="Search archive...", command=self.search_archive)
+        tools_menu.add_command(label="Export timestamped log...", command=self.export_timestamped_log)
+        tools_menu.add_command(label="Merge logs...", command=self.merge_log_files)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Run command script...", command=self.run_script_file)
+        tools_menu.add_command(label="Send file...", command=self.send_file)
+        tools_menu.add_command(label="XMODEM/YMODEM transfer...", command=self.modem_transfer)
+        tools_menu.add_command(label="Load test...", command=self.load_test)
+        tools_menu.add_command(label="Captured series...", command=self.show_series)
+        tools_menu.add_command(label="Live plot...", command=self.show_plot)
+        tools_menu.add_command(label="Binary frames...", command=self.show_frames)
+        tools_menu.add_command(label="Hex dump...", command=self.show_hex_dump)
+        tools_menu.add_command(label="Dump flight recorder", command=self.dump_flight)
+        tools_menu.add_command(label="Results history...", command=self.show_results_history)
+        tools_menu.add_command(label="Mark last run as golden", command=self.mark_golden)
+        tools_menu.add_command(label="Clear golden baseline", command=self.clear_golden)
+        tools_menu.add_separator()
+        self.trace_var = tk.BooleanVar(value=False)
+        tools_menu.add_checkbutton(label="Record trace", variable=self.trace_var, command=self.toggle_trace)
+        tools_menu.add_command(label="Export trace...", command=self.export_trace)
+        tools_menu.add_command(label="UI responsiveness report...", command=self.export_loop_report)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Share port (start/stop)...", command=self.toggle_port_share)
         menubar.add_cascade(label="Tools", menu=tools_menu)
         
         # EOL mode menu
@@ -308,6 +4318,8 @@ class App:
         # Status bar
         self.status = ttk.Label(left, text="Port: —", foreground="gray")
         self.status.pack(fill="x")
+        self.lag_label = ttk.Label(left, text="UI lag: —", foreground="gray")
+        self.lag_label.pack(fill="x")
         
         # HEX display
         self.hex_label = ttk.Label(left, text="HEX:", cursor="hand2")
@@ -347,7 +4359,6 @@ class App:
             self.sim_entry.bind("<Return>", self.inject)
             ttk.Button(sim, text="Inject", command=self.inject).pack(side="left")
         
-        self.commands = self.cfg.get("commands", [""] * LINES_COUNT)
 
         # Right panel (command list)
         right = ttk.Frame(paned, width=300)
@@ -419,48 +4430,284 @@ class App:
         self.selected_count_label.pack(side="right", padx=5)
 
         
-        self.listbox = ttk.Treeview(right, columns=("Select", "#", "Command", "Status"), show="headings", height=20)
-        self.listbox.heading("Select", text="Select")
-        self.listbox.heading("#", text="#")
-        self.listbox.heading("Command", text="Command")
-        self.listbox.heading("Status", text="Status")
-        self.listbox.column("Select", width=60, anchor="center")
-        self.listbox.column("#", width=40, anchor="center")
-        self.listbox.column("Command", width=280)
-        self.listbox.column("Status", width=60, anchor="center")
-        self.listbox.pack(fill="both", expand=True)
-        
-        for i, cmd in enumerate(self.commands):
-            selected = "☑" if i in self.selected_commands else "☐"
-            self.listbox.insert("", "end", iid=str(i), values=(selected, i+1, cmd, ""))
-        
-        # Configure tags for visual feedback
-        self.listbox.tag_configure('selected', background='#3a3a3a')  # Darker background for selected rows
+        # Only the visible rows exist in the Treeview; they are rendered after the first frame
+        self.list_view = CommandListView(right, self.cmd_model, self.root)
+        self.listbox = self.list_view.tree
         self.listbox.bind("<Button-1>", self.on_list_click)
+        self.listbox.bind("<Control-Button-1>", self.show_command_output)
         self.listbox.bind("<Double-Button-1>", self.edit_cmd)
         
-        # Create context menu for right-click
-        # Create context menu for right-click
-        self.context_menu = tk.Menu(self.root, tearoff=0)
-        self.context_menu.add_command(label="Toggle Selection", command=self.toggle_selection)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Edit Command", command=self.edit_selected)
-        self.context_menu.add_command(label="Add New Command", command=self.add_new_command)
-        self.context_menu.add_command(label="Insert Before", command=self.insert_before)
-        self.context_menu.add_command(label="Insert After", command=self.insert_after)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Delete Command", command=self.delete_selected)
+        # Context menu is created on first right-click (see _ensure_context_menu)
+        self.context_menu: Optional[tk.Menu] = None
         
         # Bind right-click to show context menu
         self.listbox.bind("<Button-3>", self.show_context_menu)
         
         # macOS also uses Button-2 for right-click on some systems
         self.listbox.bind("<Button-2>", self.show_context_menu)
+
+    def _after_first_frame(self) -> None:
+        """Finish startup once the window has been painted."""
+        self.root.update_idletasks()
+        self.trace.mark("first paint")
+        self.list_view.flush()
+        self._update_selected_count()
+        self.trace.mark(f"command list ({len(self.commands)} commands)")
+        if self.cfg.get("control_socket") and self.control is None:  # --control wins
+            self.start_control_server(self.cfg["control_socket"])
+        if self.cfg.get("framing", {}).get("kind", "off") != "off":
+            self.set_framing(self.cfg["framing"])
+        if self.cfg.get("share_on_start") and self.cfg.get("share_port") and self.share is None:
+            self.start_port_share(self.cfg["share_port"])
+        if self.cfg.get("watchdog", True):
+            self.watchdog = LoopWatchdog(self.cfg.get("watchdog_stall_ms", WATCHDOG_STALL_MS))
+            self.root.after(WATCHDOG_TICK_MS, self._watchdog_tick)
+        self.trace.report()
+
+    @property
+    def commands(self) -> list[str]:
+        return self.cmd_model.commands
+
+    @property
+    def selected_commands(self) -> set[int]:
+        return self.cmd_model.selected
+
+    @property
+    def command_status(self) -> dict[int, str]:
+        return self.cmd_model.status
+
+    def _ensure_context_menu(self) -> tk.Menu:
+        """Create the command list context menu on first use."""
+        if self.context_menu is None:
+            self.context_menu = tk.Menu(self.root, tearoff=0)
+            self.context_menu.add_command(label="Toggle Selection", command=self.toggle_selection)
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="Show Output (Ctrl+Click)", command=self.show_command_output)
+            self.context_menu.add_command(label="Export Command Output...", command=self.export_command_output)
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="Edit Command", command=self.edit_selected)
+            self.context_menu.add_command(label="Add New Command", command=self.add_new_command)
+            self.context_menu.add_command(label="Insert Before", command=self.insert_before)
+            self.context_menu.add_command(label="Insert After", command=self.insert_after)
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="Delete Command", command=self.delete_selected)
+        return self.context_menu
+
     def set_eol(self, mode: str) -> None:
         """Set end-of-line mode."""
         self.eol_mode = mode
         self.cfg["eol_mode"] = mode
     
+    def start_control_server(self, address: str) -> None:
+        """Listen for JSON-RPC control clients on a local address (replacing any current one)."""
+        if self.control is not None:
+            self.control.close()
+        try:
+            self.control = ControlServer(address)
+        except (OSError, ValueError) as e:
+            self.control = None
+            self.set_status(f"control socket failed: {e}")
+            print(f"⚠️ Control socket {address} failed: {e}", file=sys.stderr)
+            return
+        self.set_status(f"control socket: {address}")
+        if self.control_pump_id is None:
+            self._control_pump()
+
+    def _control_pump(self) -> None:
+        if self.control is None:
+            self.control_pump_id = None
+            return
+        self.control.pump(self._control_call)
+        self.control_pump_id = self.root.after(CONTROL_PUMP_MS, self._control_pump)
+
+    def _control_call(self, method: str, params: dict[str, Any]) -> Any:
+        """Execute one control request on the Tk thread."""
+        if method == "send":
+            cmd = str(params.get("command", "")).strip()
+            if not cmd:
+                raise ControlError(-32602, "missing 'command'")
+            if self.exec_mode is not None:
+                raise ControlError(-32001, f"busy: {self.exec_mode} run in progress")
+            self._send_command(cmd)
+            return {"sent": cmd}
+        if method in ("run_range", "run_selected", "run_script"):
+            if self.exec_mode is not None:
+                raise ControlError(-32001, f"busy: {self.exec_mode} run in progress")
+            pattern = self._run_pattern(params.get("pattern"))
+            if not pattern:
+                raise ControlError(-32602, "completion pattern is empty")
+            if method == "run_range":
+                start, end = int(params.get("from", 1)), int(params.get("to", len(self.commands)))
+                if start < 1 or end > len(self.commands) or start > end:
+                    raise ControlError(-32602, f"invalid range {start}..{end} (1..{len(self.commands)})")
+                self.run_range(start, end, pattern)
+            elif method == "run_selected":
+                indices = params.get("indices")
+                if indices is not None:
+                    selected = {int(i) - 1 for i in indices}
+                    if not selected or min(selected) < 0 or max(selected) >= len(self.commands):
+                        raise ControlError(-32602, "indices must be 1-based command numbers")
+                    self.cmd_model.selected = selected
+                    self.cmd_model.all_dirty = True
+                    self.list_view.schedule()
+                    self._update_selected_count()
+                if not self.selected_commands:
+                    raise ControlError(-32602, "no commands selected")
+                self.run_selected(pattern)
+            else:
+                try:
+                    script = compile_script(str(params.get("script", "")))
+                except ScriptError as e:
+                    raise ControlError(-32602, str(e)) from None
+                self.run_script(script, "rpc", pattern)
+            return {"run_id": self.run_id, "mode": self.exec_mode}
+        if method == "stop":
+            self._stop_execution()
+            return True
+        if method == "load_profile":
+            path = str(params.get("path", ""))
+            if not os.path.exists(path):
+                raise ControlError(-32602, f"no such profile: {path}")
+            self.current_profile_path = path
+            self._load_profile_from_file(path)
+            return {"commands": len(self.commands)}
+        if method == "get_stats":
+            times = self.stats["cmd_times"]
+            return {
+                "total_sent": self.stats["total_sent"],
+                "success": self.stats["success"],
+                "failed": self.stats["failed"],
+                "avg_time": sum(times) / len(times) if times else None,
+                "exec_mode": self.exec_mode,
+                "exec_state": self.exec_state,
+                "run_id": self.run_id,
+                "commands": len(self.commands),
+                "lines": len(self.log_buffer),
+                "ui_lag_ms": self.watchdog.percentiles() if self.watchdog else None,
+                "ui_stalls": self.watchdog.stall_count if self.watchdog else None,
+            }
+        if method == "dump_flight":
+            return {"path": self.dump_flight(params.get("reason", "rpc"), params.get("note", ""))}
+        if method == "get_commands":
+            return {"commands": self.commands, "status": {str(i + 1): s for i, s in self.command_status.items()}}
+        raise ControlError(-32601, f"method not found: {method}")
+
+    def start_port_share(self, address: str) -> None:
+        """Share the serial port with local clients on an address."""
+        if self.share is not None:
+            self.share.close()
+        try:
+            self.share = PortShareServer(address, self.cfg.get("share_ring_bytes", SHARE_RING_BYTES))
+        except (OSError, ValueError) as e:
+            self.share = None
+            self.set_status(f"port share failed: {e}")
+            return
+        self.set_status(f"sharing port on {address}")
+        if self.share_pump_id is None:
+            self._share_pump()
+
+    def stop_port_share(self) -> None:
+        if self.share is not None:
+            self.share.close()
+            self.share = None
+            self.set_status("port sharing stopped")
+
+    def toggle_port_share(self) -> None:
+        """Start or stop port sharing from the Tools menu."""
+        if self.share is not None:
+            self.stop_port_share()
+            return
+        address = simpledialog.askstring(
+            "Share Port", "Address (PORT for socket://127.0.0.1:PORT, or unix:/path):",
+            initialvalue=self.cfg.get("share_port", "7700"))
+        if address:
+            self.cfg["share_port"] = address
+            self.start_port_share(address)
+
+    def _share_pump(self) -> None:
+        """Forward client writes to the device through the single TX arbiter."""
+        if self.share is None:
+            self.share_pump_id = None
+            return
+        self.share.drain_tx(self.backend.write)
+        self.share_pump_id = self.root.after(CONTROL_PUMP_MS, self._share_pump)
+
+    def _on_port_status(self, msg: str) -> None:
+        """Status callback of the serial backend."""
+        if self.tracer.enabled:
+            self.tracer.instant(msg.split(":", 1)[0], "io", {"status": msg})
+        self.set_status(msg)
+        if msg.startswith("disconnected"):
+            self.dump_flight("disconnect", msg, auto=True)
+
+    def toggle_trace(self) -> None:
+        """Start or stop recording execution events."""
+        self.tracer.enabled = self.trace_var.get()
+        if self.tracer.enabled:
+            self.tracer.clear()
+            self.set_status("trace recording")
+        else:
+            self.set_status(f"trace stopped: {len(self.tracer.events)} events")
+
+    def _watchdog_tick(self) -> None:
+        """Main-loop heartbeat: feed the watchdog, trace late beats, refresh lag status."""
+        wd = self.watchdog
+        if wd is None:
+            return
+        lag, stall = wd.beat()
+        if stall is not None:
+            top = stall.top_stack()
+            line = f"⏳ UI stalled {stall.duration * 1000:.0f} ms" + (f" in {top[-1]}" if top else "") + "\n"
+            self.log_buffer.append(line)
+            self.log.insert("end", line)
+            self.log.see("end")
+        if self.tracer.enabled and lag > wd.tick:
+            args = {"stack": list(stall.top_stack())} if stall is not None else None
+            self.tracer.span("ui stall", wd.last_beat - lag, wd.last_beat, "ui", args)
+        if wd.last_beat - self.lag_status_at >= WATCHDOG_STATUS_MS / 1000:
+            self.lag_status_at = wd.last_beat
+            pct = wd.percentiles()
+            self.lag_label.config(text=f"UI lag p50 {pct['p50']:.0f} / p99 {pct['p99']:.0f} / "
+                                       f"max {pct['max']:.0f} ms · stalls {wd.stall_count}")
+        self.root.after(WATCHDOG_TICK_MS, self._watchdog_tick)
+
+    def export_loop_report(self) -> None:
+        """Save UI loop lag percentiles and stall stack samples as text."""
+        if self.watchdog is None:
+            messagebox.showinfo("UI responsiveness", "Watchdog is disabled (\"watchdog\": false)")
+            return
+        f = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            initialfile=f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}-ui-loop.txt",
+            filetypes=[("Text", "*.txt")]
+        )
+        if not f:
+            return
+        try:
+            with open(f, "w", encoding="utf-8") as fh:
+                fh.write(self.watchdog.report())
+            self.set_status(f"UI report: {self.watchdog.stall_count} stalls → {os.path.basename(f)}")
+        except Exception as e:
+            self.set_status(f"UI report failed: {e}")
+
+    def export_trace(self) -> None:
+        """Save recorded events as a Chrome trace JSON file."""
+        if not self.tracer.events:
+            messagebox.showinfo("Trace", "No events recorded (enable Tools → Record trace)")
+            return
+        f = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}-trace.json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        if not f:
+            return
+        try:
+            n = self.tracer.export(f)
+            self.set_status(f"trace: {n} events → {os.path.basename(f)}")
+        except Exception as e:
+            self.set_status(f"trace export failed: {e}")
+
     def set_status(self, msg: str) -> None:
         """Update status bar."""
         color = "lime" if "connected" in msg else "red"
@@ -588,18 +4835,35 @@ class App:
         """Quit application."""
         self._save_window_settings()
         self.backend.close()
+        if self.results is not None:
+            self.results.close()
+        if self.control is not None:
+            self.control.close()
+        self.stop_port_share()
+        if self.repeater is not None:
+            self.repeater.stop()
+        if self.loadgen is not None:
+            self.loadgen.stop()
+        if self.watchdog is not None:
+            self.watchdog.stop()
         self.root.quit()
         self.root.destroy()
+
     def clear(self) -> None:
         """Clear log buffer."""
         self.log.delete("1.0", "end")
         self.log_buffer.clear()
+        self.cmd_spans.clear()
+        self.span_start = 0
+        self.span_marks.clear()
+        self.log_view_trimmed = 0
         self.hex_label.config(text="HEX:")
+        self.last_rx_chunk = b""
         self.line_counter = 0
     
     def _prepare_log_content(self) -> str:
         """Prepare log content for saving with normalization."""
-        content = "".join(self.log_buffer)
+        content = self.log_buffer.text()
 
         # Normalize line endings
         if self.cfg.get("normalize_line_endings", True):
@@ -650,7 +4914,8 @@ class App:
         if self.help_shown:
             return
         
-        self.log.delete("1.0", "end")
+        self.log.delete("1.0", "end")  # Collapses every mark; hide_help() rebuilds them
+        self.span_marks.clear()
         text = """Ctrl+X  Quit
 Ctrl+B  Clear
 Ctrl+C  Copy selected text
@@ -694,13 +4959,46 @@ macOS / Linux / Termux(Android) / Windows"""
             return
         
         self.log.delete("1.0", "end")
-        for line in self.log_buffer:
-            self.log.insert("end", line)
+        first = max(0, len(self.log_buffer) - self.cfg.get("log_view_lines", LOG_VIEW_LINES))
+        self.log.insert("end", self.log_buffer.text(first))
+        self._rebuild_span_marks(first)
         self.log.see("end")
         self.help_shown = False
+
+    def _rebuild_span_marks(self, first: int) -> None:
+        """Re-place the output marks after the view was refilled from log_buffer[first:]."""
+        # View line n is now log_buffer line first + n - 1, so the trim count is `first`
+        self.log_view_trimmed = first
+        self.span_marks.clear()
+        self.log.mark_set("span_start", f"{max(self.span_start - first, 0) + 1}.0")
+        self.log.mark_gravity("span_start", "left")
+        self.span_start_line = self.span_start + 1
+        for idx, spans in self.cmd_spans.items():
+            span = spans[-1]
+            start, end = span[0], span[1]
+            if start < first:
+                continue  # Scrolled out of the view
+            self.span_marks[idx] = (span, start + 1)
+            for name, line in ((f"cmd{idx}_start", start), (f"cmd{idx}_end", end)):
+                self.log.mark_set(name, f"{line - first + 1}.0")
+                self.log.mark_gravity(name, "left")
     
     def on_rx(self, data: bytes) -> None:
         """Handle received data."""
+        self.rx_capture.append(data)
+        self.last_rx_chunk = data
+        if self.hex_label_id is None:
+            self.hex_label_id = self.root.after(HEX_LABEL_MS, self._update_hex_label)
+        if self.share is not None:
+            self.share.publish(data)
+        if self.file_sender is not None and not self.file_sender.done:
+            self.file_sender.feed(data)
+        if self.trace_first_byte:
+            self.trace_first_byte = False
+            self.tracer.instant("first byte", "io", {"after_ms": round((time.monotonic() - self.cmd_sent_mono) * 1000, 3)})
+        if self.framer is not None:
+            self._on_frames(self.framer.feed(data))
+            return
         if self.help_shown:
             return
         
@@ -717,6 +5015,12 @@ macOS / Linux / Termux(Android) / Windows"""
         
         self.line_counter += 1
         
+        # Structured capture for the command whose response this is
+        self.series.feed(txt)
+        if self.exec_mode is not None and self.cmd_response_len < RESPONSE_EXCERPT:
+            self.cmd_response.append(txt + "\n")
+            self.cmd_response_len += len(txt) + 1
+        
         # Build display line
         display_parts = []
         if self.cfg.get("show_line_numbers", False):
@@ -729,19 +5033,26 @@ macOS / Linux / Termux(Android) / Windows"""
         display_parts.append(txt)
         display_line = " ".join(display_parts)
         
-        self.log_buffer.append(display_line + '\n')
+        self.log_buffer.append(display_line + '\n', LINE_RX)
         self.log.insert("end", display_line + '\n')
         self.log.see("end")
+        if self.line_counter % LOG_VIEW_TRIM_EVERY == 0:
+            self._trim_log_view()
+        if self.control is not None and self.control.subscribers:
+            self.control.publish(txt)
         
-        hx = " ".join(f"{b:02X}" for b in data)
-        self.hex_label.config(text=f"HEX: {hx}")
+        # Command scripts match their own expect/until patterns
+        if self.exec_mode == 'script':
+            self._script_on_rx(txt)
+            return
         
         # Execution engine: check for Start and Complete patterns
         if self.exec_mode is not None and txt.strip():
             txt_lower = txt.lower()
             
-            # Check for "Start" pattern - command execution started
-            if "start" in txt_lower and self.exec_state == 'WAIT_START':
+            # Check for "Start" pattern - first one while the command is in flight
+            if ("start" in txt_lower and not self.cmd_start_seen
+                    and self.exec_state in ('WAIT_START', 'WAIT_COMPLETE')):
                 self._handle_start()
             
             # Check for completion pattern (e.g., "Complete")
@@ -749,28 +5060,185 @@ macOS / Linux / Termux(Android) / Windows"""
             if pattern_lower in txt_lower and self.exec_state == 'WAIT_COMPLETE':
                 self._handle_complete()
     
+    def _trim_log_view(self) -> None:
+        """Keep the Text widget to the newest log_view_lines; the full log stays in log_buffer."""
+        limit = self.cfg.get("log_view_lines", LOG_VIEW_LINES)
+        excess = int(self.log.index("end-1c").split(".")[0]) - limit
+        if excess > 0:
+            self.log.delete("1.0", f"{excess + 1}.0")
+            self.log_view_trimmed += excess
+
     def send(self, event: Optional[tk.Event] = None) -> None:
         """Send command."""
         txt = self.entry.get().strip()
         if not txt:
             return
         
+        self._send_command(txt)
+        
+        # Command history persistence
+        if "cmd_history" not in self.cfg:
+            self.cfg["cmd_history"] = []
+        if txt not in self.cfg["cmd_history"]:
+            self.cfg["cmd_history"].append(txt)
+    
+    def _send_command(self, txt: str) -> None:
+        """Write one command to the device and echo it to the log."""
         self.last_cmd = txt
         self.stats["total_sent"] += 1
         self.last_cmd_time = datetime.now()
-        
+
         self.backend.write((txt + "\r").encode())
+        self._on_command_sent(txt)
         line = f">> {txt}\n"
         self.log_buffer.append(line)
         self.log.insert("end", line)
         self.log.see("end")
-        
-        # Command history persistence
-        if "cmd_history" not in self.cfg:
-            self.cfg["cmd_history"] = []
-        if txt not in self.cfg["cmd_history"]:
-            self.cfg["cmd_history"].append(txt)
-    
+
+    def _on_command_sent(self, cmd: str) -> None:
+        """Bookkeeping shared by every path that writes a command to the device."""
+        self.span_start = len(self.log_buffer)
+        self.cmd_start_seen = False
+        self.log.mark_set("span_start", "end-1c")
+        self.log.mark_gravity("span_start", "left")
+        self.span_start_line = self.log_view_trimmed + int(self.log.index("span_start").split(".")[0])
+        self.series.set_command(cmd)
+        self.cmd_in_flight = cmd
+        self.cmd_response = []
+        self.cmd_response_len = 0
+        self.cmd_sent_at = time.time()
+        self.cmd_sent_mono = time.monotonic()
+        if self.tracer.enabled:
+            if self.trace_delay_start is not None:
+                self.tracer.span("inter-command delay", self.trace_delay_start, self.cmd_sent_mono)
+            self.trace_delay_start = None
+            self.trace_first_byte = True
+            self.tracer.instant("send", args={"command": cmd})
+
+    def _results_store(self) -> Optional[ResultsStore]:
+        """Open the results database on first use (cfg: results_enabled, results_db)."""
+        if self.results is None and self.cfg.get("results_enabled", True):
+            import sqlite3
+            try:
+                self.results = ResultsStore(self.cfg.get("results_db", RESULTS_DB))
+            except sqlite3.Error as e:
+                self.cfg["results_enabled"] = False
+                self.set_status(f"results store disabled: {e}")
+        return self.results
+
+    def _golden_path(self) -> str:
+        stem = os.path.splitext(self.current_profile_path)[0]
+        return f"{stem}.golden.json"
+
+    def _load_golden(self) -> None:
+        """Load the golden baseline of the current profile, if one was marked."""
+        path = self._golden_path()
+        self.golden = None
+        if os.path.exists(path):
+            try:
+                self.golden = GoldenBaseline.load(path)
+            except (OSError, ValueError) as e:
+                self.set_status(f"golden baseline unreadable: {e}")
+
+    def mark_golden(self) -> None:
+        """Save the fingerprints of the last (or current) run as the golden baseline."""
+        if not self.run_fingerprints:
+            messagebox.showwarning("Golden Baseline", "Run some commands first")
+            return
+        path = self._golden_path()
+        try:
+            GoldenBaseline(dict(self.run_fingerprints)).save(path)
+        except OSError as e:
+            self.set_status(f"golden save failed: {e}")
+            return
+        self._load_golden()
+        self.set_status(f"golden baseline: {len(self.run_fingerprints)} responses → {os.path.basename(path)}")
+
+    def clear_golden(self) -> None:
+        """Remove the golden baseline of the current profile."""
+        path = self._golden_path()
+        if os.path.exists(path) and messagebox.askyesno("Golden Baseline", f"Delete {os.path.basename(path)}?"):
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.set_status(f"golden delete failed: {e}")
+                return
+        self.golden = None
+
+    def _begin_run(self, mode: str) -> None:
+        """Start a new run record for an execution mode."""
+        self._load_golden()
+        self.run_fingerprints = {}
+        store = self._results_store()
+        if store is not None:
+            self.run_id = store.start_run(os.path.basename(self.current_profile_path),
+                                          str(self.cfg.get("port", "")), mode)
+        self.run_report = RunReport(mode, os.path.basename(self.current_profile_path),
+                                    str(self.cfg.get("port", "")), self.run_id)
+
+    def _end_run(self) -> None:
+        if self.control is not None and self.exec_mode is not None:
+            summary = self.run_report.summary() if self.run_report is not None else {}
+            self.control.notify("run_finished", {"mode": self.exec_mode, "run_id": self.run_id, **summary})
+        if self.run_id is not None and self.results is not None:
+            self.results.end_run(self.run_id)
+        self.run_id = None
+        if self.run_report is not None and self.run_report.ended is None:
+            self.run_report.ended = time.time()
+
+    def _write_run_reports(self) -> None:
+        """Write JUnit XML and JSON reports of the run that just finished."""
+        report = self.run_report
+        if report is None or not self.cfg.get("write_reports", True):
+            return
+        timestamp = datetime.fromtimestamp(report.started).strftime("%Y-%m-%d_%H-%M-%S")
+        base = os.path.join(self.cfg.get("report_dir", "."), f"{timestamp}-{report.mode}-report")
+        try:
+            os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+            xml_path, _ = report.write(base)
+            s = report.summary()
+            self.log.insert("end", f"📊 Report: {s['passed']}/{s['tests']} passed → {os.path.basename(xml_path)} (+ .json)\n")
+        except OSError as e:
+            self.set_status(f"report failed: {e}")
+
+    def _finish_command(self, cmd_index: Optional[int], cmd: str, status: str) -> None:
+        """Record the outcome ('success' or 'timeout') of the command in flight."""
+        latency = time.monotonic() - self.cmd_sent_mono if status == "success" else None
+        if cmd_index is not None:
+            # Output span: log_buffer lines from the send to Complete/timeout
+            span = (self.span_start, len(self.log_buffer), cmd.strip(), status, self.cmd_sent_at)
+            self.cmd_spans.setdefault(cmd_index, []).append(span)
+            self.span_marks[cmd_index] = (span, self.span_start_line)
+            self.log.mark_set(f"cmd{cmd_index}_start", "span_start")
+            self.log.mark_set(f"cmd{cmd_index}_end", "end-1c")
+            self.log.mark_gravity(f"cmd{cmd_index}_start", "left")
+            self.log.mark_gravity(f"cmd{cmd_index}_end", "left")
+        if status == "success":
+            # Golden comparison: one dict lookup plus the fingerprint of this response
+            key = GoldenBaseline.key(cmd_index, cmd)
+            fp = GoldenBaseline.fingerprint("".join(self.cmd_response))
+            self.run_fingerprints[key] = fp
+            if self.golden is not None:
+                reason = self.golden.compare(key, cmd, fp, self.cfg.get("golden_tolerance", {}))
+                if reason:
+                    status = "mismatch"
+                    line = f"≠ MISMATCH: {cmd} - {reason}\n"
+                    self.log_buffer.append(line)
+                    self.log.insert("end", line)
+                    self.log.see("end")
+                    if cmd_index is not None:
+                        self._update_command_status(cmd_index, '≠')
+        if self.tracer.enabled:
+            self.tracer.span(cmd or "command", self.cmd_sent_mono, args={"status": status, "index": cmd_index})
+            self.trace_delay_start = time.monotonic()
+        response = "".join(self.cmd_response)
+        if self.run_report is not None:
+            self.run_report.add(cmd_index, cmd, status, latency, response, self.cmd_sent_at)
+        if self.run_id is not None and self.results is not None:
+            self.results.record(self.run_id, os.path.basename(self.current_profile_path),
+                                str(self.cfg.get("port", "")), cmd, cmd_index, status, latency,
+                                response, self.cmd_sent_at, time.time())
+
     def _send_next_command(self) -> None:
         """Send next command in sequence."""
         if not self.seq_running:
@@ -812,6 +5280,7 @@ macOS / Linux / Termux(Android) / Windows"""
         self.seq_current = 0
         self.seq_end = len(self.commands)
         self.seq_status.config(text="Starting sequence...")
+        self._begin_run('seq')
         self._exec_next()
 
     def seq_stop(self) -> None:
@@ -820,6 +5289,7 @@ macOS / Linux / Termux(Android) / Windows"""
 
     def _stop_execution(self) -> None:
         """Stop any running execution."""
+        self._end_run()
         self.exec_mode = None
         self.exec_state = 'IDLE'
         if self.exec_timeout_id:
@@ -838,33 +5308,16 @@ macOS / Linux / Termux(Android) / Windows"""
         
         Args:
             cmd_index: Zero-based command index
-            status: Status icon - '✓' for success, '✗' for failure, '' for clear
+            status: Status icon - '✓' for success, '✗' for failure,
+                '≠' for a response that differs from the golden run, '' for clear
         """
-
-        self.command_status[cmd_index] = status
-        try:
-            # Сохраняем состояние Select колонки - КРИТИЧНО для повторного выбора!
-            selected = "☑" if cmd_index in self.selected_commands else "☐"
-            
-            if status == '✓':
-                self.listbox.item(str(cmd_index), values=(selected, cmd_index+1, self.commands[cmd_index], status), tags=('success',))
-                self.listbox.tag_configure('success', foreground='#00ff00', background='#1a1a1a')
-            elif status == '✗':
-                self.listbox.item(str(cmd_index), values=(selected, cmd_index+1, self.commands[cmd_index], status), tags=('failed',))
-                self.listbox.tag_configure('failed', foreground='#ff4444', background='#1a1a1a')
-            else:
-                self.listbox.item(str(cmd_index), values=(selected, cmd_index+1, self.commands[cmd_index], status))
-        except Exception:
-            pass  # Item might not exist in listbox
+        if 0 <= cmd_index < len(self.commands):
+            self.cmd_model.set_status(cmd_index, status)
 
     def _clear_all_statuses(self) -> None:
         """Clear all command statuses."""
-        self.command_status.clear()
-        for i in range(len(self.commands)):
-            try:
-                self.listbox.item(str(i), values=(i+1, self.commands[i], ""))
-            except Exception:
-                pass
+        self.cmd_model.clear_statuses()
+
     def _exec_next(self) -> None:
         """Execute next command based on current mode."""
         if self.exec_mode is None or self.exec_state == 'IDLE':
@@ -892,6 +5345,7 @@ macOS / Linux / Termux(Android) / Windows"""
                     # Auto-save log for selected mode
                     self.save_log_auto()
                     self.log.insert("end", "\n📁 Log auto-saved after selected completion\n")
+                    self._write_run_reports()
                     return
             else:
                 # Original seq or range mode
@@ -902,13 +5356,15 @@ macOS / Linux / Termux(Android) / Windows"""
                         break
                 else:
                     # No more commands
+                    mode = self.exec_mode
                     self._stop_execution()
                     self.seq_status.config(text="Sequence complete")
                     self.set_status("sequence complete")
                     # Auto-save log for range mode
-                    if self.exec_mode == 'range':
+                    if mode == 'range':
                         self.save_log_auto()
                         self.log.insert("end", "\n📁 Log auto-saved after range completion\n")
+                        self._write_run_reports()
                     return
         
         elif self.exec_mode == 'repeat':
@@ -932,6 +5388,7 @@ macOS / Linux / Termux(Android) / Windows"""
         self.entry.delete(0, "end")
         self.entry.insert(0, cmd)
         self.backend.write((cmd + "\r").encode())
+        self._on_command_sent(cmd)
         line = f">> {cmd}\n"
         self.log_buffer.append(line)
         self.log.insert("end", line)
@@ -970,24 +5427,30 @@ macOS / Linux / Termux(Android) / Windows"""
         timeout_ms = self.seq_timeout * 1000
         self.exec_timeout_id = self.root.after(timeout_ms, self._handle_timeout)
 
+    def _current_cmd_index(self) -> int:
+        """Zero-based index of the command in flight."""
+        if self.exec_mode == 'selected' and self.last_executed_real_idx is not None:
+            return self.last_executed_real_idx
+        return self.seq_current - 1
+
     def _handle_timeout(self) -> None:
         """Handle timeout - command didn't complete in time."""
         if self.exec_mode is None:
             return
 
         self.stats["failed"] += 1
+        self.exec_state = 'DELAY'  # A late 'Complete' must not count for the next command
+        self.tracer.instant("timeout")
         # Get command index for status update
-        if self.exec_mode == 'selected' and self.last_executed_real_idx is not None:
-            cmd_index = self.last_executed_real_idx
-            cmd_num = cmd_index + 1
-        else:
-            cmd_num = getattr(self, 'seq_current', '?')
-            cmd_index = cmd_num - 1  # Convert to 0-based index
+        cmd_index = self._current_cmd_index()
+        cmd_num = cmd_index + 1
         log_msg = f"⚠️ TIMEOUT: Command #{cmd_num} - no 'Complete' within {self.seq_timeout}s, proceeding to next\n"
         self.log.insert("end", log_msg)
         self.log.see("end")
+        self.dump_flight("timeout", f"command #{cmd_num}: {self.cmd_in_flight}", auto=True)
         # Update status in Treeview with red X
         self._update_command_status(cmd_index, '✗')
+        self._finish_command(cmd_index, self.cmd_in_flight, "timeout")
 
         # Move to next command despite timeout
         if self.exec_mode in ['seq', 'range', 'selected']:
@@ -1000,21 +5463,20 @@ macOS / Linux / Termux(Android) / Windows"""
         if self.exec_mode is None:
             return
 
+        self.exec_state = 'DELAY'  # Ignore further pattern matches until the next send
+        self.tracer.instant("Complete seen")
         # Log successful completion
         if self.last_cmd_time:
             delta = (datetime.now() - self.last_cmd_time).total_seconds()
             # Get command index for status update
-            if self.exec_mode == 'selected' and self.last_executed_real_idx is not None:
-                cmd_index = self.last_executed_real_idx
-                cmd_num = cmd_index + 1
-            else:
-                cmd_num = getattr(self, 'seq_current', '?')
-                cmd_index = cmd_num - 1  # Convert to 0-based index
+            cmd_index = self._current_cmd_index()
+            cmd_num = cmd_index + 1
             log_msg = f"✓ SUCCESS: Command #{cmd_num} completed in {delta:.2f}s\n"
             self.log.insert("end", log_msg)
             self.log.see("end")
             # Update status in Treeview with green checkmark
             self._update_command_status(cmd_index, '✓')
+            self._finish_command(cmd_index, self.cmd_in_flight, "success")
         if self.exec_timeout_id:
             try:
                 self.root.after_cancel(self.exec_timeout_id)
@@ -1036,70 +5498,605 @@ macOS / Linux / Termux(Android) / Windows"""
     def _handle_start(self) -> None:
         """Handle 'Start' received - command execution started."""
         # This is mainly for logging purposes, actual timeout was started when command was sent
+        self.cmd_start_seen = True
+        self.tracer.instant("Start seen")
         self.set_status("Command started...")
-    def run_range(self) -> None:
-        """Run commands from specified line range."""
-        start = self.range_from.get() - 1  # Convert to 0-based
-        end = self.range_to.get()
+    def _run_pattern(self, pattern: Optional[str] = None) -> str:
+        """Completion pattern for a run: the given one (control socket) or the entry's."""
+        return (self.seq_pattern_entry.get() if pattern is None else str(pattern)).strip()
+
+    def run_range(self, first: Optional[int] = None, last: Optional[int] = None,
+                  pattern: Optional[str] = None) -> None:
+        """Run commands from specified line range (1-based, defaults to the range fields)."""
+        start = (self.range_from.get() if first is None else first) - 1  # Convert to 0-based
+        end = self.range_to.get() if last is None else last
 
         if start < 0 or end > len(self.commands) or start >= end:
             messagebox.showerror("Range Error", f"Invalid range: {start+1} to {end}")
             return
 
-        self.seq_pattern = self.seq_pattern_entry.get().strip()
-        if not self.seq_pattern:
-            messagebox.showwarning("Pattern Required", "Please enter a completion pattern")
-            return
+        self.seq_pattern = self._run_pattern(pattern)
+        if not self.seq_pattern:
+            messagebox.showwarning("Pattern Required", "Please enter a completion pattern")
+            return
+
+        # Load timing settings from UI
+        self.seq_delay = self.seq_delay_var.get()
+        self.seq_timeout = self.seq_timeout_var.get()
+
+        # Clear log and initialize range execution
+        self.clear()
+        self.line_counter = 0
+
+        # Initialize execution for range mode
+        self.exec_mode = 'range'
+        self.exec_state = 'WAIT_START'
+        self.seq_current = start
+        self.seq_end = end
+        self.seq_status.config(text=f"Running range: {start+1} to {end}")
+        self.set_status(f"Running range: {start+1} to {end}")
+        self._begin_run('range')
+        self._exec_next()
+    def run_selected(self, pattern: Optional[str] = None) -> None:
+        """Run only selected commands."""
+        if not self.selected_commands:
+            messagebox.showwarning("No Selection", "Please select commands by clicking the Select column")
+            return
+        
+        self.seq_pattern = self._run_pattern(pattern)
+        if not self.seq_pattern:
+            messagebox.showwarning("Pattern Required", "Please enter a completion pattern")
+            return
+        
+        # Load timing settings from UI
+        self.seq_delay = self.seq_delay_var.get()
+        self.seq_timeout = self.seq_timeout_var.get()
+        
+        # Get sorted list of selected indices
+        self.seq_selected_indices = sorted(self.selected_commands)
+        
+        # Clear log and initialize selected execution
+        self.clear()
+        self.line_counter = 0
+        
+        # Initialize execution for selected mode
+        self.exec_mode = 'selected'
+        self.exec_state = 'WAIT_START'
+        self.seq_current = 0  # Index in seq_selected_indices
+        self.seq_end = len(self.seq_selected_indices)
+        first_idx = self.seq_selected_indices[0] + 1
+        last_idx = self.seq_selected_indices[-1] + 1
+        self.seq_status.config(text=f"Running selected: {len(self.seq_selected_indices)} commands ({first_idx}-{last_idx})")
+        self.set_status(f"Running selected commands: {len(self.seq_selected_indices)} total")
+        self._begin_run('selected')
+        self._exec_next()
+
+
+    def run_script_file(self) -> None:
+        """Load, compile and run a command script file."""
+        f = filedialog.askopenfilename(
+            initialdir=PROFILE_DIR,
+            title="Run Command Script",
+            filetypes=[("Command scripts", "*.cmds *.txt"), ("All files", "*.*")]
+        )
+        if not f:
+            return
+        try:
+            with open(f, encoding="utf-8") as fp:
+                script = compile_script(fp.read())
+        except ScriptError as e:
+            messagebox.showerror("Script Error", f"{os.path.basename(f)}: {e}")
+            return
+        except OSError as e:
+            messagebox.showerror("Script Error", str(e))
+            return
+        self.run_script(script, os.path.basename(f))
+
+    def run_script(self, script: CommandScript, name: str = "script", pattern: Optional[str] = None) -> None:
+        """Run a compiled command script through the execution engine."""
+        self.seq_pattern = self._run_pattern(pattern)
+        if not self.seq_pattern:
+            messagebox.showwarning("Pattern Required", "Please enter a completion pattern")
+            return
+
+        # Load timing settings from UI
+        self.seq_delay = self.seq_delay_var.get()
+        self.seq_timeout = self.seq_timeout_var.get()
+
+        self.script = script
+        self.script_gen += 1
+        self.script_pc = 0
+        self.script_vars = {"ok": 1}
+        self.script_expect = None
+        self.script_sent = 0
+        self.script_response = []
+        self.script_scan_from = 0
+        self.script_complete_rx = re.compile(re.escape(self.seq_pattern), re.IGNORECASE)
+        self.exec_mode = 'script'
+        self.exec_state = 'RUNNING'
+        self.seq_status.config(text=f"Running {name}: {len(script)} ops")
+        self.set_status(f"Running script {name}")
+        self._begin_run('script')
+        self._script_step(self.script_gen)
+
+    def _script_step(self, gen: int) -> None:
+        """Run plan ops until one has to wait for the device or a timer."""
+        if self.exec_mode != 'script' or gen != self.script_gen:
+            return
+        plan = self.script.plan
+        variables = self.script_vars
+        end = len(plan)
+        pc = self.script_pc
+        budget = SCRIPT_OPS_PER_TICK
+        while budget:
+            budget -= 1
+            if pc >= end:
+                self._script_finish("Script complete")
+                return
+            op = plan[pc]
+            code = op[0]
+            pc += 1
+            if code == OP_FOR_NEXT:
+                i = variables[op[1]]
+                if i < len(op[3]):
+                    variables[op[2]] = op[3][i]
+                    variables[op[1]] = i + 1
+                else:
+                    pc = op[4]
+            elif code == OP_JUMP:
+                pc = op[1]
+            elif code == OP_FOR_INIT:
+                variables[op[1]] = 0
+            elif code == OP_SET:
+                variables[op[1]] = render_template(op[2], variables)
+            elif code == OP_IF:
+                rhs = op[3] if op[2] == "~" else render_template(op[3], variables)
+                if not _script_compare(render_template(op[1], variables), op[2], rhs):
+                    pc = op[4]
+            elif code == OP_WRITE:
+                self._script_send(render_template(op[1], variables))
+            elif code == OP_SEND:
+                cmd = render_template(op[1], variables)
+                self._script_send(cmd)
+                self.script_pc = pc
+                self._script_wait(gen, ("send", cmd), self.script_complete_rx, None, self.seq_timeout)
+                return
+            elif code == OP_EXPECT:
+                self.script_pc = pc
+                self._script_wait(gen, ("expect",), op[1], op[2], op[3] or self.seq_timeout)
+                return
+            elif code == OP_UNTIL:
+                self.script_pc = pc
+                self._script_wait(gen, ("until", op[3], op[4], op[5]), op[1], None, op[2] or self.seq_timeout)
+                return
+            elif code == OP_WAIT:
+                self.script_pc = pc
+                self.root.after(int(op[1] * 1000), self._script_step, gen)
+                return
+            elif code == OP_ECHO:
+                line = f"# {render_template(op[1], variables)}\n"
+                self.log_buffer.append(line)
+                self.log.insert("end", line)
+                self.log.see("end")
+            elif code == OP_STOP:
+                self._script_finish("Script stopped")
+                return
+        # Op budget used up (long loop without I/O): yield to the event loop
+        self.script_pc = pc
+        self.root.after(0, self._script_step, gen)
+
+    def _script_send(self, cmd: str) -> None:
+        """Write one script command to the device and log it."""
+        self.backend.write((cmd + "\r").encode())
+        self._on_command_sent(cmd)
+        line = f">> {cmd}\n"
+        self.log_buffer.append(line)
+        self.log.insert("end", line)
+        self.log.see("end")
+        self.last_cmd = cmd
+        self.stats["total_sent"] += 1
+        self.last_cmd_time = datetime.now()
+        self.script_sent += 1
+        self.script_response = []
+        self.script_scan_from = 0
+        self.seq_status.config(text=f"Script: op {self.script_pc + 1}/{len(self.script)}, sent {self.script_sent}")
+
+    def _script_wait(self, gen: int, kind: tuple, rx: re.Pattern, var: Optional[str], timeout: float) -> None:
+        """Wait for a pattern in the RX stream, with a timeout."""
+        self.script_expect = (kind, rx, var)
+        self.exec_state = 'WAIT_COMPLETE'
+        if self.exec_timeout_id:
+            try:
+                self.root.after_cancel(self.exec_timeout_id)
+            except Exception:
+                pass
+        self.exec_timeout_id = self.root.after(int(timeout * 1000), self._script_timeout, gen)
+        if kind[0] == "send":
+            return
+        # expect/until also see the response that arrived before they started
+        # (e.g. an OK that came with the previous send's Complete)
+        for i in range(self.script_scan_from, len(self.script_response)):
+            m = rx.search(self.script_response[i])
+            if m:
+                self.script_scan_from = i + 1
+                self._script_matched(m)
+                return
+
+    def _script_on_rx(self, txt: str) -> None:
+        """Match received text against the pattern the script is waiting for."""
+        if len(self.script_response) >= SCRIPT_RESPONSE_LINES:
+            cut = SCRIPT_RESPONSE_LINES // 2
+            del self.script_response[:cut]
+            self.script_scan_from = max(0, self.script_scan_from - cut)
+        self.script_response.append(txt)
+        if self.script_expect is None:
+            return
+        m = self.script_expect[1].search(txt)
+        if not m:
+            return
+        if self.script_expect[0][0] != "send":
+            self.script_scan_from = len(self.script_response)
+        self._script_matched(m)
+
+    def _script_matched(self, m: re.Match) -> None:
+        """Finish the current script wait with a successful match."""
+        kind, _, var = self.script_expect
+        self.script_expect = None
+        self.exec_state = 'RUNNING'
+        if self.exec_timeout_id:
+            try:
+                self.root.after_cancel(self.exec_timeout_id)
+            except Exception:
+                pass
+            self.exec_timeout_id = None
+        if var:
+            self.script_vars[var] = m.group(1) if m.groups() else m.group(0)
+        self.script_vars["ok"] = 1
+        if kind[0] == "send":
+            self.stats["success"] += 1
+            self._finish_command(None, kind[1], "success")
+            if self.last_cmd_time:
+                delta = (datetime.now() - self.last_cmd_time).total_seconds()
+                self.stats["cmd_times"].append(delta)
+                line = f"✓ SUCCESS: {kind[1]} completed in {delta:.2f}s\n"
+                self.log_buffer.append(line)
+                self.log.insert("end", line)
+                self.log.see("end")
+            self.root.after(int(self.seq_delay * 1000), self._script_step, self.script_gen)
+        else:
+            self._script_step(self.script_gen)
+
+    def _script_timeout(self, gen: int) -> None:
+        """Handle a script wait that did not match in time."""
+        if self.exec_mode != 'script' or gen != self.script_gen or self.script_expect is None:
+            return
+        kind, rx, _ = self.script_expect
+        self.script_expect = None
+        self.exec_state = 'RUNNING'
+        self.exec_timeout_id = None
+        self.script_vars["ok"] = 0
+        if kind[0] == "until":
+            _, counter, max_tries, body = kind
+            tries = int(self.script_vars.get(counter, 0)) + 1
+            self.script_vars[counter] = tries
+            if not max_tries or tries < max_tries:
+                self.script_pc = body
+                self._script_step(gen)
+                return
+        if kind[0] == "send":
+            self.stats["failed"] += 1
+            self._finish_command(None, kind[1], "timeout")
+            line = f"⚠️ TIMEOUT: {kind[1]} - no '{self.seq_pattern}' within {self.seq_timeout}s, proceeding to next\n"
+        else:
+            line = f"⚠️ TIMEOUT: no match for /{rx.pattern}/, proceeding to next\n"
+        self.log_buffer.append(line)
+        self.log.insert("end", line)
+        self.log.see("end")
+        self.root.after(int(self.seq_delay * 1000), self._script_step, gen)
+
+    def _script_finish(self, message: str) -> None:
+        """End the running script."""
+        self._stop_execution()
+        self.seq_status.config(text=f"{message}: {self.script_sent} sent")
+        self.set_status(message.lower())
+
+    def _port_owner(self) -> Optional[str]:
+        """Name of the background job that currently drives the port, if any."""
+        for name, job in (("XMODEM/YMODEM transfer", self.modem), ("load test", self.loadgen),
+                          ("file send", self.file_sender), ("repeat", self.repeater)):
+            if job is not None and not job.done:
+                return name
+        return None
+
+    def _port_busy(self, title: str, parent: Optional[tk.Toplevel] = None) -> bool:
+        """Tell the user (and return True) if another job owns the port."""
+        owner = self._port_owner()
+        if owner is None:
+            return False
+        messagebox.showinfo(title, f"The port is in use: {owner} running", parent=parent)
+        return True
+
+    def send_file(self) -> None:
+        """Stream a file to the device (Tools -> Send file)."""
+        if self.file_sender is not None and not self.file_sender.done:
+            if messagebox.askyesno("Send File", "A file transfer is running. Cancel it?"):
+                self.file_sender.cancel()
+            return
+        if self._port_busy("Send File"):
+            return
+        path = filedialog.askopenfilename(title="Send file")
+        if not path:
+            return
+        opts = self.cfg.get("file_send", {})
+        win = tk.Toplevel(self.root)
+        win.title(f"Send {os.path.basename(path)}")
+
+        mode_var = tk.StringVar(value=opts.get("mode", "line"))
+        chunk_var = tk.IntVar(value=opts.get("chunk_size", 256))
+        delay_var = tk.IntVar(value=opts.get("delay_ms", 0))
+        wait_var = tk.StringVar(value=opts.get("wait", "none"))
+        prompt_var = tk.StringVar(value=opts.get("prompt", ">"))
+        timeout_var = tk.DoubleVar(value=opts.get("timeout", 2.0))
+        retries_var = tk.IntVar(value=opts.get("retries", 3))
+
+        rows = [
+            ("Units:", ttk.Combobox(win, textvariable=mode_var, values=["line", "chunk"], state="readonly", width=10)),
+            ("Chunk size (bytes):", ttk.Spinbox(win, from_=1, to=65536, textvariable=chunk_var, width=10)),
+            ("Delay per unit (ms):", ttk.Spinbox(win, from_=0, to=10000, textvariable=delay_var, width=10)),
+            ("Wait for:", ttk.Combobox(win, textvariable=wait_var, values=["none", "echo", "prompt"], state="readonly", width=10)),
+            ("Prompt:", ttk.Entry(win, textvariable=prompt_var, width=12)),
+            ("Timeout (s):", ttk.Entry(win, textvariable=timeout_var, width=12)),
+            ("Retries:", ttk.Spinbox(win, from_=0, to=20, textvariable=retries_var, width=10)),
+        ]
+        for r, (label, widget) in enumerate(rows):
+            ttk.Label(win, text=label).grid(row=r, column=0, sticky="w", padx=8, pady=3)
+            widget.grid(row=r, column=1, sticky="w", padx=8)
+
+        def start() -> None:
+            try:
+                opts = {
+                    "mode": mode_var.get(), "chunk_size": chunk_var.get(), "delay_ms": delay_var.get(),
+                    "wait": wait_var.get(), "prompt": prompt_var.get(),
+                    "timeout": timeout_var.get(), "retries": retries_var.get(),
+                }
+            except (tk.TclError, ValueError):
+                messagebox.showerror("Send File", "Invalid option value", parent=win)
+                return
+            if self._port_busy("Send File", win):
+                return
+            self.cfg["file_send"] = opts
+            win.destroy()
+            try:
+                self.file_sender = FileSender(
+                    path, self.backend.write_threadsafe, mode=opts["mode"], chunk_size=opts["chunk_size"],
+                    delay=opts["delay_ms"] / 1000.0, wait=opts["wait"], prompt=opts["prompt"],
+                    timeout=opts["timeout"], retries=opts["retries"],
+                    line_ending=FILE_SEND_EOL.get(self.eol_mode, b"\r"))
+            except OSError as e:
+                self.set_status(f"send file failed: {e}")
+                return
+            line = f">> [send file] {path} ({self.file_sender.total} bytes)\n"
+            self.log_buffer.append(line)
+            self.log.insert("end", line)
+            self.log.see("end")
+            self._file_send_tick()
+
+        ttk.Button(win, text="Send", command=start).grid(row=len(rows), column=1, sticky="e", padx=8, pady=8)
+
+    def _file_send_tick(self) -> None:
+        """Show transfer progress; log a summary when the worker finishes."""
+        fs = self.file_sender
+        if fs is None:
+            return
+        p = fs.progress()
+        if not fs.done:
+            pct = 100.0 * p["sent"] / p["total"] if p["total"] else 100.0
+            eta = f"{p['eta']:.0f}s" if p["eta"] is not None else "?"
+            self.set_status(f"send file: {pct:.0f}% {p['rate'] / 1024:.1f} KiB/s ETA {eta} retries {p['retries']}")
+            self.root.after(FILE_SEND_TICK_MS, self._file_send_tick)
+            return
+        verified = fs.echo_verified()
+        check = "" if verified is None else (" echo CRC32 ok" if verified else " echo CRC32 MISMATCH")
+        result = fs.error or "done"
+        line = (f">> [send file] {result}: {p['sent']} bytes, {p['units']} units in {p['elapsed']:.1f}s "
+                f"({p['rate'] / 1024:.1f} KiB/s), {p['retries']} retries{check}\n")
+        self.log_buffer.append(line)
+        self.log.insert("end", line)
+        self.log.see("end")
+        self.set_status(f"send file {result}")
+
+    def modem_transfer(self) -> None:
+        """XMODEM-1K / YMODEM send or receive (Tools -> XMODEM/YMODEM transfer)."""
+        if self.modem is not None and not self.modem.done:
+            if messagebox.askyesno("Transfer", "A transfer is running. Cancel it?"):
+                self.modem.cancel()
+            return
+        if self._port_busy("Transfer"):
+            return
+        if self.backend.virtual or not self.backend.ser or not self.backend.ser.is_open:
+            messagebox.showinfo("Transfer", "XMODEM/YMODEM needs an open serial port")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("XMODEM/YMODEM Transfer")
+        direction_var = tk.StringVar(value="send")
+        protocol_var = tk.StringVar(value=self.cfg.get("modem_protocol", "xmodem-1k"))
+        ttk.Label(win, text="Direction:").grid(row=0, column=0, sticky="w", padx=8, pady=3)
+        ttk.Combobox(win, textvariable=direction_var, values=["send", "receive"],
+                     state="readonly", width=12).grid(row=0, column=1, sticky="w", padx=8)
+        ttk.Label(win, text="Protocol:").grid(row=1, column=0, sticky="w", padx=8, pady=3)
+        ttk.Combobox(win, textvariable=protocol_var, values=["xmodem-1k", "ymodem"],
+                     state="readonly", width=12).grid(row=1, column=1, sticky="w", padx=8)
+
+        def start() -> None:
+            if self._port_busy("Transfer", win):
+                return
+            direction, protocol = direction_var.get(), protocol_var.get()
+            if direction == "send":
+                path = filedialog.askopenfilename(title="File to send", parent=win)
+            elif protocol == "ymodem":
+                path = filedialog.askdirectory(title="Receive into folder", parent=win)
+            else:
+                path = filedialog.asksaveasfilename(title="Save received file as", parent=win)
+            if not path:
+                return
+            self.cfg["modem_protocol"] = protocol
+            win.destroy()
+            ser = self.backend.suspend()
+            try:
+                self.modem = ModemTransfer(ser, direction, protocol, path)
+            except OSError as e:
+                self.backend.resume()
+                self.set_status(f"transfer failed: {e}")
+                return
+            line = f">> [{protocol}] {direction} {path}\n"
+            self.log_buffer.append(line)
+            self.log.insert("end", line)
+            self.log.see("end")
+            self._modem_tick()
+
+        ttk.Button(win, text="Start", command=start).grid(row=2, column=1, sticky="e", padx=8, pady=8)
+
+    def _modem_tick(self) -> None:
+        """Show transfer progress; hand the port back to the terminal when done."""
+        mt = self.modem
+        if mt is None:
+            return
+        p = mt.progress()
+        if not mt.done:
+            size = f"/{p['total']}" if p["total"] else ""
+            self.set_status(f"transfer: {p['bytes']}{size} bytes {p['rate'] / 1024:.1f} KiB/s retries {p['retries']}")
+            self.root.after(MODEM_TICK_MS, self._modem_tick)
+            return
+        self.backend.resume()
+        result = mt.error or "done"
+        line = (f">> [transfer] {result}: {p['bytes']} bytes, {p['blocks']} blocks in {p['elapsed']:.1f}s "
+                f"({p['rate'] / 1024:.1f} KiB/s), {p['retries']} retries\n")
+        for path in mt.files:
+            line += f">> [transfer] {path}\n"
+        self.log_buffer.append(line)
+        self.log.insert("end", line)
+        self.log.see("end")
+        self.set_status(f"transfer {result}")
+
+    def load_test(self) -> None:
+        """Ramp a weighted command mix until the device saturates (Tools -> Load test)."""
+        if self.loadgen is not None and not self.loadgen.done:
+            self.loadgen.stop()
+            return
+        if self._port_busy("Load Test"):
+            return
+        if self.backend.virtual or not self.backend.ser or not self.backend.ser.is_open:
+            messagebox.showinfo("Load Test", "Load testing needs an open serial port")
+            return
+        # Mix: cfg "load_mix" {command: weight}, else the checked commands, else all
+        mix = [(c, float(w)) for c, w in self.cfg.get("load_mix", {}).items() if float(w) > 0]
+        if not mix:
+            picked = sorted(self.selected_commands) or range(len(self.commands))
+            mix = [(self.commands[i].strip(), 1.0) for i in picked if self.commands[i].strip()]
+        if not mix:
+            messagebox.showinfo("Load Test", "No commands to send")
+            return
+
+        opts = self.cfg.get("load_test", {})
+        win = tk.Toplevel(self.root)
+        win.title("Load Test")
+        win.geometry("760x380")
+        form = ttk.Frame(win)
+        form.pack(fill="x", padx=8, pady=4)
+        mode_var = tk.StringVar(value=opts.get("mode", "open"))
+        start_var = tk.DoubleVar(value=opts.get("start", 10))
+        limit_var = tk.DoubleVar(value=opts.get("limit", 1000))
+        step_var = tk.DoubleVar(value=opts.get("step_s", 5))
+        timeout_var = tk.DoubleVar(value=opts.get("timeout", 2))
+        pattern_var = tk.StringVar(value=opts.get("pattern", self.seq_pattern))
+        fields = [
+            ("Mode", ttk.Combobox(form, textvariable=mode_var, values=["open", "closed"], state="readonly", width=7)),
+            ("Start (/s or N)", ttk.Entry(form, textvariable=start_var, width=7)),
+            ("Max", ttk.Entry(form, textvariable=limit_var, width=7)),
+            ("Step (s)", ttk.Entry(form, textvariable=step_var, width=5)),
+            ("Timeout (s)", ttk.Entry(form, textvariable=timeout_var, width=5)),
+            ("Response", ttk.Entry(form, textvariable=pattern_var, width=10)),
+        ]
+        for col, (label, widget) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=0, column=col, sticky="w", padx=3)
+            widget.grid(row=1, column=col, sticky="w", padx=3)
+
+        columns = ("Level", "Sent", "OK", "Lost", "Offered/s", "Resp/s", "p50 ms", "p99 ms", "")
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=10)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=70 if col else 90, anchor="e" if col else "w")
+        tree.pack(fill="both", expand=True, padx=8, pady=4)
+        result = ttk.Label(win, text=f"Mix: {', '.join(f'{c}×{w:g}' for c, w in mix)}")
+        result.pack(fill="x", padx=8)
+
+        def start() -> None:
+            try:
+                opts = {"mode": mode_var.get(), "start": start_var.get(), "limit": limit_var.get(),
+                        "step_s": step_var.get(), "timeout": timeout_var.get(), "pattern": pattern_var.get()}
+            except (tk.TclError, ValueError):
+                messagebox.showerror("Load Test", "Invalid option value", parent=win)
+                return
+            if not opts["pattern"] or opts["start"] <= 0 or opts["step_s"] <= opts["timeout"]:
+                messagebox.showerror("Load Test", "Need a response pattern, start > 0 and step longer than timeout",
+                                     parent=win)
+                return
+            if self._port_busy("Load Test", win):
+                return
+            self.cfg["load_test"] = opts
+            ser = self.backend.suspend()
+            self.loadgen = LoadGenerator(ser, mix, opts["pattern"], opts["mode"], opts["start"], opts["limit"],
+                                         opts["step_s"], opts["timeout"], FILE_SEND_EOL.get(self.eol_mode, b"\r"))
+            btn.config(text="Stop", command=self.loadgen.stop)
+            tick()
+
+        def row(s: dict[str, Any]) -> tuple:
+            def ms(v: Optional[float]) -> str:
+                return "" if v is None else f"{v:.1f}"
+            return (f"{s['level']:g}", s["sent"], s["ok"], s["lost"], f"{s['offered_rate']:.1f}",
+                    f"{s['response_rate']:.1f}", ms(s["p50_ms"]), ms(s["p99_ms"]), "saturated" if s["saturated"] else "")
 
-        # Load timing settings from UI
-        self.seq_delay = self.seq_delay_var.get()
-        self.seq_timeout = self.seq_timeout_var.get()
+        def tick() -> None:
+            # Runs on the root window so the port is resumed even if this window is closed
+            lg = self.loadgen
+            if lg is None:
+                return
+            shown = win.winfo_exists()
+            if shown:
+                tree.delete(*tree.get_children())
+                for step in list(lg.steps):
+                    tree.insert("", "end", values=row(step.summary()))
+            if not lg.done:
+                self.root.after(LOAD_TICK_MS, tick)
+                return
+            self.backend.resume()
+            sat = lg.saturation
+            text = (f"saturation at {sat['level']:g} ({sat['response_rate']:.1f} responses/s, "
+                    f"p99 {row(sat)[7] or '?'} ms)" if sat else "no saturation up to max")
+            if lg.error:
+                text = f"error: {lg.error}"
+            if shown:
+                btn.config(text="Start", command=start)
+                result.config(text=text)
+            for step in lg.steps:
+                s = row(step.summary())
+                line = f">> [load {lg.mode}] level {s[0]}: sent {s[1]} ok {s[2]} lost {s[3]} resp/s {s[5]} p99 {s[7]} ms {s[8]}\n"
+                self.log_buffer.append(line)
+                self.log.insert("end", line)
+            line = f">> [load {lg.mode}] {text}\n"
+            self.log_buffer.append(line)
+            self.log.insert("end", line)
+            self.log.see("end")
 
-        # Clear log and initialize range execution
-        self.clear()
-        self.line_counter = 0
+        btn = ttk.Button(form, text="Start", command=start)
+        btn.grid(row=1, column=len(fields), padx=6)
 
-        # Initialize execution for range mode
-        self.exec_mode = 'range'
-        self.exec_state = 'WAIT_START'
-        self.seq_current = start
-        self.seq_end = end
-        self.seq_status.config(text=f"Running range: {start+1} to {end}")
-        self.set_status(f"Running range: {start+1} to {end}")
-        self._exec_next()
-    def run_selected(self) -> None:
-        """Run only selected commands."""
-        if not self.selected_commands:
-            messagebox.showwarning("No Selection", "Please select commands by clicking the Select column")
-            return
-        
-        self.seq_pattern = self.seq_pattern_entry.get().strip()
-        if not self.seq_pattern:
-            messagebox.showwarning("Pattern Required", "Please enter a completion pattern")
-            return
-        
-        # Load timing settings from UI
-        self.seq_delay = self.seq_delay_var.get()
-        self.seq_timeout = self.seq_timeout_var.get()
-        
-        # Get sorted list of selected indices
-        self.seq_selected_indices = sorted(self.selected_commands)
-        
-        # Clear log and initialize selected execution
-        self.clear()
-        self.line_counter = 0
-        
-        # Initialize execution for selected mode
-        self.exec_mode = 'selected'
-        self.exec_state = 'WAIT_START'
-        self.seq_current = 0  # Index in seq_selected_indices
-        self.seq_end = len(self.seq_selected_indices)
-        first_idx = self.seq_selected_indices[0] + 1
-        last_idx = self.seq_selected_indices[-1] + 1
-        self.seq_status.config(text=f"Running selected: {len(self.seq_selected_indices)} commands ({first_idx}-{last_idx})")
-        self.set_status(f"Running selected commands: {len(self.seq_selected_indices)} total")
-        self._exec_next()
+        def close() -> None:
+            if self.loadgen is not None and not self.loadgen.done:
+                self.loadgen.stop()  # tick() resumes the port once the threads have finished
+            win.destroy()
 
+        win.protocol("WM_DELETE_WINDOW", close)
 
     def show_statistics(self) -> None:
         """Show command execution statistics."""
@@ -1130,6 +6127,207 @@ macOS / Linux / Termux(Android) / Windows"""
         
         ttk.Button(win, text="Close", command=win.destroy).pack(pady=10)
 
+    def show_series(self) -> None:
+        """Show captured numeric series with stats, rule editing and export."""
+        win = tk.Toplevel(self.root)
+        win.title("Captured Series")
+        win.geometry("620x360")
+
+        top = ttk.Frame(win)
+        top.pack(fill="x", padx=8, pady=4)
+        ttk.Label(top, text="Last (s, 0 = all):").pack(side="left")
+        window_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(top, textvariable=window_var, width=8).pack(side="left")
+
+        columns = ("Series", "Count", "Last", "Min", "Max", "Mean")
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=12)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=180 if col == "Series" else 80, anchor="w" if col == "Series" else "e")
+        tree.pack(fill="both", expand=True, padx=8)
+
+        def refresh() -> None:
+            tree.delete(*tree.get_children())
+            try:
+                span = window_var.get()
+            except (tk.TclError, ValueError):
+                span = 0.0
+            t0 = time.monotonic() - span if span > 0 else float("-inf")
+            for name in sorted(self.series.series):
+                s = self.series.series[name]
+                st = s.stats(*s.window(t0))
+                if st["count"]:
+                    tree.insert("", "end", iid=name, values=(
+                        name, st["count"], f"{st['last']:g}", f"{st['min']:g}", f"{st['max']:g}", f"{st['mean']:.4g}"))
+                else:
+                    tree.insert("", "end", iid=name, values=(name, 0, "", "", "", ""))
+
+        def add_rule() -> None:
+            cmd = simpledialog.askstring("Capture Rule", "Command (e.g. ATS49, or * for all):", parent=win)
+            if not cmd:
+                return
+            regex = simpledialog.askstring(
+                "Capture Rule", "Regex with groups (e.g. T=([-\\d.]+)), or empty for key=value pairs:", parent=win)
+            if regex is None:
+                return
+            if regex:
+                name = simpledialog.askstring("Capture Rule", "Series name:", initialvalue="value", parent=win)
+                if not name:
+                    return
+                try:
+                    re.compile(regex)
+                except re.error as e:
+                    messagebox.showerror("Capture Rule", f"Bad regex: {e}", parent=win)
+                    return
+                rule: dict[str, Any] = {"name": name, "regex": regex}
+            else:
+                rule = {"kv": True}
+            rules = self.cfg.setdefault("capture_rules", {})
+            rules.setdefault(cmd.strip(), []).append(rule)
+            self.series.set_rules(rules)
+            self.set_status(f"capture rule added for {cmd.strip()}")
+
+        def selected_names() -> list[str]:
+            return list(tree.selection()) or sorted(self.series.series)
+
+        def export_csv() -> None:
+            f = filedialog.asksaveasfilename(parent=win, defaultextension=".csv", initialfile="series.csv")
+            if not f:
+                return
+            try:
+                rows = self.series.export_csv(f, selected_names())
+                self.set_status(f"Exported {rows} samples to {os.path.basename(f)}")
+            except Exception as e:
+                self.set_status(f"Export failed: {e}")
+
+        def export_npy() -> None:
+            names = selected_names()
+            if not names:
+                return
+            folder = filedialog.askdirectory(parent=win, title="Export .npy files to")
+            if not folder:
+                return
+            try:
+                total = sum(self.series.export_npy(os.path.join(folder, f"{name}.npy"), name) for name in names)
+                self.set_status(f"Exported {len(names)} series ({total} samples) to {folder}")
+            except Exception as e:
+                self.set_status(f"Export failed: {e}")
+
+        def clear() -> None:
+            self.series.clear()
+            refresh()
+
+        btns = ttk.Frame(win)
+        btns.pack(fill="x", padx=8, pady=6)
+        ttk.Button(btns, text="Refresh", command=refresh).pack(side="left", padx=2)
+        ttk.Button(btns, text="Add rule...", command=add_rule).pack(side="left", padx=2)
+        ttk.Button(btns, text="Export CSV...", command=export_csv).pack(side="left", padx=2)
+        ttk.Button(btns, text="Export .npy...", command=export_npy).pack(side="left", padx=2)
+        ttk.Button(btns, text="Clear", command=clear).pack(side="left", padx=2)
+        ttk.Button(btns, text="Close", command=win.destroy).pack(side="right")
+        refresh()
+
+    def show_plot(self) -> None:
+        """Open (or raise) the live plot of captured series."""
+        if self.plot is not None and self.plot.win.winfo_exists():
+            self.plot.lift()
+            return
+        self.plot = LivePlot(self.root, self.series)
+
+    def set_framing(self, framing: dict[str, Any]) -> None:
+        """Switch RX between text lines and a binary framing (cfg["framing"])."""
+        self.cfg["framing"] = framing
+        kind = framing.get("kind", "off")
+        if kind == "off":
+            self.framer = None
+            self.set_status("binary framing off")
+            return
+        try:
+            self.framer = FrameDecoder(kind, framing.get("crc", "none"), framing.get("length_bytes", 2),
+                                       framing.get("max_frame", FRAME_MAX))
+            self.frame_layouts = FrameLayouts(self.cfg.get("frame_layouts", {}), framing.get("type_offset", 0))
+        except (ValueError, KeyError) as e:
+            self.framer = None
+            self.set_status(f"framing error: {e}")
+            return
+        self.set_status(f"binary framing: {kind}")
+
+    def _on_frames(self, frames: list[bytes]) -> None:
+        if not frames:
+            return
+        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        for payload in frames:
+            self.frame_seq += 1
+            self.frame_rows.append((self.frame_seq, ts, payload))
+
+    def show_frames(self) -> None:
+        """Open (or raise) the decoded binary frame view."""
+        if self.frame_view is not None and self.frame_view.win.winfo_exists():
+            self.frame_view.lift()
+            return
+        self.frame_view = FrameView(self)
+
+    def show_results_history(self) -> None:
+        """Query the results store: latency percentiles and regressions."""
+        store = self._results_store()
+        if store is None:
+            messagebox.showwarning("Results History", "Results store is disabled or unavailable")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Results History")
+        win.geometry("640x420")
+
+        q1 = ttk.LabelFrame(win, text="Latency over last runs")
+        q1.pack(fill="x", padx=8, pady=4)
+        ttk.Label(q1, text="Command:").grid(row=0, column=0, sticky="w")
+        cmd_var = tk.StringVar(value=self.last_cmd)
+        ttk.Combobox(q1, textvariable=cmd_var, values=sorted({c for c in self.commands if c.strip()})).grid(row=0, column=1, sticky="we")
+        ttk.Label(q1, text="Runs:").grid(row=0, column=2, sticky="w", padx=(8, 0))
+        runs_var = tk.IntVar(value=30)
+        ttk.Entry(q1, textvariable=runs_var, width=6).grid(row=0, column=3)
+        pct_label = ttk.Label(q1, text="")
+        pct_label.grid(row=1, column=0, columnspan=5, sticky="w", pady=4)
+
+        def fmt(v: Optional[float]) -> str:
+            return "—" if v is None else f"{v * 1000:.0f} ms"
+
+        def query_percentiles() -> None:
+            r = store.latency_percentiles(cmd_var.get().strip(), max(1, runs_var.get()))
+            pct_label.config(text=f"{r['executions']} executions, {r['failed']} failed | "
+                                  f"p50 {fmt(r['p50'])}  p95 {fmt(r['p95'])}  p99 {fmt(r['p99'])}")
+
+        ttk.Button(q1, text="Query", command=query_percentiles).grid(row=0, column=4, padx=4)
+
+        q2 = ttk.LabelFrame(win, text="Regressions")
+        q2.pack(fill="both", expand=True, padx=8, pady=4)
+        row = ttk.Frame(q2)
+        row.pack(fill="x")
+        ttk.Label(row, text="Since (hours ago):").pack(side="left")
+        hours_var = tk.DoubleVar(value=24.0)
+        ttk.Entry(row, textvariable=hours_var, width=6).pack(side="left")
+        this_profile = tk.BooleanVar(value=True)
+        ttk.Checkbutton(row, text="This profile only", variable=this_profile).pack(side="left", padx=8)
+
+        columns = ("Command", "OK before", "OK after", "Latency before", "Latency after")
+        tree = ttk.Treeview(q2, columns=columns, show="headings", height=10)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=200 if col == "Command" else 100, anchor="w" if col == "Command" else "e")
+        tree.pack(fill="both", expand=True)
+
+        def query_regressions() -> None:
+            tree.delete(*tree.get_children())
+            since = time.time() - hours_var.get() * 3600
+            profile = os.path.basename(self.current_profile_path) if this_profile.get() else None
+            for r in store.regressions(since, profile):
+                tree.insert("", "end", values=(
+                    r["command"], f"{r['success_before']:.0%}", f"{r['success_after']:.0%}",
+                    fmt(r["latency_before"]), fmt(r["latency_after"])))
+            self.set_status(f"{len(tree.get_children())} regressed commands")
+
+        ttk.Button(row, text="Query", command=query_regressions).pack(side="left")
+        ttk.Button(win, text="Close", command=win.destroy).pack(pady=6)
+
     def search_log(self, event: Optional[tk.Event] = None) -> None:
         """Search within log buffer."""
         term = simpledialog.askstring("Search", "Enter text to search:")
@@ -1160,6 +6358,180 @@ macOS / Linux / Termux(Android) / Windows"""
         else:
             self.set_status(f"No matches found for '{term}'")
 
+    def search_archive(self) -> None:
+        """Search every saved log under a folder (Tools -> Search archive)."""
+        win = tk.Toplevel(self.root)
+        win.title("Search Archive")
+        win.geometry("1000x520")
+        form = ttk.Frame(win)
+        form.pack(fill="x", padx=8, pady=4)
+        folder_var = tk.StringVar(value=self.cfg.get("archive_dir", os.getcwd()))
+        term_var = tk.StringVar()
+        regex_var = tk.BooleanVar(value=True)
+        case_var = tk.BooleanVar(value=True)
+        from_var = tk.StringVar()
+        to_var = tk.StringVar()
+
+        ttk.Label(form, text="Folder:").grid(row=0, column=0, sticky="w")
+        ttk.Entry(form, textvariable=folder_var, width=50).grid(row=0, column=1, columnspan=3, sticky="we")
+        ttk.Button(form, text="...", width=3, command=lambda: folder_var.set(
+            filedialog.askdirectory(parent=win, initialdir=folder_var.get()) or folder_var.get())).grid(row=0, column=4)
+        ttk.Label(form, text="Pattern:").grid(row=1, column=0, sticky="w")
+        term_entry = ttk.Entry(form, textvariable=term_var, width=30)
+        term_entry.grid(row=1, column=1, sticky="w")
+        ttk.Checkbutton(form, text="Regex", variable=regex_var).grid(row=1, column=2, sticky="w")
+        ttk.Checkbutton(form, text="Ignore case", variable=case_var).grid(row=1, column=3, sticky="w")
+        ttk.Label(form, text="From / To (YYYY-MM-DD HH:MM):").grid(row=2, column=0, columnspan=2, sticky="w")
+        ttk.Entry(form, textvariable=from_var, width=17).grid(row=2, column=2, sticky="w")
+        ttk.Entry(form, textvariable=to_var, width=17).grid(row=2, column=3, sticky="w")
+
+        columns = ("File", "Line", "Time", "Text")
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for col, width in zip(columns, (220, 70, 140, 560)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="w", stretch=col == "Text")
+        tree.pack(fill="both", expand=True, padx=8, pady=4)
+        status = ttk.Label(win, text="Double-click a match to open the log there")
+        status.pack(fill="x", padx=8)
+        state: dict[str, Any] = {"search": None, "rows": {}}
+
+        def parse_time(text: str) -> Optional[float]:
+            text = text.strip()
+            if not text:
+                return None
+            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+                try:
+                    return datetime.strptime(text, fmt).timestamp()
+                except ValueError:
+                    continue
+            raise ValueError(f"bad time: {text!r}")
+
+        def start() -> None:
+            if state["search"] is not None and not state["search"].done:
+                state["search"].cancel()
+                return
+            term = term_var.get()
+            if not term:
+                return
+            try:
+                t0, t1 = parse_time(from_var.get()), parse_time(to_var.get())
+                pattern = term.encode() if regex_var.get() else re.escape(term.encode())
+                search = ArchiveSearch(folder_var.get(), pattern, re.IGNORECASE if case_var.get() else 0, t0, t1,
+                                       tuple(self.cfg.get("archive_globs", ARCHIVE_GLOBS)))
+            except (ValueError, re.error) as e:
+                status.config(text=str(e))
+                return
+            self.cfg["archive_dir"] = folder_var.get()
+            tree.delete(*tree.get_children())
+            state["search"], state["rows"] = search, {}
+            btn.config(text="Stop")
+            pump()
+
+        def pump() -> None:
+            search = state["search"]
+            if search is None or not win.winfo_exists():
+                return
+            rows = state["rows"]
+            try:
+                for _ in range(2000):
+                    path, line, offset, ts, text = search.results.get_nowait()
+                    if len(rows) < ARCHIVE_MAX_ROWS:
+                        when = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else ""
+                        iid = tree.insert("", "end", values=(os.path.relpath(path, search.folder), line, when, text))
+                        rows[iid] = (path, offset)
+            except queue.Empty:
+                pass
+            shown = f" (showing {ARCHIVE_MAX_ROWS})" if search.matches > ARCHIVE_MAX_ROWS else ""
+            status.config(text=f"{search.files} files, chunks {search.chunks_done}/{search.chunks}, "
+                               f"{search.matches} matches{shown}" + (f" - {search.error}" if search.error else "")
+                               + (f" - {len(search.failed)} failed: {search.failed[0]}" if search.failed else ""))
+            if search.done and search.results.empty():
+                btn.config(text="Search")
+                return
+            win.after(ARCHIVE_TICK_MS, pump)
+
+        def open_match(event: tk.Event) -> None:
+            sel = tree.focus()
+            if sel in state["rows"]:
+                path, offset = state["rows"][sel]
+                try:
+                    LogFileView(self.root, MappedLog(path)).goto_offset(offset)
+                except OSError as e:
+                    status.config(text=f"open failed: {e}")
+
+        tree.bind("<Double-1>", open_match)
+        term_entry.bind("<Return>", lambda e: start())
+        btn = ttk.Button(form, text="Search", command=start)
+        btn.grid(row=1, column=4, padx=4)
+
+    def export_timestamped_log(self) -> None:
+        """Save the session log with each line's ISO receive time (input for Merge logs)."""
+        f = filedialog.asksaveasfilename(defaultextension=".log.txt",
+                                         initialfile=datetime.now().strftime("%Y-%m-%d_%H-%M-%S-ts.log.txt"))
+        if not f:
+            return
+        store = self.log_buffer
+        try:
+            with open(f, "w", encoding="utf-8", newline="\n") as fp:
+                for i in range(len(store)):
+                    ts = datetime.fromtimestamp(store.times[i]).isoformat(timespec="microseconds")
+                    fp.write(f"{ts}\t{store[i]}")
+            self.set_status(f"Exported {len(store)} timestamped lines to {os.path.basename(f)}")
+        except Exception as e:
+            self.set_status(f"Export failed: {e}")
+
+    def merge_log_files(self) -> None:
+        """Interleave several logs by timestamp, with per-log clock offsets."""
+        paths = filedialog.askopenfilenames(title="Logs to merge", filetypes=[("Logs", "*.txt *.log"), ("All files", "*")])
+        if len(paths) < 2:
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Merge Logs")
+        ttk.Label(win, text="Clock offset (s) added to each log's timestamps:").grid(
+            row=0, column=0, columnspan=2, sticky="w", padx=8, pady=4)
+        offsets = []
+        for r, path in enumerate(paths, start=1):
+            ttk.Label(win, text=os.path.basename(path)).grid(row=r, column=0, sticky="w", padx=8)
+            var = tk.StringVar(value="0")
+            ttk.Entry(win, textvariable=var, width=10).grid(row=r, column=1, padx=8)
+            offsets.append(var)
+
+        def run() -> None:
+            try:
+                sources = [(p, os.path.basename(p), float(v.get())) for p, v in zip(paths, offsets)]
+            except ValueError:
+                messagebox.showerror("Merge Logs", "Offsets must be numbers (seconds)", parent=win)
+                return
+            out = filedialog.asksaveasfilename(parent=win, defaultextension=".log.txt",
+                                               initialfile=datetime.now().strftime("%Y-%m-%d_%H-%M-%S-merged.log.txt"))
+            if not out:
+                return
+            win.destroy()
+            result: dict[str, Any] = {}
+
+            def work() -> None:
+                try:
+                    with open(out, "w", encoding="utf-8", newline="\n") as fp:
+                        result["lines"] = merge_logs(sources, fp)
+                except Exception as e:
+                    result["error"] = str(e)
+
+            worker = threading.Thread(target=work, name="merge", daemon=True)
+            worker.start()
+            self.set_status(f"merging {len(sources)} logs...")
+
+            def wait() -> None:
+                if worker.is_alive():
+                    self.root.after(100, wait)
+                elif "error" in result:
+                    self.set_status(f"merge failed: {result['error']}")
+                else:
+                    self.set_status(f"merged {result['lines']} lines into {os.path.basename(out)}")
+                    LogFileView(self.root, MappedLog(out))
+            wait()
+
+        ttk.Button(win, text="Merge...", command=run).grid(row=len(paths) + 1, column=1, sticky="e", padx=8, pady=8)
+
     def export_filtered_log(self) -> None:
         """Export log matching a specific filter."""
         term = simpledialog.askstring("Filter Export", "Enter text to filter by:")
@@ -1170,79 +6542,64 @@ macOS / Linux / Termux(Android) / Windows"""
         if not f:
             return
             
-        filtered_lines = [line for line in self.log_buffer if term.lower() in line.lower()]
+        filtered_lines = self.log_buffer.grep(term)
         
         try:
             with open(f, "w", encoding="utf-8", newline="\n") as fp:
-                fp.write("".join(filtered_lines))
+                fp.write(self.log_buffer.join(filtered_lines))
             self.set_status(f"Exported {len(filtered_lines)} lines to {os.path.basename(f)}")
         except Exception as e:
             self.set_status(f"Export failed: {e}")
 
     def toggle_repeat(self) -> None:
-        """Toggle command repeat without waiting for completion."""
-        if hasattr(self, 'repeat_after_id') and self.repeat_after_id:
-            # Stop repeat
-            try:
-                self.root.after_cancel(self.repeat_after_id)
-            except Exception:
-                pass
-            self.repeat_after_id = None
-            self.btn_repeat.config(text="Start repeat")
-            self.set_status("Repeat stopped")
+        """Start or stop sending the last command on a fixed period."""
+        if self.repeater is not None and not self.repeater.done:
+            self.repeater.stop()
             return
-        
-        # Start repeat
+        if self._port_busy("Repeat"):
+            return
+
         if not self.last_cmd:
             messagebox.showwarning("No Command", "Please send a command first")
             return
-        
+
         sec = self.repeat_sec.get()
-        if sec <= 0:
-            messagebox.showwarning("Invalid Time", "Please enter a positive repeat interval")
+        if sec < REPEAT_MIN_PERIOD:
+            messagebox.showwarning("Invalid Time", f"Repeat interval must be at least {REPEAT_MIN_PERIOD}s")
             return
-        
+
         repeat_limit = self.repeat_cnt.get()
-        if repeat_limit > 0:
-            self.set_status(f"Repeating {self.last_cmd} ({repeat_limit}x every {sec}s)")
-        else:
-            self.set_status(f"Repeating {self.last_cmd} (infinite every {sec}s)")
-        
+        times = f"{repeat_limit}x" if repeat_limit > 0 else "infinite"
+        self.set_status(f"Repeating {self.last_cmd} ({times} every {sec}s)")
         self.btn_repeat.config(text="Stop repeat")
-        self._schedule_next_repeat()
-    def _schedule_next_repeat(self) -> None:
-        """Schedule and execute next command repeat."""
-        # Check repeat limit
-        repeat_limit = self.repeat_cnt.get()
-        if repeat_limit > 0:
-            # Increment counter (stored as attribute to track across calls)
-            if not hasattr(self, '_repeat_counter'):
-                self._repeat_counter = 0
-            self._repeat_counter += 1
-            if self._repeat_counter > repeat_limit:
-                # Limit reached, stop repeating
-                self.btn_repeat.config(text="Start repeat")
-                self.set_status(f"Repeat complete: {repeat_limit}x")
-                delattr(self, '_repeat_counter')
-                self.repeat_after_id = None
-                return
-        
-        # Send the command
-        if self.last_cmd:
-            self.entry.delete(0, "end")
-            self.entry.insert(0, self.last_cmd)
-            self.backend.write((self.last_cmd + "\r").encode())
-            line = f">> {self.last_cmd} (repeat)\n"
-            self.log_buffer.append(line)
-            self.log.insert("end", line)
-            self.log.see("end")
-            self.stats["total_sent"] += 1
-        
-        # Schedule next repeat
-        sec = self.repeat_sec.get()
-        delay_ms = int(sec * 1000)
-        self.repeat_after_id = self.root.after(delay_ms, self._schedule_next_repeat)
-    
+        self._on_command_sent(self.last_cmd)
+        self.repeater = RepeatScheduler(
+            self.backend.write_threadsafe, (self.last_cmd + "\r").encode(), sec, repeat_limit)
+        self._repeat_tick()
+
+    def _repeat_tick(self) -> None:
+        """Show repeat progress; log one summary line when the repeat ends."""
+        rp = self.repeater
+        if rp is None:
+            return
+        st = rp.stats()
+        if not rp.done:
+            self.set_status(
+                f"repeat {self.last_cmd}: {st['sent']} sent, {st['rate']:.1f}/s, "
+                f"jitter p99 {st['jitter_p99_ms']:.2f} ms, skipped {st['skipped']}")
+            self.root.after(REPEAT_TICK_MS, self._repeat_tick)
+            return
+        self.stats["total_sent"] += st["sent"]
+        self.btn_repeat.config(text="Start repeat")
+        line = (f">> {self.last_cmd} (repeat) x{st['sent']} in {st['elapsed']:.2f}s: "
+                f"{st['rate']:.1f}/s of {st['target_rate']:.1f}/s, jitter mean {st['jitter_mean_ms']:.3f} ms "
+                f"p99 {st['jitter_p99_ms']:.3f} ms max {st['jitter_max_ms']:.3f} ms, skipped {st['skipped']}"
+                + (f", error: {rp.error}" if rp.error else "") + "\n")
+        self.log_buffer.append(line)
+        self.log.insert("end", line)
+        self.log.see("end")
+        self.set_status(f"Repeat complete: {st['sent']}x")
+
     def on_list_click(self, event: tk.Event) -> None:
         """Handle treeview click - toggle checkbox or send command."""
         # Get the item under the cursor
@@ -1250,27 +6607,14 @@ macOS / Linux / Termux(Android) / Windows"""
         if not item_id:
             return
         
-        # Check which column was clicked
         # Check which column was clicked
         col_id = self.listbox.identify_column(event.x)
         # Column #1 is 'Select', #2 is '#', #3 is 'Command', #4 is 'Status'
         if col_id == "#1":  # Select column (first column)
             try:
                 idx = int(item_id)
-                if idx in self.selected_commands:
-                    self.selected_commands.remove(idx)
-                    selected = "☐"
-                else:
-                    self.selected_commands.add(idx)
-                    selected = "☑"
-                # Update the checkbox display
-                values = self.listbox.item(item_id, 'values')
-                self.listbox.item(item_id, values=(selected, values[1], values[2], values[3]))
-                # Update row appearance - add/remove tag for selected rows
-                if idx in self.selected_commands:
-                    self.listbox.item(item_id, tags=('selected',))
-                else:
-                    self.listbox.item(item_id, tags=())
+                self.cmd_model.toggle(idx)
+                self._update_selected_count()
             except (ValueError, IndexError):
                 pass
             return  # Don't send command when clicking checkbox
@@ -1286,6 +6630,7 @@ macOS / Linux / Termux(Android) / Windows"""
                 self.stats["total_sent"] += 1
                 self.last_cmd_time = datetime.now()
                 self.backend.write((txt + "\r").encode())
+                self._on_command_sent(txt)
                 line = f">> {txt}\n"
                 self.log_buffer.append(line)
                 self.log.insert("end", line)
@@ -1297,54 +6642,95 @@ macOS / Linux / Termux(Android) / Windows"""
                     self.cfg["cmd_history"].append(txt)
         except (ValueError, IndexError):
             pass
-            pass
-    def toggle_selection(self) -> None:
-        """Toggle selection state of the currently selected command."""
-        selection = self.listbox.selection()
-        if not selection:
-            messagebox.showwarning("No Selection", "Please select a command first")
+
+    def _command_spans(self, idx: int) -> list[tuple[int, int, str, str, float]]:
+        """Recorded output spans of a command row, dropping ones from older text."""
+        cmd = self.commands[idx].strip() if idx < len(self.commands) else ""
+        return [s for s in self.cmd_spans.get(idx, []) if s[2] == cmd]
+
+    def show_command_output(self, event: Optional[tk.Event] = None) -> Optional[str]:
+        """Highlight the latest output of the highlighted (or Ctrl+clicked) command in the log."""
+        if event is not None:
+            item_id = self.listbox.identify_row(event.y)
+            if not item_id:
+                return "break"
+            self.listbox.selection_set(item_id)
+        idx = self._selected_index()
+        if idx is None:
+            return "break"
+        spans = self._command_spans(idx)
+        if not spans:
+            self.set_status(f"no recorded output for command #{idx + 1}")
+            return "break"
+        self.hide_help()  # The marks point into the log, not the help text
+        start, end, cmd, status, _ = spans[-1]
+        marked, first_line = self.span_marks.get(idx, (None, 0))
+        if marked is not spans[-1] or first_line <= self.log_view_trimmed:
+            self.set_status(f"output of {cmd} has scrolled out of the log view; use Export command output")
+            return "break"
+        first, last = f"cmd{idx}_start", f"cmd{idx}_end"
+        self.log.tag_remove("cmd_output", "1.0", "end")
+        self.log.tag_configure("cmd_output", background="#3a3d5c")
+        self.log.tag_add("cmd_output", first, last)
+        self.log.see(last)
+        self.log.see(first)
+        self.set_status(f"{cmd}: lines {start + 1}-{end} ({status}), latest of {len(spans)} runs")
+        return "break"
+
+    def export_command_output(self) -> None:
+        """Write every recorded output of the highlighted command to a file."""
+        idx = self._selected_index()
+        if idx is None:
             return
-        
-        iid = selection[0]
+        spans = self._command_spans(idx)
+        if not spans:
+            self.set_status(f"no recorded output for command #{idx + 1}")
+            return
+        f = filedialog.asksaveasfilename(defaultextension=".txt", initialfile=f"cmd{idx + 1:03d}_output.txt")
+        if not f:
+            return
+        try:
+            with open(f, "w", encoding="utf-8", newline="\n") as fp:
+                for start, end, cmd, status, t in spans:
+                    when = datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S")
+                    fp.write(f"# {cmd} [{status}] {when} lines {start + 1}-{end}\n")
+                    fp.write(self.log_buffer.join(range(start, end)))
+            self.set_status(f"Exported {len(spans)} outputs of {spans[-1][2]} to {os.path.basename(f)}")
+        except Exception as e:
+            self.set_status(f"Export failed: {e}")
 
-        # Update the checkbox display
-        values = self.listbox.item(iid, 'values')
-        self.listbox.item(iid, values=(selected, values[1], values[2], values[3]))
-        # Update row appearance and counter
-        if idx in self.selected_commands:
-            self.listbox.item(iid, tags=('selected',))
-        else:
-            self.listbox.item(iid, tags=())
-        self._update_selected_count()
-    def edit_cmd(self, event: tk.Event) -> None:
-        """Edit command in Treeview."""
+    def _selected_index(self) -> Optional[int]:
+        """Return the command index of the highlighted Treeview row, warning if none."""
         selection = self.listbox.selection()
         if not selection:
-            return
-        
-        iid = selection[0]  # Treeview uses item IDs (iid)
+            messagebox.showwarning("No Selection", "Please select a command first")
+            return None
         try:
-            idx = int(iid)
+            return int(selection[0])
         except ValueError:
+            return None
+
+    def toggle_selection(self) -> None:
+        """Toggle selection state of the currently selected command."""
+        idx = self._selected_index()
+        if idx is None:
             return
+        self.cmd_model.toggle(idx)
+        self._update_selected_count()
+
+    def edit_cmd(self, event: tk.Event) -> None:
+        """Edit command in Treeview."""
+        if self.listbox.selection():
+            self.edit_selected()
         
     def select_all_commands(self) -> None:
         """Select all commands."""
-        for i in range(len(self.commands)):
-            self.selected_commands.add(i)
-            iid = str(i)
-            self.listbox.item(iid, values=("☑", i+1, self.commands[i], ""))
-            self.listbox.item(iid, tags=('selected',))
+        self.cmd_model.select_all()
         self._update_selected_count()
     
     def deselect_all_commands(self) -> None:
         """Deselect all commands."""
-        for i in range(len(self.commands)):
-            if i in self.selected_commands:
-                self.selected_commands.remove(i)
-            iid = str(i)
-            self.listbox.item(iid, values=("☐", i+1, self.commands[i], ""))
-            self.listbox.item(iid, tags=())
+        self.cmd_model.deselect_all()
         self._update_selected_count()
     
     def _update_selected_count(self) -> None:
@@ -1352,13 +6738,6 @@ macOS / Linux / Termux(Android) / Windows"""
         count = len(self.selected_commands)
         total = len(self.commands)
         self.selected_count_label.config(text=f"Selected: {count}/{total}")
-        old = self.commands[idx]
-        new = simpledialog.askstring("Edit Command", f"Edit command {idx+1}:", initialvalue=old)
-        if new is not None:
-            # Update the command in our list
-            self.commands[idx] = new
-            # Update the Treeview display
-            self.listbox.item(iid, values=(idx+1, new, ""))
     
     def show_context_menu(self, event: tk.Event) -> None:
         """Show context menu on right-click."""
@@ -1368,29 +6747,22 @@ macOS / Linux / Termux(Android) / Windows"""
             self.listbox.selection_set(item_id)
         
         # Show context menu at cursor position
+        menu = self._ensure_context_menu()
         try:
-            self.context_menu.tk_popup(event.x_root, event.y_root)
+            menu.tk_popup(event.x_root, event.y_root)
         finally:
-            self.context_menu.grab_release()
+            menu.grab_release()
     
     def edit_selected(self) -> None:
         """Edit the selected command."""
-        selection = self.listbox.selection()
-        if not selection:
-            messagebox.showwarning("No Selection", "Please select a command first")
-            return
-        
-        iid = selection[0]
-        try:
-            idx = int(iid)
-        except ValueError:
+        idx = self._selected_index()
+        if idx is None:
             return
         
         old = self.commands[idx]
         new = simpledialog.askstring("Edit Command", f"Edit command {idx+1}:", initialvalue=old)
         if new is not None:
-            self.commands[idx] = new
-            self.listbox.item(iid, values=(idx+1, new, ""))
+            self.cmd_model.set_text(idx, new)
             self.save_commands_to_config()
     
     def add_new_command(self) -> None:
@@ -1398,98 +6770,84 @@ macOS / Linux / Termux(Android) / Windows"""
         new_cmd = simpledialog.askstring("Add Command", "Enter new command:")
         if new_cmd is not None:
             idx = len(self.commands)
-            self.commands.append(new_cmd)
-            self.listbox.insert("", "end", iid=str(idx), values=(idx+1, new_cmd, ""))
-            self._update_listbox_numbers()
+            self.cmd_model.insert(idx, new_cmd)
+            self.list_view.see(idx)
             self.save_commands_to_config()
     
     def insert_before(self) -> None:
         """Insert a command before the selected one."""
-        selection = self.listbox.selection()
-        if not selection:
-            messagebox.showwarning("No Selection", "Please select a command first")
-            return
-        
-        iid = selection[0]
-        try:
-            idx = int(iid)
-        except ValueError:
+        idx = self._selected_index()
+        if idx is None:
             return
         
         new_cmd = simpledialog.askstring("Insert Before", "Enter command:")
         if new_cmd is not None:
-            self.commands.insert(idx, new_cmd)
-            self._rebuild_listbox()
+            self.cmd_model.insert(idx, new_cmd)
             self.save_commands_to_config()
     
     def insert_after(self) -> None:
         """Insert a command after the selected one."""
-        selection = self.listbox.selection()
-        if not selection:
-            messagebox.showwarning("No Selection", "Please select a command first")
-            return
-        
-        iid = selection[0]
-        try:
-            idx = int(iid)
-        except ValueError:
+        idx = self._selected_index()
+        if idx is None:
             return
         
         new_cmd = simpledialog.askstring("Insert After", "Enter command:")
         if new_cmd is not None:
-            self.commands.insert(idx + 1, new_cmd)
-            self._rebuild_listbox()
+            self.cmd_model.insert(idx + 1, new_cmd)
             self.save_commands_to_config()
     
     def delete_selected(self) -> None:
         """Delete the selected command."""
-        selection = self.listbox.selection()
-        if not selection:
-            messagebox.showwarning("No Selection", "Please select a command first")
-            return
-        
-        iid = selection[0]
-        try:
-            idx = int(iid)
-        except ValueError:
+        idx = self._selected_index()
+        if idx is None:
             return
         
         if messagebox.askyesno("Confirm Delete", f"Delete command {idx+1}?"):
-            self.commands.pop(idx)
-            self.listbox.delete(iid)
-            self._update_listbox_numbers()
+            self.cmd_model.delete(idx)
             self.save_commands_to_config()
     
-    def _rebuild_listbox(self) -> None:
-        """Rebuild the entire listbox from self.commands."""
-        # Clear existing items
-        for item in self.listbox.get_children():
-            self.listbox.delete(item)
-        
-        # Re-insert all commands
-        for i, cmd in enumerate(self.commands):
-            self.listbox.insert("", "end", iid=str(i), values=(i+1, cmd, ""))
-    
-    def _update_listbox_numbers(self) -> None:
-        """Update the line numbers in listbox after insert/delete."""
-        for i, cmd in enumerate(self.commands):
-            iid = str(i)
-            if self.listbox.exists(iid):
-                self.listbox.item(iid, values=(i+1, cmd, ""))
-            else:
-                self.listbox.insert("", "end", iid=iid, values=(i+1, cmd, ""))
-    
     def save_commands_to_config(self) -> None:
         """Save commands to configuration."""
         self.cfg["commands"] = self.commands
         self.seq_status.config(text=f"Ready: {len(self.commands)} commands")
+        self._update_selected_count()
+
+    def _update_hex_label(self) -> None:
+        """Show the latest RX chunk, at most once per HEX_LABEL_MS."""
+        self.hex_label_id = None
+        data = self.last_rx_chunk
+        hx = data[:HEX_LABEL_BYTES].hex(" ").upper()
+        self.hex_label.config(text=f"HEX: {hx}" + (" ..." if len(data) > HEX_LABEL_BYTES else ""))
+
+    def show_hex_dump(self) -> None:
+        """Open (or raise) the hex dump of raw RX/TX history."""
+        if self.hex_view is not None and self.hex_view.win.winfo_exists():
+            self.hex_view.lift()
+            return
+        self.hex_view = HexView(self.root, {"RX": self.rx_capture, "TX": self.tx_capture})
+
+    def dump_flight(self, reason: str = "manual", note: str = "", auto: bool = False) -> Optional[str]:
+        """Write the recent raw RX/TX window to the flight recorder folder."""
+        path = self.flight.dump(reason, note, auto)
+        if path is not None:
+            line = f"✈ Flight recorder ({reason}) → {path}\n"
+            self.log_buffer.append(line)
+            self.log.insert("end", line)
+            self.log.see("end")
+            self.root.after(FLIGHT_POLL_MS, self._flight_errors)
+        return path
+
+    def _flight_errors(self) -> None:
+        while not self.flight.errors.empty():
+            self.set_status(self.flight.errors.get_nowait())
+        if self.flight.busy:
+            self.root.after(FLIGHT_POLL_MS, self._flight_errors)
 
     def copy_hex(self, event: tk.Event) -> None:
         """Copy hex data to clipboard."""
-        t = self.hex_label.cget("text")
-        if t.startswith("HEX: "):
+        if self.last_rx_chunk:
             self.root.clipboard_clear()
-            self.root.clipboard_append(t[5:])
+            self.root.clipboard_append(self.last_rx_chunk.hex(" ").upper())
     
     def inject(self, event: Optional[tk.Event] = None) -> None:
         """Inject data in virtual mode."""
@@ -1586,21 +6944,19 @@ macOS / Linux / Termux(Android) / Windows"""
         
         self.backend.close()
         self.cfg = data
-        self.commands = data.get("commands", [""] * LINES_COUNT)
+        self.series.set_rules(data.get("capture_rules", {}))
         self.repeat_sec.set(data.get("repeat_sec", 1.0))
         self.repeat_cnt.set(data.get("repeat_cnt", 0))
         self.font_size = data.get("font_size", 7)
         self.eol_mode = data.get("eol_mode", "none")
         self.log.config(font=("Menlo", self.font_size))
         self.log.delete("1.0", "end")
-        self.listbox.delete(0, "end")
-        # Rebuild listbox with 4 columns including Select
-        for i, c in enumerate(self.commands):
-            selected = "☐"  # Reset all selections on load
-            self.listbox.insert("", "end", iid=str(i), values=(selected, i+1, c, ""))
-        self.selected_commands.clear()  # Clear selections
+        # Selections and statuses are reset on load
+        self.cmd_model.set_commands(data.get("commands", [""] * LINES_COUNT))
+        self.list_view.scroll_to(0)
         self._update_selected_count()  # Update counter
-        self.backend = SerialBackend(self.cfg, self.on_rx, self.set_status, self.root)
+        self.backend = SerialBackend(self.cfg, self.on_rx, self._on_port_status, self.root)
+        self.backend.tx_tap = self.tx_capture.append
         self.apply_theme()
     def port_settings(self) -> None:
         """Show port settings info."""
@@ -1609,6 +6965,17 @@ macOS / Linux / Termux(Android) / Windows"""
             "Change port → edit profile or restart with new selection"
         )
     
+    def open_log_file(self) -> None:
+        """Open a saved log of any size in a memory-mapped viewer."""
+        path = filedialog.askopenfilename(
+            title="Open log", filetypes=[("Logs", "*.txt *.log"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            LogFileView(self.root, MappedLog(path))
+        except OSError as e:
+            self.set_status(f"open failed: {e}")
+
     def save_log_manual(self) -> None:
         """Save log to user-selected file."""
         f = filedialog.asksaveasfilename(defaultextension=".txt")
@@ -1624,7 +6991,8 @@ macOS / Linux / Termux(Android) / Windows"""
 
 def select_port() -> Optional[str]:
     """Show port selection dialog."""
-    ports = [p.device for p in serial.tools.list_ports.comports()] + ["VIRTUAL"]
+    from serial.tools import list_ports
+    ports = [p.device for p in list_ports.comports()] + ["VIRTUAL"]
     
     win = tk.Tk()
     win.title("Select port")
@@ -1649,6 +7017,31 @@ def select_port() -> Optional[str]:
 
 def main() -> None:
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Serial Terminal for USB devices")
+    parser.add_argument("--merge", metavar="LOG[@OFFSET]", nargs="+",
+                        help="merge timestamped logs by time (OFFSET: clock correction in seconds) and exit")
+    parser.add_argument("-o", "--output", metavar="FILE", help="output file for --merge (default: stdout)")
+    parser.add_argument("--port", metavar="PORT",
+                        help="device or pyserial URL (socket://host:port, rfc2217://host:port, loop://)")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="print time spent in each startup phase to stderr")
+    parser.add_argument("--share", metavar="ADDRESS",
+                        help="share the serial port with local clients: PORT (socket://127.0.0.1:PORT) or unix:/path")
+    parser.add_argument("--control", metavar="ADDRESS",
+                        help="JSON-RPC control socket: unix:/path, tcp:127.0.0.1:PORT or PORT")
+    args = parser.parse_args()
+    if args.merge:
+        sources = [parse_merge_source(a) for a in args.merge]
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="\n") as out:
+                n = merge_logs(sources, out)
+            print(f"merged {n} lines into {args.output}", file=sys.stderr)
+        else:
+            merge_logs(sources, sys.stdout)
+        return
+    trace = StartupTrace(args.startup_trace)
+    trace.mark("imports")
+
     cfg = {
         "port": None, 
         "baud": 115200, 
@@ -1665,17 +7058,30 @@ def main() -> None:
         except Exception:
             pass
     
-    # Check if configured port exists
-    ports = [p.device for p in serial.tools.list_ports.comports()]
-    if cfg["port"] not in ports and cfg["port"] != "VIRTUAL":
-        p = select_port()
-        if not p:
-            return
-        cfg["port"] = p
+    if args.port:
+        cfg["port"] = args.port
+    trace.mark("profile load")
+    
+    # Check if configured port exists (URL ports are opened as given)
+    if cfg["port"] != "VIRTUAL" and not is_port_url(cfg["port"]):
+        from serial.tools import list_ports
+        ports = [p.device for p in list_ports.comports()]
+        trace.mark("port scan")
+        if cfg["port"] not in ports:
+            p = select_port()
+            if not p:
+                return
+            cfg["port"] = p
+            trace.mark("port selection")
     
     # Create and run application
     root = tk.Tk()
-    App(root, cfg)
+    trace.mark("tk root")
+    app = App(root, cfg, trace)
+    if args.control:
+        app.start_control_server(args.control)
+    if args.share:
+        app.start_port_share(args.share)
     root.mainloop()
 
 
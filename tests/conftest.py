@@ -0,0 +1,43 @@
+"""Shared fixtures: myterm importable from the repo root, Tk and TCP stand-ins."""
+
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeRoot:
+    """Stand-in for tk.Tk: records scheduled callbacks instead of running a loop."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func=None, *args):
+        self.scheduled.append((func, args))
+        return f"after#{len(self.scheduled)}"
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        pass
+
+
+@pytest.fixture
+def fake_root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def tcp_device():
+    """Local TCP stand-in for a networked serial device: (port, accepted sockets)."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(listener.accept()[0]), daemon=True).start()
+    yield listener.getsockname()[1], accepted
+    for s in accepted + [listener]:
+        s.close()
@@ -0,0 +1,20 @@
+"""Archive search across a folder of logs in worker processes."""
+
+import os
+import time
+
+import myterm
+
+
+def test_archive_search_survives_invalid_dates(tmp_path):
+    (tmp_path / "a.log").write_bytes(b"2024-05-01 10:00:00 OK one\n+CCLK: 2000-00-00 00:00:00\n")
+    (tmp_path / "b.log").write_bytes(b"2024-05-02 11:00:00 OK two\n")
+    search = myterm.ArchiveSearch(str(tmp_path), rb"OK", workers=1, sidecar=False)
+    while not search.done:
+        time.sleep(0.01)
+    hits = []
+    while not search.results.empty():
+        hits.append(search.results.get_nowait())
+    assert search.error is None and not search.failed
+    assert sorted((os.path.basename(p), line) for p, line, *_ in hits) == [("a.log", 1), ("b.log", 1)]
+    assert myterm._archive_line_time(b"+CCLK: 2000-00-00 00:00:00", 0.0) is None
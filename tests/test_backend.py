@@ -0,0 +1,67 @@
+"""SerialBackend over pyserial URLs: socket:// against a local TCP device, loop://."""
+
+import time
+
+import pytest
+
+import myterm
+
+serial = pytest.importorskip("serial")
+
+
+def _loop_backend(root):
+    return myterm.SerialBackend({"port": "loop://", "baud": 115200}, lambda data: None, lambda msg: None, root)
+
+
+def test_repeat_on_url_port_paces_the_wire(fake_root):
+    backend = _loop_backend(fake_root)
+    rep = myterm.RepeatScheduler(backend.write_threadsafe, b"x", 0.005, count=100)
+    rep.thread.join(5)
+    stats = rep.stats()
+    assert rep.done and rep.sent == 100
+    # Written straight to the port, not queued for the (never running) poll loop
+    assert backend.pending.empty()
+    assert backend.ser.read(1000) == b"x" * 100
+    assert stats["elapsed"] == pytest.approx(99 * 0.005, rel=0.2)
+    assert stats["rate"] == pytest.approx(200, rel=0.2)
+
+
+def test_serial_backend_socket_url(tcp_device, fake_root):
+    port, accepted = tcp_device
+    rx, status = [], []
+    backend = myterm.SerialBackend({"port": f"socket://127.0.0.1:{port}", "baud": 115200},
+                                   rx.append, status.append, fake_root)
+    assert status == ["connected"] and backend.url
+    for _ in range(100):
+        if accepted:
+            break
+        time.sleep(0.01)
+    device = accepted[0]
+    backend.write(b"AT\r")
+    backend.write(b"ATI\r")
+    backend._flush()  # Normally run by after_idle: both writes go out as one send
+    device.settimeout(2)
+    got = b""
+    while len(got) < 7:
+        got += device.recv(64)
+    assert got == b"AT\rATI\r"
+    device.sendall(b"OK\r\nComplete\r\n")
+    deadline = time.monotonic() + 2
+    while b"".join(rx) != b"OK\r\nComplete\r\n" and time.monotonic() < deadline:
+        backend._poll()
+        time.sleep(0.01)
+    assert b"".join(rx) == b"OK\r\nComplete\r\n"
+    backend.ser.close()
+
+
+def test_worker_writes_are_refused_while_suspended(fake_root):
+    backend = _loop_backend(fake_root)
+    ser = backend.suspend()
+    with pytest.raises(OSError):
+        backend.write_threadsafe(b"AT\r")
+    rep = myterm.RepeatScheduler(backend.write_threadsafe, b"x", 0.005, count=3)
+    rep.thread.join(5)
+    assert rep.done and rep.sent == 0 and "port busy" in rep.error
+    backend.resume()
+    backend.write_threadsafe(b"AT\r")
+    assert ser.read(100) == b"AT\r"
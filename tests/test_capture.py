@@ -0,0 +1,26 @@
+"""Raw capture arena: absolute offsets, trimming and the chunk time index."""
+
+import myterm
+
+
+def test_offsets_survive_trimming():
+    cap = myterm.RawCapture(limit=16)
+    for i in range(10):
+        cap.append(bytes([65 + i]) * 4, t=float(i))
+    assert cap.end == 40
+    assert len(cap.data) <= 16 and cap.base == cap.end - len(cap.data)
+    assert cap.read(36, 4) == b"JJJJ"
+    assert cap.read(0, 8) == b""  # Trimmed away
+    assert cap.find(b"IJ", 0) == 35
+    assert cap.find(b"AB", 0) == -1
+
+
+def test_time_index():
+    cap = myterm.RawCapture()
+    cap.append(b"OK\r\n", t=10.0)
+    cap.append(b"Complete\r\n", t=11.5)
+    assert cap.offset_at(11.0) == 4
+    assert cap.offset_at(99.0) == cap.end
+    assert cap.time_at(0) == 10.0 and cap.time_at(5) == 11.5
+    cap.clear()
+    assert cap.time_at(5) is None and cap.end == 14 and cap.read(0, 14) == b""
@@ -0,0 +1,42 @@
+"""CommandListModel: selection/status bookkeeping and change tracking."""
+
+import myterm
+
+
+def test_row_values_and_tags():
+    model = myterm.CommandListModel(["AT", "ATI", "AT+GMR"])
+    model.toggle(1)
+    model.set_status(1, "✓")
+    model.set_status(2, "≠")
+    assert model.row(0) == (("☐", 1, "AT", ""), ())
+    assert model.row(1) == (("☑", 2, "ATI", "✓"), ("selected", "success"))
+    assert model.row(2) == (("☐", 3, "AT+GMR", "≠"), ("mismatch",))
+
+
+def test_insert_and_delete_shift_selection_and_status():
+    model = myterm.CommandListModel(["a", "b", "c", "d"])
+    model.toggle(1)
+    model.toggle(3)
+    model.set_status(2, "✗")
+    model.insert(2, "new")
+    assert model.commands == ["a", "b", "new", "c", "d"]
+    assert model.selected == {1, 4} and model.status == {3: "✗"}
+    model.delete(1)
+    assert model.commands == ["a", "new", "c", "d"]
+    assert model.selected == {3} and model.status == {2: "✗"}
+
+
+def test_changes_are_tracked_per_row_and_notified():
+    model = myterm.CommandListModel(["a", "b"])
+    calls = []
+    model.listeners.append(lambda: calls.append(1))
+    model.all_dirty = False
+    model.set_text(0, "A")
+    model.toggle(1)
+    model.set_status(1, "")
+    assert model.dirty == {0, 1} and not model.all_dirty and len(calls) == 3
+    model.select_all()
+    assert model.all_dirty and model.selected == {0, 1}
+    model.deselect_all()
+    model.clear_statuses()
+    assert model.selected == set() and model.status == {}
@@ -0,0 +1,56 @@
+"""Control socket: JSON-RPC requests and rx notifications over a local TCP port."""
+
+import json
+import socket
+import time
+
+import myterm
+
+
+def test_parse_socket_address_stays_local():
+    assert myterm.parse_socket_address("7700") == (socket.AF_INET, ("127.0.0.1", 7700))
+    assert myterm.parse_socket_address("tcp:localhost:7701") == (socket.AF_INET, ("localhost", 7701))
+    try:
+        myterm.parse_socket_address("0.0.0.0:7700")
+    except ValueError as e:
+        assert "non-loopback" in str(e)
+    else:
+        raise AssertionError("listening on all interfaces must be refused")
+
+
+def test_control_server_json_rpc_over_tcp():
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    srv = myterm.ControlServer(f"127.0.0.1:{port}")
+    calls = []
+
+    def handler(method, params):
+        calls.append((method, params))
+        if method == "get_stats":
+            return {"lines": 3}
+        raise myterm.ControlError(-32601, f"method not found: {method}")
+
+    client = socket.create_connection(("127.0.0.1", port))
+    reader = client.makefile("rb")
+    try:
+        client.sendall(b'{"jsonrpc": "2.0", "id": 1, "method": "subscribe"}\n'
+                       b'{"jsonrpc": "2.0", "id": 2, "method": "get_stats"}\n'
+                       b'{"jsonrpc": "2.0", "id": 3, "method": "nope"}\n'
+                       b'not json\n')
+        handled, deadline = 0, time.monotonic() + 2
+        while handled < 4 and time.monotonic() < deadline:
+            handled += srv.pump(handler)
+            time.sleep(0.01)
+        replies = [json.loads(reader.readline()) for _ in range(4)]
+        assert replies[0] == {"jsonrpc": "2.0", "id": 1, "result": True}
+        assert replies[1]["result"] == {"lines": 3}
+        assert replies[2]["error"]["code"] == -32601
+        assert replies[3]["error"]["code"] == -32700
+        assert calls == [("get_stats", {}), ("nope", {})] and srv.subscribers == 1
+        srv.publish("Complete")
+        assert json.loads(reader.readline()) == {"jsonrpc": "2.0", "method": "rx", "params": {"lines": ["Complete"]}}
+    finally:
+        reader.close()
+        client.close()
+        srv.close()
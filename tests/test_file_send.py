@@ -0,0 +1,54 @@
+"""File sending: line/chunk units, echo and prompt pacing, retries."""
+
+import threading
+
+import myterm
+
+
+def _send(tmp_path, data, device, **kw):
+    path = tmp_path / "upload.txt"
+    path.write_bytes(data)
+    holder, ready = [], threading.Event()
+
+    def write(payload):
+        ready.wait(2)  # The worker may start writing before the constructor returns
+        for reply in device(payload):
+            holder[0].feed(reply)
+
+    holder.append(myterm.FileSender(str(path), write, **kw))
+    ready.set()
+    holder[0].thread.join(5)
+    return holder[0]
+
+
+def test_echo_mode_accepts_blank_lines(tmp_path):
+    sent = []
+
+    def device(payload):
+        sent.append(payload)
+        return [payload.replace(b"\r", b"\r\n")]
+
+    fs = _send(tmp_path, b"AT\n\nATI\n", device, wait="echo", timeout=0.5)
+    assert fs.done and fs.error is None
+    assert sent == [b"AT\r", b"\r", b"ATI\r"]
+    assert fs.units == 3 and fs.sent == fs.total and fs.retried == 0
+    assert fs.echo_verified() is True
+
+
+def test_echo_mismatch_retries_then_fails(tmp_path):
+    fs = _send(tmp_path, b"AT\n", lambda payload: [b"AX\r\n"], wait="echo", timeout=0.2, retries=2)
+    assert fs.error == "echo mismatch at unit 1 after 2 retries"
+    assert fs.retried == 2 and fs.units == 0
+
+
+def test_chunks_wait_for_prompt(tmp_path):
+    chunks = []
+
+    def device(payload):
+        chunks.append(payload)
+        return [b"stored\r\n> "]
+
+    fs = _send(tmp_path, bytes(range(256)) * 3, device, mode="chunk", chunk_size=100, wait="prompt", prompt="> ")
+    assert fs.error is None and fs.units == 8
+    assert b"".join(chunks) == bytes(range(256)) * 3
+    assert fs.progress()["sent"] == 768 and fs.echo_verified() is None
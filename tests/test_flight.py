@@ -0,0 +1,50 @@
+"""Flight recorder: time-window dumps of the raw RX/TX captures."""
+
+import time
+
+import myterm
+
+
+def _recorder(tmp_path, **cfg):
+    now = time.time()
+    rx, tx = myterm.RawCapture(), myterm.RawCapture()
+    rx.append(b"stale\r\n", t=now - 120)
+    tx.append(b"AT\r", t=now - 2)
+    rx.append(b"OK\r\n", t=now - 1)
+    captures = {"RX": rx, "TX": tx}
+    return myterm.FlightRecorder(captures, {"flight_dir": str(tmp_path / "flight"), **cfg})
+
+
+def _wait(recorder):
+    for w in recorder.writers:
+        w.join(5)
+    assert not recorder.busy
+
+
+def test_dump_merges_the_window_in_time_order(tmp_path):
+    fr = _recorder(tmp_path, flight_seconds=30)
+    path = fr.dump("timeout", "AT timed out")
+    _wait(fr)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert text.startswith("# myterm flight recorder: timeout\n# AT timed out\n")
+    assert "stale" not in text
+    assert text.index(" TX 3 bytes") < text.index(" RX 4 bytes")
+    assert "41 54 0d" in text and "OK.." in text
+    assert fr.errors.empty()
+
+
+def test_automatic_dumps_are_rate_limited(tmp_path):
+    fr = _recorder(tmp_path, flight_min_interval=60)
+    assert fr.dump("timeout", auto=True) is not None
+    assert fr.dump("timeout", auto=True) is None
+    assert fr.dump("manual") is not None  # Manual dumps always go through
+    _wait(fr)
+
+
+def test_write_errors_are_reported(tmp_path):
+    (tmp_path / "flight").write_text("not a folder")
+    fr = _recorder(tmp_path)
+    fr.dump("disconnected")
+    _wait(fr)
+    assert fr.errors.get_nowait().startswith("flight recorder:")
@@ -0,0 +1,65 @@
+"""Binary framing: COBS, SLIP and length-prefixed frames with optional CRCs."""
+
+import pytest
+
+import myterm
+
+
+def test_frame_decoder_resyncs_at_configured_max_frame():
+    dec = myterm.FrameDecoder("cobs", max_frame=64)
+    assert dec.feed(b"\x01" * 100) == [] and dec.errors == 0
+    assert dec.feed(b"\x01" * 100) == [] and dec.errors == 1
+    assert len(dec.buf) == 0
+    assert dec.feed(b"\x03ab\x00") == [b"ab"]
+
+
+def _cobs_encode(data):
+    out, block = bytearray(), bytearray()
+    for b in data + b"\x00":
+        if b == 0 or len(block) == 254:
+            out += bytes((len(block) + 1,)) + block
+            block = bytearray()
+            if b != 0:
+                block.append(b)
+        else:
+            block.append(b)
+    return bytes(out) + b"\x00"
+
+
+def _slip_encode(data):
+    return data.replace(b"\xdb", b"\xdb\xdd").replace(b"\xc0", b"\xdb\xdc") + b"\xc0"
+
+
+def _crc_trailer(payload, crc):
+    if crc == "crc16":
+        return payload + myterm.binascii.crc_hqx(payload, 0xFFFF).to_bytes(2, "little")
+    if crc == "crc32":
+        return payload + myterm.zlib.crc32(payload).to_bytes(4, "little")
+    return payload
+
+
+@pytest.mark.parametrize("crc", ["none", "crc16", "crc32"])
+@pytest.mark.parametrize("kind", ["cobs", "slip", "length"])
+def test_frame_decoder_round_trip(kind, crc):
+    payloads = [b"\x00\x01\xc0\xdb" * 3, bytes(range(256)) * 2, b"x", b"\x00" * 300]
+    wire = b""
+    for p in payloads:
+        body = _crc_trailer(p, crc)
+        if kind == "cobs":
+            wire += _cobs_encode(body)
+        elif kind == "slip":
+            wire += _slip_encode(body)
+        else:
+            wire += len(p).to_bytes(2, "little") + body
+    dec = myterm.FrameDecoder(kind, crc)
+    # Byte-sized and odd-sized feeds must give the same frames
+    got = [f for i in range(0, len(wire), 7) for f in dec.feed(wire[i:i + 7])]
+    assert got == payloads and dec.errors == 0
+
+
+def test_frame_decoder_rejects_bad_crc():
+    dec = myterm.FrameDecoder("cobs", "crc16")
+    good = _cobs_encode(_crc_trailer(b"hello", "crc16"))
+    bad = bytearray(good)
+    bad[2] ^= 0x20
+    assert dec.feed(bytes(bad) + good) == [b"hello"] and dec.errors == 1
@@ -0,0 +1,38 @@
+"""Golden-run baselines: response fingerprints and tolerance checks."""
+
+import myterm
+
+GB = myterm.GoldenBaseline
+
+
+def test_fingerprint_ignores_timestamps_and_whitespace():
+    a = GB.fingerprint("2024-05-01 12:00:03 TEMP=21.5  C\r\nOK")
+    b = GB.fingerprint("2025-01-09T08:30:59 TEMP=22.0 C\nOK")
+    assert a["hash"] == b["hash"]
+    assert a["numbers"] == [21.5] and b["numbers"] == [22.0]
+
+
+def test_fingerprint_keeps_hex_in_skeleton():
+    a = GB.fingerprint("MASK 0xff00 COUNT 3")
+    assert a["numbers"] == [3.0]
+    assert a["hash"] == GB.fingerprint("MASK 0XFF00 COUNT 4")["hash"]
+    assert a["hash"] != GB.fingerprint("MASK 0xFF01 COUNT 3")["hash"]
+
+
+def test_compare_tolerances():
+    key = GB.key(0, "ATS49?")
+    baseline = GB({key: GB.fingerprint("GAIN: 10.0 200")})
+    tol = {"abs": 0.0, "rel": 0.0, "fields": {"ATS49?": {"0": {"abs": 0.5}, "*": {"rel": 0.05}}}}
+    assert baseline.compare(key, "ATS49?", GB.fingerprint("GAIN: 10.4 209"), tol) is None
+    assert baseline.compare(key, "ATS49?", GB.fingerprint("GAIN: 10.6 200"), tol) == "value #0 is 10.6, golden 10"
+    assert "value #1" in baseline.compare(key, "ATS49?", GB.fingerprint("GAIN: 10 211"), tol)
+    assert baseline.compare(key, "ATS49?", GB.fingerprint("GAIN: 10 200 3"), tol) == "response text differs"
+    assert baseline.compare(key, "ATS49?", GB.fingerprint("ERROR"), tol) == "response text differs"
+    assert baseline.compare(GB.key(None, "AT"), "AT", GB.fingerprint("x"), tol) is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "golden.json")
+    baseline = GB({GB.key(None, "ATI"): GB.fingerprint("Modem v1.2")})
+    baseline.save(path)
+    assert GB.load(path).entries == baseline.entries
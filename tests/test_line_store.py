@@ -0,0 +1,35 @@
+"""Session log store: lines packed into one byte arena."""
+
+import pytest
+
+import myterm
+
+
+def _store():
+    store = myterm.LineStore()
+    for line in [">> AT\n", "OK\n", ">> ATI\n", "Modem v1.2 ünïcode\n", "ok again\n"]:
+        store.append(line)
+    return store
+
+
+def test_list_operations_and_flags():
+    store = _store()
+    assert len(store) == 5
+    assert store[1] == "OK\n" and store[-2] == "Modem v1.2 ünïcode\n"
+    assert list(store)[2] == ">> ATI\n"
+    assert list(store.flags) == [myterm.LINE_TX, myterm.LINE_RX, myterm.LINE_TX, myterm.LINE_RX, myterm.LINE_RX]
+    assert store.text(3) == "Modem v1.2 ünïcode\nok again\n"
+    assert store.join([0, 4]) == ">> AT\nok again\n"
+    with pytest.raises(IndexError):
+        store[5]
+    store.clear()
+    assert len(store) == 0 and store.text() == ""
+
+
+def test_grep_counts_each_line_once():
+    store = _store()
+    assert store.grep("ok") == [1, 4]
+    assert store.grep("OK", ignore_case=False) == [1]
+    assert store.grep("o") == [1, 3, 4]  # Line 3 matches twice
+    assert store.grep("ÜNÏ") == [3]
+    assert store.line_at(store.offsets[3] + 2) == 3
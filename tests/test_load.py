@@ -0,0 +1,33 @@
+"""Load generator: open- and closed-loop steps against a loop:// device."""
+
+import pytest
+
+import myterm
+
+serial = pytest.importorskip("serial")
+
+
+def _run(pattern, **kw):
+    ser = serial.serial_for_url("loop://", timeout=0.1)
+    lg = myterm.LoadGenerator(ser, [("AT", 3.0), ("ATI", 1.0)], pattern, **kw)
+    lg.thread.join(10)
+    ser.close()
+    assert lg.done and lg.error is None
+    return lg
+
+
+def test_open_loop_ramps_until_the_limit():
+    # loop:// echoes every command, so each "\r" answers the oldest request
+    lg = _run("\r", mode="open", start=40, limit=80, step_s=0.3, timeout=0.2)
+    assert [s.level for s in lg.steps] == [40, 60]
+    for step in lg.steps:
+        assert step.sent > 0 and step.ok == step.sent and step.lost == 0
+    assert set(lg.sequence) == {b"AT\r", b"ATI\r"}
+
+
+def test_closed_loop_without_responses_saturates_at_once():
+    lg = _run("Complete", mode="closed", start=2, limit=64, step_s=0.3, timeout=0.05)
+    assert len(lg.steps) == 1 and lg.steps[0].saturated
+    s = lg.steps[0].summary()
+    assert s["ok"] == 0 and s["lost"] == s["sent"] > 2
+    assert lg.saturation["level"] == 2
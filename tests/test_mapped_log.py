@@ -0,0 +1,56 @@
+"""Saved-log viewer: memory-mapped line index, search and filtering."""
+
+import re
+import threading
+import time
+from array import array
+
+import myterm
+
+
+def _mapped_log(tmp_path, lines):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(line + b"\n" for line in lines))
+    log = myterm.MappedLog(str(path))
+    while not log.done:
+        time.sleep(0.01)
+    return log
+
+
+def test_mapped_log_find_wraps_and_anchors(tmp_path):
+    log = _mapped_log(tmp_path, [b"OK %d" % i if i % 1000 == 7 else b"line %d" % i for i in range(5000)])
+    pattern = re.compile(rb"^OK \d+", re.MULTILINE)
+    stop = threading.Event()
+    start, end = log.find(pattern, 0, stop)
+    assert log.line_of(start) == 7 and log.mm[start:end] == b"OK 7"
+    start, _ = log.find(pattern, log.line_start(4008), stop)
+    assert log.line_of(start) == 7  # Wrapped to the top
+    out = array("Q")
+    log.filter(pattern, out, stop)
+    assert [log.line_of(p) for p in out] == [7, 1007, 2007, 3007, 4007]
+    log.close()
+
+
+def test_mapped_log_line_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(myterm, "LOG_INDEX_CHUNK", 64)
+    monkeypatch.setattr(myterm, "LOG_SCAN_BLOCK", 256)
+    lines = [b"line %d %s" % (i, b"=" * (i % 37)) for i in range(1000)]
+    log = _mapped_log(tmp_path, lines)
+    assert log.line_count == 1000
+    assert log.lines(0, 2) == ["line 0 ", "line 1 ="]
+    assert log.lines(998, 5) == [lines[998].decode(), lines[999].decode()]
+    for n in (1, 63, 500, 999):
+        pos = log.line_start(n)
+        assert log.read_line(pos)[0] == lines[n].decode()
+        assert log.line_of(pos) == n and log.line_of(pos + 3) == n
+    log.close()
+
+
+def test_mapped_log_without_trailing_newline(tmp_path):
+    path = tmp_path / "tail.log"
+    path.write_bytes(b"a\nb\nc")
+    log = myterm.MappedLog(str(path))
+    while not log.done:
+        time.sleep(0.01)
+    assert log.line_count == 3 and log.lines(0, 10) == ["a", "b", "c"]
+    log.close()
@@ -0,0 +1,19 @@
+"""Merging logs from several devices into one time-ordered stream."""
+
+import io
+
+import myterm
+
+
+def test_merge_logs_orders_by_time_with_offsets(tmp_path):
+    a = tmp_path / "2024-05-01_10-00-00-a.log"
+    b = tmp_path / "2024-05-01_10-00-00-b.log"
+    a.write_text("2024-05-01 10:00:00.000\tboot A\n2024-05-01 10:00:02.000\tping A\ncontinued\n")
+    b.write_text("[10:00:01] boot B\n[10:00:03] ping B\n")
+    out = io.StringIO()
+    n = myterm.merge_logs([myterm.parse_merge_source(str(a)), myterm.parse_merge_source(f"{b}@-2.5")], out)
+    rows = [line.split("\t") for line in out.getvalue().splitlines()]
+    assert n == 5
+    assert [r[2] for r in rows] == ["[10:00:01] boot B", "boot A", "[10:00:03] ping B", "ping A", "continued"]
+    assert rows[0][0].endswith("09:59:58.500") and rows[4][0] == rows[3][0]
+    assert myterm.parse_merge_source("x.log@abc") == ("x.log@abc", "x.log@abc", 0.0)
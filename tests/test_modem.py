@@ -0,0 +1,76 @@
+"""XMODEM-1K / YMODEM transfers between two socket:// ports."""
+
+import os
+import select
+import socket
+import threading
+import time
+
+import pytest
+
+import myterm
+
+serial = pytest.importorskip("serial")
+
+
+@pytest.fixture
+def tcp_pair():
+    """Two socket:// ports joined by a local TCP relay (a null-modem cable)."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    conns = []
+
+    def relay():
+        conns.extend(listener.accept()[0] for _ in range(2))
+        while True:
+            ready, _, _ = select.select(conns, [], [], 0.5)
+            for src in ready:
+                try:
+                    data = src.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                conns[1 - conns.index(src)].sendall(data)
+
+    threading.Thread(target=relay, daemon=True).start()
+    ends = [serial.serial_for_url(f"socket://127.0.0.1:{port}", timeout=0.1) for _ in range(2)]
+    yield ends
+    for s in ends + conns + [listener]:
+        s.close()
+
+
+def _wait(transfer, limit=20):
+    transfer.thread.join(limit)
+    assert transfer.done, "transfer did not finish"
+    assert transfer.error is None, transfer.error
+
+
+def test_xmodem_over_tcp(tcp_pair, tmp_path):
+    data = os.urandom(5000)
+    src = tmp_path / "fw.bin"
+    src.write_bytes(data)
+    dst = tmp_path / "out.bin"
+    # Sender first: it flushes its input on start, which would eat the receiver's first 'C'
+    tx = myterm.ModemTransfer(tcp_pair[1], "send", "xmodem", str(src))
+    time.sleep(0.2)
+    rx = myterm.ModemTransfer(tcp_pair[0], "receive", "xmodem", str(dst))
+    _wait(tx)
+    _wait(rx)
+    got = dst.read_bytes()
+    assert got[:len(data)] == data and set(got[len(data):]) <= {myterm.SUB}
+
+
+def test_ymodem_batch_over_tcp(tcp_pair, tmp_path):
+    data = os.urandom(3000)
+    src = tmp_path / "cfg.bin"
+    src.write_bytes(data)
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    # Sender first: it flushes its input on start, which would eat the receiver's first 'C'
+    tx = myterm.ModemTransfer(tcp_pair[1], "send", "ymodem", str(src))
+    time.sleep(0.2)
+    rx = myterm.ModemTransfer(tcp_pair[0], "receive", "ymodem", str(folder))
+    _wait(tx)
+    _wait(rx)
+    assert (folder / "cfg.bin").read_bytes() == data
@@ -0,0 +1,45 @@
+"""Live plot decimation: per-column min/max buckets match a brute-force reduction."""
+
+import random
+
+import myterm
+
+
+def _brute_force(series, t0, dt):
+    out = {}
+    for t, v in zip(series.t, series.v):
+        if t >= t0:
+            b = int(t / dt)
+            lo, hi = out.get(b, (v, v))
+            out[b] = (min(lo, v), max(hi, v))
+    return out
+
+
+def test_buckets_match_brute_force_across_incremental_updates():
+    rnd = random.Random(7)
+    s = myterm.Series("x")
+    trace = myterm._PlotTrace(s, item=0)
+    dt = 0.05
+    trace.reset(dt, 0.0, columns=10_000)
+    t = 0.0
+    for _ in range(20):  # Samples arrive between frames
+        for _ in range(rnd.randrange(1, 300)):
+            t += rnd.random() * 0.01
+            s.t.append(t)
+            s.v.append(rnd.uniform(-100, 100))
+        trace.update(0.0)
+    got = {b: (lo, hi) for b, lo, hi in trace.buckets}
+    assert got == _brute_force(s, 0.0, dt)
+    assert len(trace.buckets) < len(s) / 2
+
+
+def test_update_skips_samples_that_scrolled_out():
+    s = myterm.Series("x")
+    s.t.extend(float(i) for i in range(100))
+    s.v.extend(float(i) for i in range(100))
+    trace = myterm._PlotTrace(s, item=0)
+    trace.reset(1.0, 0.0, columns=5)
+    trace.pos = 0
+    trace.update(90.0)
+    assert [b for b, _, _ in trace.buckets] == list(range(93, 100))  # deque keeps columns + 2
+    assert trace.pos == 100
@@ -0,0 +1,36 @@
+"""Run reports: JUnit XML and JSON output."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import myterm
+
+
+def _report():
+    report = myterm.RunReport("seq", "modem.json", "COM3", run_id=7)
+    report.add(0, "AT", "success", 0.012, "OK", 1.0)
+    report.add(1, "ATI", "timeout", None, "", 2.0)
+    report.add(None, "AT+X", "mismatch", 0.5, "bad\x07 reply", 3.0)
+    return report
+
+
+def test_summary_counts_non_success_as_failures():
+    assert _report().summary() == {"tests": 3, "failures": 2, "passed": 1}
+
+
+def test_write_junit_and_json(tmp_path):
+    xml_path, json_path = _report().write(str(tmp_path / "run"))
+    suite = ET.parse(xml_path).getroot().find("testsuite")
+    assert suite.get("name") == "myterm.seq" and suite.get("failures") == "2"
+    props = {p.get("name"): p.get("value") for p in suite.iter("property")}
+    assert props == {"profile": "modem.json", "port": "COM3", "run_id": "7"}
+    cases = suite.findall("testcase")
+    assert [c.get("name") for c in cases] == ["#1 AT", "#2 ATI", "#- AT+X"]
+    assert cases[0].find("failure") is None and cases[0].find("system-out").text == "OK"
+    assert cases[1].find("failure").get("type") == "timeout"
+    assert cases[2].find("failure").get("type") == "mismatch"
+    assert cases[2].find("system-out").text == "bad reply"  # Control characters are not valid XML
+    with open(json_path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["run_id"] == 7 and data["ended"] is not None
+    assert [c["timeout"] for c in data["cases"]] == [False, True, False]
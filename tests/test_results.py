@@ -0,0 +1,54 @@
+"""Results history: nearest-rank percentiles and the SQLite results store."""
+
+import pytest
+
+import myterm
+
+
+@pytest.mark.parametrize("pct, expected", [(50, 50), (99, 99), (100, 100), (7, 7), (0.5, 1), (0, 1)])
+def test_percentile_nearest_rank(pct, expected):
+    assert myterm._percentile([float(v) for v in range(1, 101)], pct) == expected
+
+
+def test_percentile_small_and_empty():
+    assert myterm._percentile([], 50) is None
+    assert myterm._percentile([3.0], 99) == 3.0
+    assert myterm._percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+
+
+def _record(store, run_id, command, status, latency, sent_at):
+    store.record(run_id, "p.json", "loop://", command, 0, status, latency, "OK", sent_at, sent_at + (latency or 0))
+
+
+def test_results_store_percentiles_over_last_runs(tmp_path):
+    store = myterm.ResultsStore(str(tmp_path / "r.sqlite3"))
+    old = store.start_run("p.json", "loop://", "seq")
+    _record(store, old, "AT", "success", 9.0, 1.0)  # Falls outside the last 3 runs
+    for latency in range(1, 4):
+        run_id = store.start_run("p.json", "loop://", "seq")
+        for k in range(10):
+            _record(store, run_id, "AT", "success", latency + k / 100, 10.0)
+        _record(store, run_id, "AT", "timeout", None, 10.0)
+        store.end_run(run_id)
+    store.close()
+    stats = store.latency_percentiles("AT", last_runs=3)
+    assert stats["executions"] == 33 and stats["failed"] == 3
+    assert stats["p50"] == pytest.approx(2.04) and stats["p99"] == pytest.approx(3.09)
+    assert store.latency_percentiles("ATI")["p50"] is None
+
+
+def test_results_store_regressions(tmp_path):
+    store = myterm.ResultsStore(str(tmp_path / "r.sqlite3"))
+    run_id = store.start_run("p.json", "loop://", "seq")
+    for t in range(10):
+        _record(store, run_id, "AT", "success", 0.1, float(t))
+        _record(store, run_id, "ATI", "success", 0.1, float(t))
+    for t in range(10, 20):
+        _record(store, run_id, "AT", "success" if t % 2 else "timeout", 0.1, float(t))
+        _record(store, run_id, "ATI", "success", 0.3, float(t))
+    store.close()
+    found = {r["command"]: r for r in store.regressions(since=10.0)}
+    assert set(found) == {"AT", "ATI"}
+    assert found["AT"]["success_after"] == 0.5
+    assert found["ATI"]["latency_after"] == pytest.approx(0.3)
+
@@ -0,0 +1,31 @@
+"""Command scripts: compilation to a plan and compile-time errors."""
+
+import pytest
+
+import myterm
+
+
+def test_compile_script_plan():
+    plan = myterm.compile_script("send AT\nexpect 'OK' timeout 1.5\nwait 0.2").plan
+    assert [op[0] for op in plan] == [myterm.OP_SEND, myterm.OP_EXPECT, myterm.OP_WAIT]
+    assert plan[1][3] == 1.5 and plan[2][1] == 0.2
+
+
+@pytest.mark.parametrize("text, message", [
+    ("expect 'OK' timeout abc", "line 1: timeout needs seconds"),
+    ("do\nsend AT\nuntil 'OK' max 2x", "line 3: max needs a count"),
+    ("wait soon", "line 1: wait needs seconds"),
+    ("until 'OK'", "line 1: 'until' without 'do'"),
+])
+def test_compile_script_errors(text, message):
+    with pytest.raises(myterm.ScriptError, match=message):
+        myterm.compile_script(text)
+
+
+def test_sweeps_and_loops_are_not_unrolled():
+    plan = myterm.compile_script("repeat 100000\n  write ATS01\nend\nATS49={1..4}").plan
+    assert len(plan) < 10
+    codes = [op[0] for op in plan]
+    assert codes.count(myterm.OP_FOR_NEXT) == 2 and codes.count(myterm.OP_WRITE) == 1
+    sweep = next(op for op in plan if op[0] == myterm.OP_FOR_NEXT and op[3] == range(1, 5))
+    assert myterm.render_template(plan[-2][1], {sweep[2]: 3}) == "ATS49=3"
@@ -0,0 +1,63 @@
+"""Captured numeric series: capture rules, time windows, stats and export."""
+
+import ast
+import time
+from array import array
+
+import myterm
+
+
+def _store():
+    return myterm.SeriesStore({
+        "ATS49": [{"name": "temp", "regex": r"T=([-\d.]+)"}],
+        "*": [{"kv": True}],
+    })
+
+
+def test_rules_by_command_name_and_wildcard():
+    store = _store()
+    store.set_command("ATS49=1")
+    assert store.feed("T=21.5 V=3.3", t=1.0) == 3
+    store.set_command("ATI")
+    assert store.feed("T=99", t=2.0) == 1  # Only the kv rule applies
+    assert sorted(store.series) == ["*.T", "*.V", "ATS49.temp"]
+    assert list(store.series["ATS49.temp"].v) == [21.5]
+    assert list(store.series["*.T"].t) == [1.0, 2.0]
+
+
+def test_samples_are_indexed_by_monotonic_time():
+    store = _store()
+    store.set_command("ATS49")
+    before = time.monotonic()
+    store.feed("T=1")
+    s = store.series["ATS49.temp"]
+    assert before <= s.t[0] <= time.monotonic()
+    assert abs(s.wall_times()[0] - time.time()) < 1.0
+
+
+def test_window_and_stats():
+    s = myterm.Series("x")
+    s.t.extend([1.0, 2.0, 3.0, 4.0])
+    s.v.extend([10.0, -5.0, 7.0, 8.0])
+    assert s.window(2.0, 4.0) == (1, 3)
+    assert s.stats(*s.window(2.0)) == {"count": 3, "min": -5.0, "max": 8.0, "mean": 10 / 3, "last": 8.0}
+    assert s.stats(*s.window(9.0)) == {"count": 0}
+
+
+def test_exports_use_wall_clock_times(tmp_path):
+    store = _store()
+    store.set_command("ATS49")
+    store.feed("T=1.5", t=100.0)
+    store.feed("T=2.5", t=101.0)
+    wall0 = store.series["ATS49.temp"].wall0
+    rows = store.export_csv(str(tmp_path / "s.csv"), ["ATS49.temp"])
+    lines = (tmp_path / "s.csv").read_text().splitlines()
+    assert rows == 2 and lines[0] == "series,timestamp,value"
+    assert float(lines[1].split(",")[1]) == round(100.0 + wall0, 6)
+    assert store.export_npy(str(tmp_path / "s.npy"), "ATS49.temp") == 2
+    raw = (tmp_path / "s.npy").read_bytes()
+    header_len = int.from_bytes(raw[8:10], "little")
+    header = ast.literal_eval(raw[10:10 + header_len].decode("latin1"))
+    assert header["shape"] == (2, 2) and (10 + header_len) % 64 == 0
+    data = array("d", raw[10 + header_len:])
+    assert list(data) == [100.0 + wall0, 1.5, 101.0 + wall0, 2.5]
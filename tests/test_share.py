@@ -0,0 +1,58 @@
+"""Port sharing: the per-client byte ring and RX/TX fan-out over TCP."""
+
+import socket
+import time
+
+import myterm
+
+
+def test_byte_ring_wraps_and_drops_oldest():
+    ring = myterm.ByteRing(8)
+    ring.write(b"abcdef")
+    assert ring.read_all() == b"abcdef"
+    ring.write(b"123456")  # Wraps past the end of the buffer
+    assert len(ring) == 6 and ring.read_all() == b"123456"
+    ring.write(b"abcdef")
+    ring.write(b"ghij")
+    assert ring.dropped == 2 and ring.read_all() == b"cdefghij"
+    ring.write(b"xy")
+    ring.write(b"0123456789")
+    assert ring.dropped == 2 + 4 and ring.read_all() == b"23456789"
+    assert ring.read_all() == b""
+
+
+def _wait_for(predicate, limit=2.0):
+    deadline = time.monotonic() + limit
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_port_share_fans_out_rx_and_queues_tx():
+    srv = myterm.PortShareServer("127.0.0.1:0", ring_bytes=64)
+    port = srv.listener.getsockname()[1]
+    clients = [socket.create_connection(("127.0.0.1", port)) for _ in range(2)]
+    try:
+        assert _wait_for(lambda: len(srv.clients) == 2)
+        srv.publish(b"OK\r\n")
+        for c in clients:
+            c.settimeout(2)
+            assert c.recv(64) == b"OK\r\n"
+        clients[0].sendall(b"AT\r")
+        clients[1].sendall(b"ATI\r")
+        written = []
+
+        def drained():
+            srv.drain_tx(written.append)
+            return len(written) == 2
+
+        assert _wait_for(drained)
+        assert sorted(written) == [b"AT\r", b"ATI\r"]
+        clients[1].close()
+        assert _wait_for(lambda: len(srv.clients) == 1)
+        srv.publish(b"x" * 100)  # Larger than the ring: the oldest bytes go, nothing blocks
+        assert srv.dropped() == 36
+    finally:
+        clients[0].close()
+        srv.close()
+    assert srv.clients == []
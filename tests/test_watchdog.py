@@ -0,0 +1,13 @@
+"""UI loop watchdog: heartbeat lag percentiles."""
+
+import pytest
+
+import myterm
+
+
+def test_loop_watchdog_percentiles_use_nearest_rank():
+    wd = myterm.LoopWatchdog()
+    wd.stop()
+    wd.lags.extend(v / 1000 for v in range(1, 101))
+    pct = wd.percentiles()
+    assert pct["p50"] == pytest.approx(50) and pct["p99"] == pytest.approx(99) and pct["max"] == pytest.approx(100)